@@ -0,0 +1,125 @@
+"""
+Benchmarks of the simulation core on generated square maps from 10^2 to 10^7 cells.
+
+    python -m benchmarks.suite -o benchmarks/results.json
+    python -m benchmarks.suite --max-exponent 5 --baseline benchmarks/baseline.json
+
+Each phase is timed (best of the repeats, in seconds):
+    - construct: TreasureMap creation from the generated elements
+    - parse: integrate of the quest written in the text format
+    - next: one turn of TreasureMap.next
+    - render: TreasureMap.__str__
+    - format_result: write_result of the map in the text format, in memory
+"""
+import argparse
+import io
+import json
+import platform
+import sys
+import time
+
+import src.treasure_quest as tq
+from src import scenario
+from src.back import TreasureMap
+
+PHASES = ["construct", "parse", "next", "render", "format_result"]
+
+
+def timed(function, repeat=1, min_time=0.2):
+    """
+    Calls the function at least repeat times, and until min_time seconds have been spent (short calls are noisy).
+
+    :return: Best duration of the calls of the function, in seconds
+    """
+    best, spent, calls = None, 0, 0
+    while calls < repeat or spent < min_time:
+        start = time.perf_counter()
+        function()
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+        spent += duration
+        calls += 1
+    return best
+
+
+def measure(cells, repeat=3, turns=5, seed=0):
+    """
+    :param cells: Amount of cells of the map
+    :param repeat: Amount of measures of each phase (the best one is kept)
+    :param turns: Amount of turns measured for next
+    :return: Duration of each phase, in seconds, example: {"construct": 0.01, "parse": 0.02, ...}
+    """
+    side = scenario.square_side(cells)
+    options = scenario.elements(side, side, seed=seed)
+    tm = TreasureMap(**options)
+
+    quest = io.StringIO()
+    tq.write_quest(tm, quest)
+    quest = quest.getvalue()
+
+    return {
+        "construct": timed(lambda: TreasureMap(**options), repeat),
+        "parse": timed(lambda: tq.integrate(quest), repeat),
+        "next": timed(lambda: [tm.next() for _ in range(turns)], repeat) / turns,
+        "render": timed(lambda: str(tm), repeat),
+        "format_result": timed(lambda: tq.write_result(tm, io.StringIO()), repeat),
+    }
+
+
+def run(exponents, repeat=3, turns=5, seed=0, log=None):
+    """
+    :param exponents: Sizes of the maps, as powers of 10 of their amount of cells
+    :return: The report: {"meta": {...}, "results": {"10^2": {"construct": 0.0001, ...}, ...}}
+    """
+    results = {}
+    for exponent in exponents:
+        results[f"10^{exponent}"] = measure(10 ** exponent, repeat=repeat, turns=turns, seed=seed)
+        if log:
+            log(f"10^{exponent}: " + ", ".join(f"{phase} {results[f'10^{exponent}'][phase]:.6f}s" for phase in PHASES))
+
+    meta = {"python": platform.python_version(), "machine": platform.machine(), "repeat": repeat, "turns": turns,
+            "seed": seed}
+    return {"meta": meta, "results": results}
+
+
+def compare(report, baseline, tolerance=0.5):
+    """
+    :param tolerance: Accepted slowdown ratio, example: 0.5 accepts phases up to 50% slower than the baseline
+    :return: The regressions: list of (size, phase, baseline duration, duration)
+    """
+    regressions = []
+    for size, phases in report["results"].items():
+        for phase, duration in phases.items():
+            reference = baseline["results"].get(size, {}).get(phase)
+            if reference is not None and duration > reference * (1 + tolerance):
+                regressions.append((size, phase, reference, duration))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--min-exponent", type=int, default=2, help="smallest map, in powers of 10 of cells")
+    parser.add_argument("--max-exponent", type=int, default=7, help="largest map, in powers of 10 of cells")
+    parser.add_argument("--repeat", type=int, default=3, help="amount of measures of each phase")
+    parser.add_argument("--turns", type=int, default=5, help="amount of turns measured")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generated maps")
+    parser.add_argument("-o", "--output", help="write the JSON report in this file (default: standard output)")
+    parser.add_argument("--baseline", help="JSON report to compare with, exits with 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="accepted slowdown ratio against the baseline")
+    args = parser.parse_args()
+
+    report = run(range(args.min_exponent, args.max_exponent + 1), repeat=args.repeat, turns=args.turns,
+                 seed=args.seed, log=lambda message: print(message, file=sys.stderr))
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(report, json.load(file), tolerance=args.tolerance)
+        for size, phase, reference, duration in regressions:
+            print(f"regression {size} {phase}: {reference:.6f}s -> {duration:.6f}s", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,44 @@
+"""
+Speedup of the tiled engine across worker counts, on a large random map.
+
+    python -m benchmarks.tiled --size 2000 --adventurers 100000 --turns 100
+"""
+import argparse
+import json
+import os
+import time
+
+from src import scenario
+from src.tiled import TiledEngine
+
+
+def large_map(size, adventurers, turns, seed=0):
+    return scenario.generate(size, size, treasures=size, adventurers=adventurers, script_length=turns, seed=seed)
+
+
+def benchmark(size, adventurers, turns, tile_size, workers):
+    """
+    :return: Timings for each amount of workers, example: [{"workers": 1, "seconds": 2.1, "speedup": 1.0}, ...]
+    """
+    results = []
+    for count in workers:
+        treasure_map = large_map(size, adventurers, turns)
+        start = time.perf_counter()
+        TiledEngine(treasure_map, tile_size=tile_size, workers=count).run()
+        seconds = time.perf_counter() - start
+        results.append({"workers": count, "seconds": round(seconds, 3),
+                        "speedup": round(results[0]["seconds"] / seconds, 2) if results else 1.0})
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=2000, help="side of the map")
+    parser.add_argument("--adventurers", type=int, default=100_000, help="amount of adventurers")
+    parser.add_argument("--turns", type=int, default=100, help="length of the scripts")
+    parser.add_argument("--tile-size", type=int, default=256, help="side of the tiles")
+    parser.add_argument("-w", "--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}), help="amounts of worker processes")
+    args = parser.parse_args()
+
+    print(json.dumps(benchmark(args.size, args.adventurers, args.turns, args.tile_size, args.workers), indent=2))
@@ -2,34 +2,158 @@ import argparse
 
 import src.treasure_quest as tq
 
+# The modules of the other commands are imported by the command using them: short-lived processes playing a quest
+# headlessly (see -f and --headless) only import the simulation core
+
 
 def main():
     parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest="command")
+
+    convert = commands.add_parser("convert", help="convert a quest between the text and the binary formats")
+    convert.add_argument("source", help="quest to convert (format is detected)")
+    convert.add_argument("destination", help="converted quest")
+
+    run_batch = commands.add_parser("batch", help="play many quests headlessly on a pool of processes")
+    run_batch.add_argument("pattern", help="directory or glob pattern of the quests")
+    run_batch.add_argument("-w", "--workers", type=int, help="amount of worker processes (default: CPUs count)")
+    run_batch.add_argument("--chunksize", type=int, default=1, help="amount of quests sent at once to a worker")
+    run_batch.add_argument("-o", "--output", default="results.txt", help="file gathering every result")
+    run_batch.add_argument("--output-dir", help="write each result in its own file in this directory instead")
+
+    worker = commands.add_parser("worker", help="play the quests whose paths are read on the standard input, one per "
+                                                "line, in this process")
+    worker.add_argument("-o", "--output", default="-",
+                        help="file gathering every result, '-' for the standard output (default)")
+    worker.add_argument("--output-dir", help="write each result in its own file in this directory instead")
+
+    sweep = commands.add_parser("sweep", help="play many seeded random quests and print their statistics")
+    sweep.add_argument("runs", type=int, help="amount of random quests")
+    sweep.add_argument("-w", "--workers", type=int, default=1, help="amount of worker processes")
+
+    show_trace = commands.add_parser("trace", help="print the events of a binary trace and the replayed result")
+    show_trace.add_argument("path", help="trace recorded with --trace")
+
+    replay = commands.add_parser("replay", help="draw a recorded quest from any turn")
+    replay.add_argument("path", help="recording written with --save")
+    replay.add_argument("--seek", type=int, metavar="TURN", help="turn to start from (default: first recorded turn)")
+    replay.add_argument("--play", action="store_true", help="keep playing the recording until its end")
+
+    serve = commands.add_parser("serve", help="host quests and stream their turns to TCP clients")
+    serve.add_argument("files", nargs="*", help="quests to host")
+    serve.add_argument("--random", type=int, default=0, metavar="N", help="also host N random quests")
+    serve.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    serve.add_argument("--port", type=int, default=8765, help="port to listen on")
+    serve.add_argument("--interval", type=float, default=0.5, help="seconds between two turns of a quest")
+
     parser.add_argument("-f", "--file",
                         help="define the input file")
     parser.add_argument("-r", "--random", action="store_true",
                         help="add randomness in the quest")
-    parser.add_argument("-s", "--save", action="store_true",
-                        help="Save initial state for possible replays")
+    parser.add_argument("-s", "--save", nargs="?", const="replay.tqr", metavar="FILE",
+                        help="record the quest for replays (default file: replay.tqr)")
+    parser.add_argument("--headless", action="store_true",
+                        help="simulate the quest without drawing it on the terminal")
+    parser.add_argument("--fps", type=float, default=2,
+                        help="maximum amount of frames drawn per second (0 for no limit)")
+    parser.add_argument("--frame-skip", type=int, default=0,
+                        help="amount of turns simulated between two drawn frames")
+    parser.add_argument("--seed", type=int,
+                        help="seed of the random quest and of the random moves")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="write the phases' timers and counters as JSON in this file, "
+                             "or a cProfile dump if it ends with .prof or .pstats")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="record the events of the quest in this binary trace file")
+    parser.add_argument("-o", "--output", default="results.txt",
+                        help="file receiving the result of the quest given with --file")
+    parser.add_argument("--format", choices=tq.OUTPUT_FORMATS, default=tq.TEXT,
+                        help="format of the result: quest output format, JSON Lines or CSV")
+    parser.add_argument("--plan", action="store_true",
+                        help="replace the adventurers' movements by planned ones collecting every treasure")
     args = parser.parse_args()
 
-    return args.file, args.random, args.save
+    return args
 
 
-if __name__ == "__main__":
-    input_f, randomized, save = main()
-
-    if input_f:
-        with open(input_f, "r") as file:
-            input_file_arg = file.read()
+def run(args):
+    input_f, randomized = args.file, args.random
+    options = {"save": args.save, "headless": args.headless, "fps": args.fps, "frame_skip": args.frame_skip,
+               "seed": args.seed,
+               "profile": args.profile if args.profile and not is_cprofile(args.profile) else None,
+               "trace": args.trace, "plan": args.plan}
 
-        res = tq.treasure_quest(input_file_arg)
+    if args.command == "convert":
+        from src import binary
+        binary.convert(args.source, args.destination)
+    elif args.command == "batch":
+        from src import batch
+        results = batch.run_batch(batch.find_scenarios(args.pattern), workers=args.workers, chunksize=args.chunksize,
+                                  seed=args.seed)
+        batch.write_results(results, output=None if args.output_dir else args.output, output_dir=args.output_dir)
+    elif args.command == "worker":
+        import sys
+        from src import batch
+        results = batch.run_batch(batch.read_paths(sys.stdin), workers=1, seed=args.seed)
+        batch.write_results(results, output=None if args.output_dir else args.output, output_dir=args.output_dir)
+    elif args.command == "trace":
+        from src import events
+        quest, recorded = events.read_trace(args.path)
+        names = [adventurer.name for adventurer in tq.integrate(quest).adventurers]
+        for event in recorded:
+            print(events.format_event(event, names))
+        print(tq.format_result(events.replay(args.path).get_data()))
+    elif args.command == "replay":
+        from src import recording
+        from src.render import TerminalRenderer
+        frames = recording.Recording(args.path).replay(args.seek)
+        if args.play:
+            renderer = TerminalRenderer(fps=args.fps, frame_skip=args.frame_skip)
+            for tm in frames:
+                renderer(tm)
+        else:
+            print(next(frames))
+    elif args.command == "serve":
+        import asyncio
+        from src.server import QuestServer
 
-        with open("results.txt", "w") as file:
-            file.write(res)
+        server = QuestServer(interval=args.interval)
+        for path in args.files:
+            with open(path) as file:
+                server.add(tq.integrate(file, seed=args.seed), name=path)
+        for k in range(args.random):
+            server.add(tq.random_map(seed=None if args.seed is None else args.seed + k))
+        asyncio.run(server.serve(args.host, args.port))
+    elif args.command == "sweep":
+        import json
+        from src import monte_carlo
+        stats = monte_carlo.sweep(args.runs, seed=args.seed or 0, workers=args.workers)
+        print(json.dumps(stats, indent=2))
+    elif input_f:
+        from src import binary
+        options.update(output=args.output, output_format=args.format)
+        if binary.is_binary(input_f):
+            tm = binary.load_binary(input_f)
+            tm.random.seed(args.seed)
+            tq.treasure_quest(tm, **options)
+        else:
+            with open(input_f, "r") as file:
+                tq.treasure_quest(file, **options)
     else:
-        res = tq.treasure_quest(random=randomized, save=save)
+        tq.treasure_quest(random=randomized, **options)
+
+
+def is_cprofile(path):
+    return path.endswith((".prof", ".pstats"))
 
-        if save:
-            with open("replay.txt", "w") as file:
-                file.write(res)
+
+if __name__ == "__main__":
+    args = main()
+
+    if args.profile and is_cprofile(args.profile):
+        import cProfile
+        with cProfile.Profile() as profiler:
+            run(args)
+        profiler.dump_stats(args.profile)
+    else:
+        run(args)
@@ -43,6 +43,17 @@ DIRECTIONS_CLOCKWISE = [
     Direction.WEST,
 ]
 
+DIRECTION_INDEX = {direction: index for index, direction in enumerate(DIRECTIONS_CLOCKWISE)}
+
+CHAR_TO_DIRECTION_INDEX = {char: DIRECTION_INDEX[direction] for char, direction in CHAR_TO_DIRECTION.items()}
+
+# Row and column offsets of each direction, indexed like DIRECTIONS_CLOCKWISE
+DIRECTION_DELTAS = [direction.value for direction in DIRECTIONS_CLOCKWISE]
+
+CHAR_TO_ROTATION = {char: relative_direction.value for char, relative_direction in CHAR_TO_RELATIVE_DIRECTION.items()}
+
+DIRECTION_ARROWS = ["^", ">", "v", "<"]
+
 TREASURE_FACE = [
     ".(è_é).",
     "d(-_-)b",
@@ -55,32 +66,48 @@ TREASURE_FACE = [
 
 
 class Adventurer:
+    __slots__ = ("name", "pos", "dir", "collected_treasures")
+
     def __init__(self, name, pos, direction):
         self.name = name
         self.pos = pos
-        self.direction = CHAR_TO_DIRECTION.get(direction, Direction.NORTH)
+        self.dir = CHAR_TO_DIRECTION_INDEX.get(direction, 0)
 
-        self.previous_moves = []
         self.collected_treasures = 0
 
     def __str__(self):
-        dir = ["^", ">", "v", "<"][DIRECTIONS_CLOCKWISE.index(self.direction)]
-        face = TREASURE_FACE[min([len(TREASURE_FACE), self.collected_treasures])]
+        dir = DIRECTION_ARROWS[self.dir]
+        face = TREASURE_FACE[min([len(TREASURE_FACE) - 1, self.collected_treasures])]
         return f"{face:^15} {self.name:^15}\t'{dir}'{self.pos}\t{self.collected_treasures}$"
 
+    @property
+    def direction(self):
+        """
+        :return: The direction the adventurer is facing (North, South, East, West).
+        """
+        return DIRECTIONS_CLOCKWISE[self.dir]
+
+    @direction.setter
+    def direction(self, direction):
+        self.dir = DIRECTION_INDEX[direction]
+
     def move(self):
         """
         Moves the adventurer in the direction he is facing, i.e. (North, South, East, West).
         """
-        self.pos = self.get_next_pos()
+        di, dj = DIRECTION_DELTAS[self.dir]
+        i, j = self.pos
+        self.pos = (i + di, j + dj)
 
     def get_next_pos(self):
         """
-        It simply sums the current position with the direction's value in order to define the adventurer's next position.
+        It simply sums the current position with the direction's offsets in order to define the adventurer's next position.
 
         :return: The next position coordinates.
         """
-        return tuple(map(sum, zip(self.pos, self.direction.value)))
+        di, dj = DIRECTION_DELTAS[self.dir]
+        i, j = self.pos
+        return i + di, j + dj
 
     def turn(self, relative_direction_char):
         """
@@ -89,15 +116,17 @@ class Adventurer:
         :param relative_direction_char: either left or right ("L" or "R")
         :return: new direction (North, South, East, West).
         """
-        relative_direction = CHAR_TO_RELATIVE_DIRECTION.get(relative_direction_char)
-        if not relative_direction:
-            return
-
-        dir_index = DIRECTIONS_CLOCKWISE.index(self.direction)
-        new_dir_index = (dir_index + relative_direction.value) % len(
-            DIRECTIONS_CLOCKWISE
-        )
-        self.direction = DIRECTIONS_CLOCKWISE[new_dir_index]
+        rotation = CHAR_TO_ROTATION.get(relative_direction_char)
+        if rotation:
+            self.rotate(rotation)
+
+    def rotate(self, rotation):
+        """
+        Turns the adventurer by quarters of turn, clockwise when positive.
+
+        :param rotation: Amount of quarters of turn (example: 1 to turn right, -1 to turn left)
+        """
+        self.dir = (self.dir + rotation) % len(DIRECTIONS_CLOCKWISE)
 
     def pickup_treasure(self):
         self.collected_treasures += 1
@@ -1,27 +1,79 @@
+import copy
 import random as rnd
-import logging as log
-from enum import Enum
+import weakref
 from collections import namedtuple
+from contextlib import nullcontext
 
-from src.adventurer import Adventurer, CHAR_TO_RELATIVE_DIRECTION, DIRECTION_TO_CHAR
+from src.adventurer import Adventurer, DIRECTION_TO_CHAR
+from src.script import Script, FORWARD, NOOP, OPCODE_TO_ROTATION
+from src.grid import Grid, CellType, PLAIN
+from src.leaderboard import LeaderBoard
+from src.stats import Stats, TURNS, MOVES_DONE, MOVES_BLOCKED, MOVES_COLLIDED, PICKUPS
+from src.events import EventLog, EVENTS_CAPACITY, TURN, MOVE, ROTATE, BLOCKED, PICKUP
+from src.treasures import TreasureIndex
 
 Cell = namedtuple("Cell", ["i", "j"])
 
+# Mutable state of a map (see TreasureMap.snapshot), adventurers being tuples of
+# (adventurer, script, position, direction, collected treasures, script's state)
+Snapshot = namedtuple("Snapshot", ["iteration", "turns", "treasures", "treasures_count", "adventurers",
+                                   "leader_board", "random_state"])
 
-class CellType(Enum):
-    PLAIN = 1
-    MOUNTAIN = 2
+RANDOM_MOVES = "AAALR"
+# Amount of random moves drawn at once when an adventurer's script is exhausted
+RANDOM_MOVES_BATCH = 16
+# Amount of adventurers displayed in the leader board
+LEADER_BOARD_SIZE = 10
+
+MOUNTAIN_CHAR = "/V\\ "
+PLAIN_CHAR = ",,, "
+ADVENTURER_CHAR = "\\o/ "
+CELL_WIDTH = 4
+
+
+def debug(message):
+    """
+    Logs a debug message, the logging module being only imported when a map needs it (it is slow to import).
+    """
+    import logging
+    logging.debug(message)
+
+
+class Terrain:
+    """
+    State of a grid shared by the maps playing on it (a map and its forks): the drawn terrain rows, the version of the
+    terrain and the maps whose treasures are dropped when a mountain is added.
+    """
+
+    def __init__(self):
+        self.rows = None
+        # Incremented whenever the terrain changes once the map is created
+        self.version = 0
+        # Maps sharing the terrain, only tracked once a map is forked
+        self.maps = None
 
 
 class TreasureMap:
-    def __init__(self, width, height, mountains=[], treasures=[], adventurers=[]):
+    def __init__(self, width, height, mountains=[], treasures=[], adventurers=[], grid_backend=Grid, seed=None,
+                 profile=False):
         self.width = width if width >= 0 else 0
         self.height = height if height >= 0 else 0
 
-        self.grid = {}
-        self.mountains = mountains
+        self.grid = grid_backend(self.width, self.height)
+        self.terrain = Terrain()
         self.treasures = {}
+        self.treasures_count = 0
+        self.treasure_index = None
         self.adventurers = {}
+        # Adventurers by name, each name's adventurers kept in arrival order as the keys of a dictionary
+        self.adventurers_by_name = {}
+        self.occupied = {}
+        self.leader_board = LeaderBoard()
+        self.random = rnd.Random(seed)
+        self.profiler = Stats() if profile else None
+        self.events = None
+        # Recorder of the quest, if any (see recording.Recorder)
+        self.recorder = None
 
         self.iteration = 0
         self.turns = 0
@@ -30,44 +82,55 @@ class TreasureMap:
         self.add_treasures(treasures)
         self.add_adventurers(adventurers)
 
-        self.initial_state = None
-
     def __str__(self):
         """
         Represents all the plains, mountains, treasures and adventurers present on an ASCII art version's of the map !
 
         :return: The map visualization on ASCII art
         """
-        mountain_char = "/V\\"
-        plain_char = ",,,"
-        adventurer_char = "\\o/ "
+        with self.phase("render"):
+            txt = "".join(["\n\t" + row + "\n" for row in self.get_rows()])
+            leader_board = self.get_leader_board()
 
-        txt = ""
-        for i in range(self.width):
-            txt += "\n\t"
-            for j in range(self.height):
-                background = (
-                    plain_char if self.grid[(i, j)] is CellType.PLAIN else mountain_char
-                )
-                foreground = (
-                    f"[{str(self.treasures.get((i, j)))}]"
-                    if self.treasures.get((i, j))
-                    else ""
-                )
-                adventurer = adventurer_char if self.is_occupied((i, j)) else ""
-                txt += adventurer or (foreground or background) + " "
-            txt += "\n"
+        return "The Madre de Dios Treasure Quest !" + txt + leader_board
 
-        leader_board = self.get_leader_board()
+    def get_rows(self):
+        """
+        Draws the treasures and adventurers over the terrain rows, which are only drawn once.
 
-        return "The Madre de Dios Treasure Quest !" + txt + leader_board
+        :return: The ASCII art rows of the map
+        """
+        terrain = self.terrain
+        if terrain.rows is None:
+            terrain.rows = [
+                "".join([PLAIN_CHAR if cell == PLAIN else MOUNTAIN_CHAR for cell in self.grid.row(i)])
+                for i in range(self.width)
+            ]
 
-    def get_leader_board(self):
+        overlays = {}
+        for (i, j), amount in self.treasures.items():
+            overlays.setdefault(i, {})[j] = f"[{amount}] "
+        for i, j in self.occupied:
+            overlays.setdefault(i, {})[j] = ADVENTURER_CHAR
+
+        rows = list(terrain.rows)
+        for i, cells in overlays.items():
+            row, pieces, start = rows[i], [], 0
+            for j in sorted(cells):
+                pieces.append(row[start:j * CELL_WIDTH])
+                pieces.append(cells[j])
+                start = (j + 1) * CELL_WIDTH
+            pieces.append(row[start:])
+            rows[i] = "".join(pieces)
+
+        return rows
+
+    def get_leader_board(self, size=LEADER_BOARD_SIZE):
         txt = f"\nTurn: {self.iteration:>3}"
         txt += f'\t\t\t\t\tTreasures: {self.get_treasures_count():>3}\n\n'
         txt += f'\t\t|\\/o\\/|   Leader Board   |\\/o\\/|\n'
         txt += "_".join([".:*~*:."] * 8) + "\n"
-        for i, adventurer in zip(range(len(self.adventurers)), sorted(self.adventurers.keys(), key=lambda a: a.collected_treasures, reverse=True)):
+        for i, adventurer in enumerate(self.leader_board.top(size)):
             txt += f"#{i+1}\t" + str(adventurer) + "\n"
 
         return txt
@@ -80,11 +143,8 @@ class TreasureMap:
 
         :param mountains: List of mountains coordinates which should be present on the map, example [(0, 0), (0, 1)]
         """
-        for j in range(self.height):
-            for i in range(self.width):
-                self.grid[Cell(i, j)] = (
-                    CellType.MOUNTAIN if (i, j) in mountains else CellType.PLAIN
-                )
+        with self.phase("create_map"):
+            self.grid.add_mountains(mountains)
 
     def add_treasures(self, treasures):
         """
@@ -94,36 +154,117 @@ class TreasureMap:
 
         :param treasures: List of tuples representing adventurers (example: [(1, 1, 3)])
         """
-        for x, y, treasures_amount in treasures:
-            if self.is_accessible(position=(x, y)):
-                if treasures_amount < 1:
-                    log.debug(
-                        f"Trying to set treasures on cell({(x, y)}) but amount is invalid (amount={treasures_amount})."
-                    )
-                elif self.treasures.get((x, y)):
-                    log.debug(
-                        f"Treasures already set for cell({(x, y)}). Skipping treasure's definition."
-                    )
-                else:
-                    self.treasures[(x, y)] = treasures_amount
+        with self.phase("add_treasures"):
+            for x, y, treasures_amount in treasures:
+                self.add_treasure(x, y, treasures_amount)
+
+    def add_treasure(self, x, y, treasures_amount):
+        if self.is_accessible(position=(x, y)):
+            if treasures_amount < 1:
+                debug(
+                    f"Trying to set treasures on cell({(x, y)}) but amount is invalid (amount={treasures_amount})."
+                )
+            elif self.treasures.get((x, y)):
+                debug(
+                    f"Treasures already set for cell({(x, y)}). Skipping treasure's definition."
+                )
+            else:
+                self.treasures[(x, y)] = treasures_amount
+                self.treasures_count += treasures_amount
+                if self.treasure_index is not None:
+                    self.treasure_index.add(x, y)
+
+    def pop_treasure(self, position):
+        """
+        Removes the cell from the treasures (the treasures count is left to the caller).
+
+        :return: The amount of treasures left on the cell
+        """
+        amount = self.treasures.pop(position, 0)
+        if self.treasure_index is not None:
+            self.treasure_index.discard(*position)
+        return amount
+
+    def add_mountains(self, mountains):
+        """
+        Adds mountains on an existing map at once (see add_mountain).
+
+        :param mountains: List of mountains coordinates, example [(0, 0), (0, 1)]
+        """
+        self.grid.add_mountains(mountains)
+        terrain = self.terrain
+        terrain.rows = None
+        terrain.version += 1
+        for tm in (self,) if terrain.maps is None else terrain.maps:
+            if tm.treasures:
+                for position in mountains:
+                    tm.treasures_count -= tm.pop_treasure(position)
+
+    def add_mountain(self, x, y):
+        """
+        Adds a mountain on an existing map and on the maps sharing its terrain (see fork), the treasures already set on
+        this cell are dropped.
+        """
+        self.grid.add_mountain((x, y))
+        terrain = self.terrain
+        terrain.rows = None
+        terrain.version += 1
+        if terrain.maps is None:
+            self.treasures_count -= self.pop_treasure((x, y))
+        else:
+            for tm in terrain.maps:
+                tm.treasures_count -= tm.pop_treasure((x, y))
 
     def add_adventurers(self, adventurers):
         """
         Creates a dictionary of :
             - key: The adventurers
-            - Value: All adventurer's movements (example: "AADAGA")
+            - Value: All adventurer's movements compiled in a Script (example: "AADAGA")
 
         :param adventurers: List of tuples representing adventurers (example: [("Lara", 1, 1, "S", "AA")])
         """
-        for name, x, y, direction, movements in adventurers:
-            if self.is_accessible(position=(x, y)) and not self.is_occupied(
-                    position=(x, y)
-            ):
-                adventurer = Adventurer(name, (x, y), direction)
-                self.adventurers[adventurer] = [c for c in movements]
-                self.turns = (
-                    len(movements) if self.turns < len(movements) else self.turns
-                )
+        with self.phase("add_adventurers"):
+            for name, x, y, direction, movements in adventurers:
+                self.add_adventurer(name, x, y, direction, movements)
+
+    def add_adventurer(self, name, x, y, direction, movements=""):
+        """
+        Adds an adventurer, possibly while the quest is played (it plays from the next turn).
+
+        :return: The Adventurer, None when its cell is not accessible or already occupied
+        :raise ValueError: When the quest is recorded (see recorded)
+        """
+        if self.recorded:
+            raise ValueError("Adventurers cannot be added while the quest is recorded")
+        if not self.is_accessible(position=(x, y)) or self.is_occupied(position=(x, y)):
+            return None
+
+        adventurer = Adventurer(name, (x, y), direction)
+        script = Script(movements)
+        self.adventurers[adventurer] = script
+        self.adventurers_by_name.setdefault(name, {})[adventurer] = None
+        self.occupied[adventurer.pos] = adventurer
+        self.leader_board.add(adventurer)
+        self.turns = (
+            len(script) if self.turns < len(script) else self.turns
+        )
+        return adventurer
+
+    def remove_adventurer(self, adventurer):
+        """
+        Removes an adventurer from the quest, with its collected treasures.
+
+        :raise ValueError: When the quest is recorded (see recorded)
+        """
+        if self.recorded:
+            raise ValueError("Adventurers cannot be removed while the quest is recorded")
+        del self.adventurers[adventurer]
+        del self.occupied[adventurer.pos]
+        self.leader_board.remove(adventurer)
+        namesakes = self.adventurers_by_name[adventurer.name]
+        del namesakes[adventurer]
+        if not namesakes:
+            del self.adventurers_by_name[adventurer.name]
 
     def is_accessible(self, position):
         """
@@ -132,110 +273,293 @@ class TreasureMap:
         :param position: The requested position (i.e. a tuple made of two coordinates x and y)
         :return: True if position is accessible, False otherwise.
         """
-        return position in self.grid and self.grid[position] is CellType.PLAIN
-
-    def update_initial_state(self):
-        for adv in self.initial_state.adventurers.keys():
-            self.initial_state.adventurers[adv] = self.get_adventurer(adv.name).previous_moves
+        return self.grid.is_plain(position)
 
     # ----- Core ---------
 
-    def play(self):
-        import os, time
-        clear = lambda: os.system('clear')
-        clear()
+    def play(self, fps=2, frame_skip=0, observer=None):
+        """
+        Plays the quest while drawing the map on the terminal.
 
-        while self.turns > 0 and self.treasures:
-            self.next()
-            print(self)
-            time.sleep(0.5)
-            clear()
+        :param fps: Maximum amount of frames drawn per second
+        :param frame_skip: Amount of turns simulated without being drawn between two frames
+        :param observer: Optional callable notified with the map after each turn, before it is drawn
+        """
+        from src.render import TerminalRenderer
 
+        renderer = TerminalRenderer(fps=fps, frame_skip=frame_skip)
+        if observer is None:
+            self.run(observer=renderer)
+        else:
+            self.run(observer=lambda tm: (observer(tm), renderer(tm)))
+        renderer.clear()
+
+    def run(self, observer=None):
+        """
+        Simulates the quest until all the turns are played or all the treasures are collected, without any terminal I/O.
+
+        :param observer: Optional callable notified with the map after each turn (example: a TerminalRenderer)
+        :return: The amount of turns simulated
+        """
+        simulated = 0
+        while self.turns > 0 and self.treasures_count:
+            self.next()
             self.turns -= 1
+            simulated += 1
+
+            if observer:
+                observer(self)
+
+        return simulated
 
     def next(self):
-        for adventurer, movements in self.adventurers.items():
-            if self.iteration >= len(movements):
-                movements += get_random_move()
-                # continue
-            next_movement = movements[self.iteration]
-            self.handle_adventurer(adventurer, next_movement)
+        with self.phase("next"):
+            for adventurer, script in self.adventurers.items():
+                opcode = script.next()
+                if opcode is None:
+                    script.extend(self.get_random_moves())
+                    opcode = script.next()
+                self.handle_adventurer(adventurer, opcode)
 
         self.iteration += 1
+        if self.profiler is not None:
+            self.profiler.count(TURNS)
+        if self.events is not None:
+            self.events.record(TURN, None, 0, 0, self.iteration)
 
-    def handle_adventurer(self, adventurer, next_movement):
-        if next_movement == "A":
+    def handle_adventurer(self, adventurer, opcode):
+        if opcode == FORWARD:
             self.handle_adventurer_moves(adventurer)
-        else:
-            adventurer.turn(next_movement)
-            if CHAR_TO_RELATIVE_DIRECTION.get(next_movement):
-                log.info(
-                    f"{adventurer.name} turns to the {CHAR_TO_RELATIVE_DIRECTION.get(next_movement).name}"
-                )
-        adventurer.previous_moves += [next_movement]
+        elif opcode != NOOP:
+            adventurer.rotate(OPCODE_TO_ROTATION[opcode])
+            if self.events is not None:
+                self.events.record(ROTATE, adventurer, *adventurer.pos, adventurer.dir)
 
     def handle_adventurer_moves(self, adventurer):
         next_pos = adventurer.get_next_pos()
 
         if self.is_accessible(next_pos) and not self.is_occupied(next_pos):
-            log.info(f"{adventurer.name} moves to the {adventurer.direction.name}.")
-            adventurer.move()
+            self.move_adventurer(adventurer)
+            if self.profiler is not None:
+                self.profiler.count(MOVES_DONE)
+            if self.events is not None:
+                self.events.record(MOVE, adventurer, *next_pos, adventurer.dir)
 
             if self.treasures.get(next_pos):
                 self.treasures[next_pos] -= 1
+                self.treasures_count -= 1
                 adventurer.collected_treasures += 1
+                self.leader_board.update(adventurer)
                 if self.treasures[next_pos] == 0:
-                    self.treasures.pop(next_pos)
+                    self.pop_treasure(next_pos)
+                if self.profiler is not None:
+                    self.profiler.count(PICKUPS)
+                if self.events is not None:
+                    self.events.record(PICKUP, adventurer, *next_pos, adventurer.collected_treasures)
+        else:
+            if self.profiler is not None:
+                self.profiler.count(MOVES_COLLIDED if self.is_accessible(next_pos) else MOVES_BLOCKED)
+            if self.events is not None:
+                self.events.record(BLOCKED, adventurer, *next_pos, self.is_occupied(next_pos))
+
+    def move_adventurer(self, adventurer):
+        """
+        Moves the adventurer forward while keeping the occupancy index up to date.
+
+        :param adventurer: The adventurer to move (its next position must be free)
+        """
+        del self.occupied[adventurer.pos]
+        adventurer.move()
+        self.occupied[adventurer.pos] = adventurer
 
     def is_occupied(self, position):
-        return position in [adventurer.pos for adventurer in self.adventurers.keys()]
+        return position in self.occupied
+
+    def get_occupant(self, position):
+        """
+        :param position: The requested position (i.e. a tuple made of two coordinates x and y)
+        :return: The adventurer standing on this position, None otherwise.
+        """
+        return self.occupied.get(position)
+
+    # ----- Branching ---------
+
+    def snapshot(self):
+        """
+        Saves the mutable state of the map: treasures, adventurers' positions, directions, scores and scripts' cursors,
+        turns and random generator. The terrain is not saved, it is shared by every state.
+
+        :return: The Snapshot, which can be restored any number of times
+        """
+        adventurers = tuple(
+            (adventurer, script, adventurer.pos, adventurer.dir, adventurer.collected_treasures, script.state())
+            for adventurer, script in self.adventurers.items()
+        )
+        return Snapshot(self.iteration, self.turns, dict(self.treasures), self.treasures_count, adventurers,
+                        self.leader_board.copy(), self.random.getstate())
+
+    def restore(self, snapshot):
+        """
+        Puts the map back in the state saved by snapshot, the moves played and drawn since are forgotten.
+        """
+        self.iteration, self.turns = snapshot.iteration, snapshot.turns
+        self.treasures = dict(snapshot.treasures)
+        self.treasures_count = snapshot.treasures_count
+        if self.treasure_index is not None:
+            self.index_treasures(self.treasure_index.size)
+
+        self.adventurers = {}
+        self.adventurers_by_name = {}
+        self.occupied = {}
+        for adventurer, script, pos, direction, collected_treasures, state in snapshot.adventurers:
+            adventurer.pos, adventurer.dir, adventurer.collected_treasures = pos, direction, collected_treasures
+            script.restore(state)
+            self.adventurers[adventurer] = script
+            self.adventurers_by_name.setdefault(adventurer.name, {})[adventurer] = None
+            self.occupied[pos] = adventurer
+
+        self.leader_board = snapshot.leader_board.copy()
+        self.random.setstate(snapshot.random_state)
+
+    def fork(self):
+        """
+        Copies the map to play another branch of the quest: the terrain and the scripts' code are shared, the
+        treasures (and their index), adventurers and random generator are copied. Mountains added to one map are added
+        to both, dropping the treasures of the cell in both.
+
+        :return: A new TreasureMap in the same state, which is neither profiled nor recorded
+        """
+        tm = copy.copy(self)
+        if self.terrain.maps is None:
+            self.terrain.maps = weakref.WeakSet([self])
+        self.terrain.maps.add(tm)
+        tm.treasures = dict(self.treasures)
+        if self.treasure_index is not None:
+            tm.index_treasures(self.treasure_index.size)
+
+        mapping = {adventurer: copy.copy(adventurer) for adventurer in self.adventurers}
+        tm.adventurers = {mapping[adventurer]: script.copy() for adventurer, script in self.adventurers.items()}
+        tm.adventurers_by_name = {name: {mapping[adventurer]: None for adventurer in namesakes}
+                                  for name, namesakes in self.adventurers_by_name.items()}
+        tm.occupied = {pos: mapping[adventurer] for pos, adventurer in self.occupied.items()}
+        tm.leader_board = self.leader_board.copy(mapping)
+
+        tm.random = rnd.Random()
+        tm.random.setstate(self.random.getstate())
+        tm.profiler = None
+        tm.events = None
+        tm.recorder = None
+        return tm
+
+    # ----- Instrumentation ---------
+
+    def record_events(self, capacity=EVENTS_CAPACITY, trace=None):
+        """
+        Starts recording the events of the turns played by next (see EventLog).
+
+        :param capacity: Amount of events kept in memory
+        :param trace: Path of a binary trace file receiving every event (None to only keep the latest ones in memory)
+        :return: The EventLog
+        """
+        self.events = EventLog(self, capacity=capacity, trace=trace)
+        return self.events
+
+    def index_treasures(self, bucket_size=None):
+        """
+        Starts indexing the cells holding treasures, to query the closest ones (see TreasureIndex), example:
+            tm.index_treasures().nearest_k(*adventurer.pos, 3)
+
+        :param bucket_size: Side of the index's buckets in cells (None to size them from the amount of treasures)
+        :return: The TreasureIndex, kept up to date while the treasures are collected
+        """
+        self.treasure_index = TreasureIndex(self.width, self.height, self.treasures, bucket_size)
+        return self.treasure_index
+
+    def profile(self):
+        """
+        Starts recording the timers and counters of the quest's phases (see stats).
+        """
+        if self.profiler is None:
+            self.profiler = Stats()
+
+    def phase(self, name):
+        """
+        :return: Context manager timing a phase while the map is profiled
+        """
+        return self.profiler.timer(name) if self.profiler is not None else nullcontext()
+
+    def stats(self):
+        """
+        :return: The timers and counters recorded since the map is profiled, example:
+            {"timers": {"next": {"calls": 3, "seconds": 0.02}}, "counters": {"turns": 3, "pickups": 2, ...}}
+        """
+        return (self.profiler or Stats()).report()
+
+    @property
+    def instrumented(self):
+        """
+        :return: True while the map records its events or is profiled, which only the turns played by next do (the
+            other engines play turns without them)
+        """
+        return self.events is not None or self.profiler is not None
+
+    @property
+    def recorded(self):
+        """
+        :return: True while the map records its events or a Recorder records the quest: both only know the adventurers
+            of the quest when the recording started, which cannot be added or removed until then
+        """
+        return self.events is not None or self.recorder is not None
 
     # ----- Getters ---------
 
     def get_mountains_count(self):
-        return sum(
-            [
-                self.grid[Cell(i, j)] == CellType.MOUNTAIN
-                for i in range(self.width)
-                for j in range(self.height)
-            ]
-        )
+        return self.grid.get_mountains_count()
 
     def get_treasures_count(self):
-        return sum([treasures for treasures in self.treasures.values()])
+        return self.treasures_count
 
     def get_adventurers_count(self):
         return len(self.adventurers)
 
     def get_adventurer(self, name):
-        for adv in self.adventurers.keys():
-            if adv.name == name:
-                return adv
+        """
+        :return: The first adventurer added with this name, None if there are none
+        """
+        namesakes = self.adventurers_by_name.get(name)
+        return next(iter(namesakes)) if namesakes else None
+
+    def get_random_moves(self):
+        """
+        :return: A batch of random moves for an adventurer whose script is exhausted
+        """
+        return get_random_move(self.random, RANDOM_MOVES_BATCH)
+
+    def get_previous_moves(self, adventurer):
+        """
+        :return: The movements already played by the adventurer, example: "AADA"
+        """
+        script = self.adventurers[adventurer]
+        return script.decode(0, script.played)
 
     def get_data(self):
         return {
             "Map": (self.width, self.height),
-            "Mountains": self.mountains,
+            "Mountains": list(self.grid.iter_mountains()),
             "Treasures": [(k, v) for k, v in self.treasures.items()],
             "adventurers": [(adventurer.name, adventurer.pos, DIRECTION_TO_CHAR[adventurer.direction],
                              adventurer.collected_treasures) for
                             adventurer, _ in self.adventurers.items()]
         }
 
-    def get_initial_state(self):
-        self.update_initial_state()
-        return {
-            "Map": (self.width, self.height),
-            "Mountains": self.initial_state.mountains,
-            "Treasures": [(k, v) for k, v in self.initial_state.treasures.items()],
-            "adventurers": [(adventurer.name, (adventurer.pos[1], adventurer.pos[0]), DIRECTION_TO_CHAR[adventurer.direction],
-                             "".join(moves)) for
-                            adventurer, moves in self.initial_state.adventurers.items()]
-        }
-
 
-def get_random_move():
-    return rnd.choice(["A", "A", "A", "L", "R"])
+def get_random_move(generator=rnd, amount=1):
+    """
+    :param generator: The random generator to draw the moves from (example: a seeded random.Random)
+    :param amount: Amount of moves to draw
+    :return: The random moves, example: "AAL"
+    """
+    return "".join(generator.choices(RANDOM_MOVES, k=amount))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,109 @@
+import glob
+import io
+import os
+import sys
+from contextlib import nullcontext
+from functools import partial
+
+import src.treasure_quest as tq
+from src import binary
+
+# Output of write_results standing for the standard output
+STDOUT = "-"
+
+
+def find_scenarios(pattern):
+    """
+    :param pattern: A directory (all its files are picked) or a glob pattern
+    :return: Sorted list of the scenarios paths
+    """
+    if os.path.isdir(pattern):
+        paths = (os.path.join(pattern, name) for name in os.listdir(pattern))
+        return sorted(path for path in paths if os.path.isfile(path))
+    return sorted(glob.glob(pattern, recursive=True))
+
+
+def read_paths(lines):
+    """
+    :param lines: Iterable of lines, example: the standard input
+    :return: Generator of the paths of the lines, blank lines being skipped
+    """
+    for line in lines:
+        path = line.strip()
+        if path:
+            yield path
+
+
+def run_scenario(path, seed=None):
+    """
+    Plays a quest file headlessly (text or binary format).
+
+    :param path: Path of the quest
+    :param seed: Seed of the random moves played once an adventurer's script is exhausted
+    :return: The result in the quest output format, or a comment line describing why the quest could not be played
+    """
+    try:
+        if binary.is_binary(path):
+            tm = binary.load_binary(path)
+            tm.random.seed(seed)
+        else:
+            with open(path, "r") as file:
+                tm = tq.load(file, seed=seed)
+    except (OSError, ValueError) as error:
+        return f"# error: {error}\n"
+
+    tm.run()
+    result = io.StringIO()
+    tq.write_result(tm, result)
+    return result.getvalue()
+
+
+def run_batch(paths, workers=None, chunksize=1, seed=None):
+    """
+    Plays many quests on a pool of processes, each worker keeps its imported modules between two quests.
+
+    :param paths: Paths of the quests, possibly a generator (played as they come when workers is 1)
+    :param workers: Amount of worker processes (defaults to the amount of CPUs, 1 plays in the current process)
+    :param chunksize: Amount of quests sent at once to a worker
+    :param seed: Seed of the random moves, shared by every quest
+    :return: Generator of (path, result), in input order
+    """
+    play = partial(run_scenario, seed=seed)
+    if workers == 1:
+        for path in paths:
+            yield path, play(path)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+    paths = list(paths)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from zip(paths, executor.map(play, paths, chunksize=chunksize))
+
+
+def write_results(results, output=None, output_dir=None):
+    """
+    Writes the results as soon as they are available.
+
+    :param results: Iterable of (path, result)
+    :param output: File gathering every result, each one preceded by a '# <path>' comment line ('-' for the
+        standard output)
+    :param output_dir: Directory where each result is written in '<quest name>.result'
+    :return: The amount of results written
+    """
+    if output == STDOUT:
+        context = nullcontext(sys.stdout)
+    else:
+        context = open(output, "w") if output else nullcontext()
+
+    count = 0
+    with context as file:
+        for path, result in results:
+            if file:
+                file.write(f"# {path}\n{result}")
+                file.flush()
+            if output_dir:
+                with open(os.path.join(output_dir, os.path.basename(path) + ".result"), "w") as result_file:
+                    result_file.write(result)
+            count += 1
+
+    return count
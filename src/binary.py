@@ -0,0 +1,129 @@
+import mmap
+import struct
+from functools import partial
+
+import src.treasure_quest as tq
+from src.adventurer import DIRECTION_TO_CHAR
+from src.back import TreasureMap
+from src.grid import BitmapGrid
+
+MAGIC = b"TQST"
+VERSION = 1
+
+# magic, version, flags, width, height, treasures count, adventurers count
+HEADER = struct.Struct("<4sHHIIII")
+# i, j, amount
+TREASURE = struct.Struct("<III")
+# name length, i, j, direction, script length (followed by the name and the script)
+ADVENTURER = struct.Struct("<HIIcI")
+
+
+class BinaryFormatError(ValueError):
+    pass
+
+
+def is_binary(path):
+    with open(path, "rb") as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+def dump_binary(tm, file):
+    """
+    Writes the map and the adventurers' scripts in the binary quest format.
+
+    :param tm: The TreasureMap (its adventurers' scripts are written as they currently are)
+    :param file: File opened in binary mode
+    """
+    width, height = tm.width, tm.height
+    file.write(HEADER.pack(MAGIC, VERSION, 0, width, height, len(tm.treasures), len(tm.adventurers)))
+
+    bits = bytearray((width * height + 7) // 8)
+    for i, j in tm.grid.iter_mountains():
+        k = i * height + j
+        bits[k >> 3] |= 1 << (k & 7)
+    file.write(bits)
+
+    for (i, j), amount in tm.treasures.items():
+        file.write(TREASURE.pack(i, j, amount))
+
+    for adventurer, movements in tm.adventurers.items():
+        name = adventurer.name.encode()
+        script = movements.decode().encode()
+        i, j = adventurer.pos
+        direction = DIRECTION_TO_CHAR[adventurer.direction].encode()
+        file.write(ADVENTURER.pack(len(name), i, j, direction, len(script)))
+        file.write(name)
+        file.write(script)
+
+
+def load_binary(path):
+    """
+    Loads a binary quest through a private memory mapping, the terrain bitmap is used in place by the map's grid.
+
+    :param path: Path of the binary quest
+    :return: The TreasureMap
+    """
+    with open(path, "rb") as file:
+        try:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+        except ValueError:
+            raise BinaryFormatError(f"{path}: empty file") from None
+
+    if len(buffer) < HEADER.size:
+        raise BinaryFormatError(f"{path}: truncated header")
+    magic, version, _, width, height, treasures_count, adventurers_count = HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise BinaryFormatError(f"{path}: not a binary quest")
+    if version != VERSION:
+        raise BinaryFormatError(f"{path}: unsupported version {version}")
+
+    view = memoryview(buffer)
+    offset = HEADER.size + (width * height + 7) // 8
+    if offset + treasures_count * TREASURE.size > len(view):
+        raise BinaryFormatError(f"{path}: truncated terrain or treasures table")
+    bits = view[HEADER.size:offset]
+
+    tm = TreasureMap(width=width, height=height, grid_backend=partial(BitmapGrid, bits=bits))
+
+    end = offset + treasures_count * TREASURE.size
+    for i, j, amount in TREASURE.iter_unpack(view[offset:end]):
+        tm.add_treasure(i, j, amount)
+    offset = end
+
+    plyr = []
+    try:
+        for _ in range(adventurers_count):
+            name_length, i, j, direction, script_length = ADVENTURER.unpack_from(view, offset)
+            offset += ADVENTURER.size
+            if offset + name_length + script_length > len(view):
+                raise BinaryFormatError(f"{path}: truncated adventurers table")
+            name = bytes(view[offset:offset + name_length]).decode()
+            offset += name_length
+            script = bytes(view[offset:offset + script_length]).decode()
+            offset += script_length
+            plyr.append((name, i, j, direction.decode(), script))
+    except struct.error:
+        raise BinaryFormatError(f"{path}: truncated adventurers table") from None
+    except UnicodeDecodeError as error:
+        raise BinaryFormatError(f"{path}: invalid adventurer at byte {offset}: {error.reason}") from None
+    tm.add_adventurers(plyr)
+
+    return tm
+
+
+def convert(source, destination):
+    """
+    Converts a quest between the text and the binary formats (the source format is detected).
+
+    :param source: Path of the quest to convert
+    :param destination: Path of the converted quest
+    """
+    if is_binary(source):
+        tm = load_binary(source)
+        with open(destination, "w") as file:
+            tq.write_quest(tm, file)
+    else:
+        with open(source, "r") as file:
+            tm = tq.load(file)
+        with open(destination, "wb") as file:
+            dump_binary(tm, file)
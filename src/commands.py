@@ -0,0 +1,180 @@
+from collections import namedtuple
+
+from src.adventurer import CHAR_TO_DIRECTION, DIRECTION_TO_CHAR
+from src.script import CHAR_TO_OPCODE
+
+MOVE, ADD, REMOVE = range(3)
+
+# Reasons of the rejected commands
+UNKNOWN_ADVENTURER = "unknown adventurer"
+UNAVAILABLE_CELL = "cell not accessible or occupied"
+UNKNOWN_COMMAND = "unknown command"
+INVALID_ARGUMENT = "invalid name or argument"
+INVALID_MOVES = "invalid movements"
+INVALID_DIRECTION = "invalid direction"
+RECORDED_QUEST = "adventurers cannot change while the quest is recorded"
+
+# Characters of the movements accepted from the controllers
+MOVES = frozenset(CHAR_TO_OPCODE)
+
+# Command: (kind, adventurer's name, argument), the argument being the movements of a move, the (x, y, direction,
+# movements) of an addition and None for a removal
+Rejected = namedtuple("Rejected", ["command", "reason"])
+Outcome = namedtuple("Outcome", ["name", "pos", "direction", "treasures", "moves_left"])
+TurnReport = namedtuple("TurnReport", ["turn", "rejected", "outcomes"])
+
+
+class CommandQueue:
+    """
+    Commands of external controllers (bots, players) for a TreasureMap, queued at any time and applied in bulk at the
+    next turn boundary, in submission order:
+        - move: appends movements to the script of a named adventurer, played from the next turn: the random moves
+          drawn once its movements were over are dropped
+        - add: adds an adventurer to the quest
+        - remove: removes an adventurer from the quest
+
+    Additions and removals are rejected while the quest is recorded (see TreasureMap.recorded).
+
+    The queue can drive the quest turn by turn (see step) or be the observer of TreasureMap.run.
+    """
+
+    def __init__(self, tm):
+        """
+        :param tm: The TreasureMap commanded
+        """
+        self.map = tm
+        self.pending = []
+        self.rejected = []
+        # End of the movements given to each adventurer (its script then its commanded moves), random moves follow
+        self.ends = {adventurer: len(script) for adventurer, script in tm.adventurers.items()}
+
+    def __len__(self):
+        return len(self.pending)
+
+    def __call__(self, tm):
+        """
+        Applies the pending commands, the rejected ones are kept in the rejected attribute.
+        """
+        self.rejected += self.apply()
+
+    def move(self, name, movements):
+        """
+        :param movements: The movements played once the adventurer's movements are over, example: "AADAGA"
+        """
+        self.pending.append((MOVE, name, movements))
+
+    def add(self, name, x, y, direction, movements=""):
+        self.pending.append((ADD, name, (x, y, direction, movements)))
+
+    def remove(self, name):
+        self.pending.append((REMOVE, name, None))
+
+    def submit(self, commands):
+        """
+        :param commands: Iterable of commands as (kind, name, argument), example: [(MOVE, "Lara", "AAD")]
+        """
+        self.pending += commands
+
+    def apply(self):
+        """
+        Applies the pending commands. The movements of an adventurer are compiled into its script at once.
+
+        :return: The rejected commands, as Rejected(command, reason), the malformed ones included (see check)
+        """
+        commands, self.pending = self.pending, []
+        tm = self.map
+        rejected = []
+        movements = {}
+
+        for command in commands:
+            reason = check(command)
+            if reason is not None:
+                rejected.append(Rejected(command, reason))
+                continue
+
+            kind, name, argument = command
+            if kind != MOVE and tm.recorded:
+                rejected.append(Rejected(command, RECORDED_QUEST))
+            elif kind == MOVE:
+                adventurer = tm.get_adventurer(name)
+                if adventurer is None:
+                    rejected.append(Rejected(command, UNKNOWN_ADVENTURER))
+                else:
+                    movements.setdefault(adventurer, []).append(argument)
+            elif kind == ADD:
+                adventurer = tm.add_adventurer(name, *argument)
+                if adventurer is None:
+                    rejected.append(Rejected(command, UNAVAILABLE_CELL))
+                else:
+                    self.ends[adventurer] = len(tm.adventurers[adventurer])
+            elif kind == REMOVE:
+                adventurer = tm.get_adventurer(name)
+                if adventurer is None:
+                    rejected.append(Rejected(command, UNKNOWN_ADVENTURER))
+                else:
+                    tm.remove_adventurer(adventurer)
+                    self.ends.pop(adventurer, None)
+
+        for adventurer, batch in movements.items():
+            script = tm.adventurers.get(adventurer)
+            if script is not None:
+                script.truncate(self.ends.get(adventurer, len(script)))
+                script.extend("".join(batch))
+                self.ends[adventurer] = len(script)
+                tm.turns = max(tm.turns, len(script) - script.played)
+        return rejected
+
+    def step(self):
+        """
+        Applies the pending commands, then plays a turn (exhausted scripts are extended with random moves, like in
+        TreasureMap.next).
+
+        :return: TurnReport(turn, rejected commands, outcome of each adventurer), an outcome being
+            Outcome(name, pos, direction, treasures, moves_left), example: Outcome("Lara", (1, 2), "S", 3, 12)
+        """
+        rejected = self.apply()
+        tm = self.map
+        tm.next()
+        tm.turns = max(tm.turns - 1, 0)
+
+        outcomes = [
+            Outcome(adventurer.name, adventurer.pos, DIRECTION_TO_CHAR[adventurer.direction],
+                    adventurer.collected_treasures, len(script) - script.played)
+            for adventurer, script in tm.adventurers.items()
+        ]
+        return TurnReport(tm.iteration, rejected, outcomes)
+
+
+def check(command):
+    """
+    Validates a command coming from a controller, before it is applied.
+
+    :return: The reason to reject the command, None when it is well-formed
+    """
+    try:
+        kind, name, argument = command
+    except (TypeError, ValueError):
+        return INVALID_ARGUMENT
+    if kind not in (MOVE, ADD, REMOVE):
+        return UNKNOWN_COMMAND
+    if not isinstance(name, str):
+        return INVALID_ARGUMENT
+
+    if kind == MOVE:
+        movements = argument
+    elif kind == ADD:
+        if not isinstance(argument, (tuple, list)) or len(argument) != 4:
+            return INVALID_ARGUMENT
+        x, y, direction, movements = argument
+        if not all(isinstance(value, int) and not isinstance(value, bool) for value in (x, y)):
+            return INVALID_ARGUMENT
+        if direction not in CHAR_TO_DIRECTION:
+            return INVALID_DIRECTION
+    else:
+        return None
+
+    if not isinstance(movements, str):
+        return INVALID_ARGUMENT
+    if not MOVES.issuperset(movements):
+        return INVALID_MOVES
+    return None
@@ -0,0 +1,192 @@
+import io
+import struct
+from collections import namedtuple
+
+from src.adventurer import DIRECTIONS_CLOCKWISE
+
+TURN, MOVE, ROTATE, BLOCKED, PICKUP = range(5)
+
+# Kind, adventurer's index, i, j, value (turn number, direction, collision flag or collected treasures)
+RECORD = struct.Struct("<BIiii")
+
+MAGIC = b"TQEV"
+VERSION = 1
+HEADER = struct.Struct("<4sHI")
+
+# Amount of events kept in memory by default
+EVENTS_CAPACITY = 1 << 16
+
+Event = namedtuple("Event", ["kind", "adventurer", "i", "j", "value"])
+
+
+class TraceFormatError(ValueError):
+    pass
+
+
+class EventLog:
+    """
+    Structured events of a quest (turns, moves, rotations, blocked moves and pickups), recorded as fixed size records.
+
+    The latest events are kept in a ring buffer and every event can also be appended to a binary trace file,
+    which starts with the quest as it was when the recording started: the trace can be replayed (see replay).
+    Events are only formatted when they are read (see lines).
+    """
+
+    def __init__(self, tm, capacity=EVENTS_CAPACITY, trace=None):
+        """
+        :param tm: The recorded TreasureMap
+        :param capacity: Amount of events kept in memory
+        :param trace: Path of the binary trace file (None to only keep the events in memory)
+        """
+        self.capacity = max(1, capacity)
+        self.buffer = bytearray(self.capacity * RECORD.size)
+        self.recorded = 0
+
+        self.names = []
+        self.index = {}
+        for adventurer in tm.adventurers:
+            self.register(adventurer)
+
+        self.trace = None
+        if trace is not None:
+            from src.treasure_quest import write_quest
+
+            quest = io.StringIO()
+            write_quest(tm, quest)
+            quest = quest.getvalue().encode()
+            self.trace = open(trace, "wb")
+            self.trace.write(HEADER.pack(MAGIC, VERSION, len(quest)) + quest)
+
+    def __len__(self):
+        return min(self.recorded, self.capacity)
+
+    def __iter__(self):
+        """
+        :return: Generator of the events kept in memory, oldest first
+        """
+        return self.since(0)
+
+    def since(self, recorded):
+        """
+        :param recorded: Amount of events recorded at some point (see the recorded attribute)
+        :return: Generator of the events recorded since then which are still kept in memory, oldest first
+        """
+        for k in range(max(recorded, self.recorded - len(self)), self.recorded):
+            yield Event(*RECORD.unpack_from(self.buffer, (k % self.capacity) * RECORD.size))
+
+    def register(self, adventurer):
+        self.index[adventurer] = len(self.names)
+        self.names.append(adventurer.name)
+
+    def record(self, kind, adventurer, i, j, value):
+        """
+        :param adventurer: The adventurer concerned by the event (None for the end of a turn)
+        """
+        k = 0 if adventurer is None else self.index[adventurer]
+        RECORD.pack_into(self.buffer, (self.recorded % self.capacity) * RECORD.size, kind, k, i, j, value)
+        self.recorded += 1
+        if self.trace is not None:
+            self.trace.write(RECORD.pack(kind, k, i, j, value))
+
+    def lines(self):
+        """
+        :return: Generator of the events kept in memory, formatted, example: "Lara moves to (1, 2) facing EAST"
+        """
+        for event in self:
+            yield format_event(event, self.names)
+
+    def close(self):
+        if self.trace is not None:
+            self.trace.close()
+            self.trace = None
+
+
+def format_event(event, names):
+    """
+    :param names: Names of the adventurers, indexed like the events
+    :return: The event as text, example: "Lara picks up a treasure at (1, 2) (3 collected)"
+    """
+    kind, k, i, j, value = event
+    if kind == TURN:
+        return f"Turn {value}"
+    if kind == MOVE:
+        return f"{names[k]} moves to {(i, j)} facing {DIRECTIONS_CLOCKWISE[value].name}"
+    if kind == ROTATE:
+        return f"{names[k]} turns to the {DIRECTIONS_CLOCKWISE[value].name}"
+    if kind == BLOCKED:
+        return f"{names[k]} is blocked by {'an adventurer' if value else 'the terrain'} at {(i, j)}"
+    if kind == PICKUP:
+        return f"{names[k]} picks up a treasure at {(i, j)} ({value} collected)"
+    return f"Unknown event {kind}"
+
+
+def read_trace(path):
+    """
+    :param path: Path of a binary trace file
+    :return: (quest as text, generator of the events)
+    """
+    file = open(path, "rb")
+    header = file.read(HEADER.size)
+    if len(header) < HEADER.size:
+        file.close()
+        raise TraceFormatError(f"{path}: truncated header")
+    magic, version, length = HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION:
+        file.close()
+        raise TraceFormatError(f"{path}: not an event trace (version {VERSION})")
+    quest = file.read(length).decode()
+
+    def events():
+        with file:
+            while True:
+                data = file.read(RECORD.size)
+                if len(data) < RECORD.size:
+                    return
+                yield Event(*RECORD.unpack(data))
+
+    return quest, events()
+
+
+def replay(path):
+    """
+    Rebuilds the map recorded in a trace by applying its events, without playing any script.
+
+    :param path: Path of a binary trace file
+    :return: The TreasureMap at the end of the trace
+    """
+    from src.treasure_quest import integrate
+
+    quest, events = read_trace(path)
+    tm = integrate(quest)
+    adventurers = list(tm.adventurers)
+
+    for event in events:
+        apply(tm, adventurers, event)
+    return tm
+
+
+def apply(tm, adventurers, event):
+    """
+    Applies a recorded event to a map built from the recorded quest.
+
+    :param adventurers: Adventurers of the map, indexed like the events
+    """
+    kind, k, i, j, value = event
+    if kind == TURN:
+        tm.iteration = value
+        tm.turns -= 1
+    elif kind == MOVE:
+        adventurer = adventurers[k]
+        del tm.occupied[adventurer.pos]
+        adventurer.pos, adventurer.dir = (i, j), value
+        tm.occupied[adventurer.pos] = adventurer
+    elif kind == ROTATE:
+        adventurers[k].dir = value
+    elif kind == PICKUP:
+        adventurer = adventurers[k]
+        tm.treasures[(i, j)] -= 1
+        tm.treasures_count -= 1
+        if tm.treasures[(i, j)] == 0:
+            tm.pop_treasure((i, j))
+        adventurer.collected_treasures = value
+        tm.leader_board.update(adventurer)
@@ -0,0 +1,96 @@
+import heapq
+
+from src.script import FORWARD, OPCODE_TO_ROTATION
+
+
+class FastForwardEngine:
+    """
+    Event driven turn engine: an adventurer is only played on the turns where it may interact with the rest of the map.
+
+    While an adventurer turns, plays unknown moves or walks against a mountain or the map's edge, it has no
+    effect on the others: it is put asleep until the end of the current run of its script, and the skipped
+    steps are applied at once when it wakes up. The turns where every adventurer sleeps are skipped.
+    Results are identical to TreasureMap.run.
+    """
+
+    def __init__(self, treasure_map):
+        self.map = treasure_map
+        self.adventurers = list(treasure_map.adventurers.items())
+
+        # (first skipped turn, rotation per turn) of each sleeping adventurer
+        self.asleep = [None] * len(self.adventurers)
+        self.buckets = {}
+        self.times = []
+
+    def run(self):
+        """
+        Simulates the quest like TreasureMap.run.
+
+        :return: The amount of turns simulated
+        """
+        tm = self.map
+        if tm.instrumented:
+            raise ValueError("FastForwardEngine neither records events nor profiles, play the map with TreasureMap.run")
+        start = tm.iteration
+        stop = start + tm.turns if tm.turns > 0 and tm.treasures_count else start
+
+        for k in range(len(self.adventurers)):
+            self.wake(k, start)
+
+        while self.times and self.times[0] < stop:
+            t = heapq.heappop(self.times)
+            for k in sorted(self.buckets.pop(t)):
+                self.play(k, t)
+
+            if not tm.treasures_count:
+                stop = t + 1
+
+        for k in range(len(self.adventurers)):
+            self.flush(k, stop)
+
+        tm.iteration = stop
+        tm.turns -= stop - start
+        return stop - start
+
+    def wake(self, k, t):
+        bucket = self.buckets.get(t)
+        if bucket is None:
+            self.buckets[t] = [k]
+            heapq.heappush(self.times, t)
+        else:
+            bucket.append(k)
+
+    def play(self, k, t):
+        """
+        Plays the turn t of the adventurer k, then plans the next turn where it has to be played.
+        """
+        tm = self.map
+        adventurer, script = self.adventurers[k]
+        self.flush(k, t)
+
+        opcode = script.next()
+        if opcode is None:
+            script.extend(tm.get_random_moves())
+            opcode = script.next()
+        tm.handle_adventurer(adventurer, opcode)
+
+        opcode, run = script.peek()
+        if opcode is None or (opcode == FORWARD and tm.is_accessible(adventurer.get_next_pos())):
+            self.wake(k, t + 1)
+        else:
+            self.asleep[k] = (t + 1, OPCODE_TO_ROTATION[opcode])
+            self.wake(k, t + 1 + run)
+
+    def flush(self, k, t):
+        """
+        Applies the steps skipped by a sleeping adventurer before the turn t.
+        """
+        if self.asleep[k] is None:
+            return
+
+        adventurer, script = self.adventurers[k]
+        since, rotation = self.asleep[k]
+        script.skip(t - since)
+        if rotation:
+            adventurer.rotate(rotation * (t - since))
+        self.asleep[k] = None
@@ -0,0 +1,174 @@
+from enum import Enum
+
+
+class CellType(Enum):
+    PLAIN = 1
+    MOUNTAIN = 2
+
+
+PLAIN = CellType.PLAIN.value
+MOUNTAIN = CellType.MOUNTAIN.value
+
+
+class Grid:
+    """
+    Terrain of the map stored in a flat bytearray (one byte per cell, row-major order).
+    The cell (i, j) is stored at the index i * height + j.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.cells = self.allocate(width * height)
+
+    @staticmethod
+    def allocate(size):
+        return bytearray([PLAIN]) * size
+
+    def __contains__(self, position):
+        i, j = position
+        return 0 <= i < self.width and 0 <= j < self.height
+
+    def __getitem__(self, position):
+        if position not in self:
+            raise KeyError(position)
+        i, j = position
+        return CellType(self.cells[i * self.height + j])
+
+    def __len__(self):
+        return self.width * self.height
+
+    def add_mountains(self, mountains):
+        """
+        Turns the given cells into mountains, out of bound coordinates are ignored.
+
+        :param mountains: Iterable of mountains coordinates, example [(0, 0), (0, 1)]
+        """
+        for i, j in set(mountains):
+            if 0 <= i < self.width and 0 <= j < self.height:
+                self.cells[i * self.height + j] = MOUNTAIN
+
+    def add_mountain(self, position):
+        if position in self:
+            i, j = position
+            self.cells[i * self.height + j] = MOUNTAIN
+
+    def is_plain(self, position):
+        i, j = position
+        return 0 <= i < self.width and 0 <= j < self.height and self.cells[i * self.height + j] == PLAIN
+
+    def get_mountains_count(self):
+        return self.cells.count(MOUNTAIN)
+
+    def row(self, i):
+        """
+        :param i: Index of the row
+        :return: The cell types of the row as bytes
+        """
+        return bytes(self.cells[i * self.height:(i + 1) * self.height])
+
+    def iter_mountains(self):
+        """
+        :return: Generator over the mountains coordinates, in row-major order.
+        """
+        cells, height = self.cells, self.height
+        k = cells.find(MOUNTAIN)
+        while k >= 0:
+            yield divmod(k, height)
+            k = cells.find(MOUNTAIN, k + 1)
+
+
+class NumpyGrid(Grid):
+    """
+    Terrain of the map stored in a NumPy uint8 array (requires numpy).
+    """
+
+    @staticmethod
+    def allocate(size):
+        import numpy as np
+
+        return np.full(size, PLAIN, dtype=np.uint8)
+
+    def add_mountains(self, mountains):
+        import numpy as np
+
+        coords = np.array(list(set(mountains)), dtype=np.int64).reshape(-1, 2)
+        i, j = coords[:, 0], coords[:, 1]
+        inside = (0 <= i) & (i < self.width) & (0 <= j) & (j < self.height)
+        self.cells[i[inside] * self.height + j[inside]] = MOUNTAIN
+
+    def get_mountains_count(self):
+        import numpy as np
+
+        return int(np.count_nonzero(self.cells == MOUNTAIN))
+
+    def row(self, i):
+        return self.cells[i * self.height:(i + 1) * self.height].tobytes()
+
+    def iter_mountains(self):
+        import numpy as np
+
+        for k in np.flatnonzero(self.cells == MOUNTAIN):
+            yield divmod(int(k), self.height)
+
+
+BITS_TO_CELLS = [bytes(MOUNTAIN if byte >> bit & 1 else PLAIN for bit in range(8)) for byte in range(256)]
+
+
+class BitmapGrid(Grid):
+    """
+    Terrain of the map stored as a packed bitmap (one bit per cell, set for mountains, row-major order).
+    The bitmap can be any writable buffer, example: a view over a memory-mapped file.
+    """
+
+    def __init__(self, width, height, bits=None):
+        self.width = width
+        self.height = height
+        self.bits = bits if bits is not None else bytearray((width * height + 7) // 8)
+
+    @property
+    def cells(self):
+        """
+        :return: The terrain expanded to one byte per cell (copy)
+        """
+        return bytearray(b"".join(map(BITS_TO_CELLS.__getitem__, self.bits)))[:len(self)]
+
+    def __getitem__(self, position):
+        if position not in self:
+            raise KeyError(position)
+        return CellType.PLAIN if self.is_plain(position) else CellType.MOUNTAIN
+
+    def add_mountains(self, mountains):
+        for position in set(mountains):
+            self.add_mountain(position)
+
+    def add_mountain(self, position):
+        if position in self:
+            i, j = position
+            k = i * self.height + j
+            self.bits[k >> 3] |= 1 << (k & 7)
+
+    def is_plain(self, position):
+        i, j = position
+        if not (0 <= i < self.width and 0 <= j < self.height):
+            return False
+        k = i * self.height + j
+        return not self.bits[k >> 3] >> (k & 7) & 1
+
+    def get_mountains_count(self):
+        return bin(int.from_bytes(self.bits, "little")).count("1")
+
+    def row(self, i):
+        return bytes(self.cells_range(i * self.height, (i + 1) * self.height))
+
+    def cells_range(self, start, stop):
+        bits = self.bits
+        for k in range(start, stop):
+            yield MOUNTAIN if bits[k >> 3] >> (k & 7) & 1 else PLAIN
+
+    def iter_mountains(self):
+        for index, byte in enumerate(self.bits):
+            if byte:
+                for bit in range(8):
+                    if byte >> bit & 1:
+                        yield divmod(index * 8 + bit, self.height)
@@ -0,0 +1,64 @@
+from bisect import bisect_left, insort
+
+
+class LeaderBoard:
+    """
+    Adventurers kept ordered by collected treasures (best first), ties being kept in arrival order.
+    Only the adventurers whose score changes are moved in the board.
+    """
+
+    def __init__(self, adventurers=()):
+        self.entries = []
+        self.keys = {}
+        self.arrivals = 0
+
+        for adventurer in adventurers:
+            self.add(adventurer)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, adventurer):
+        key = (-adventurer.collected_treasures, self.arrivals)
+        self.arrivals += 1
+        self.keys[adventurer] = key
+        insort(self.entries, (key, adventurer))
+
+    def remove(self, adventurer):
+        key = self.keys.pop(adventurer)
+        del self.entries[bisect_left(self.entries, (key,))]
+
+    def update(self, adventurer):
+        """
+        Moves the adventurer according to its current amount of collected treasures.
+        """
+        key = self.keys[adventurer]
+        if key[0] == -adventurer.collected_treasures:
+            return
+
+        del self.entries[bisect_left(self.entries, (key,))]
+        key = (-adventurer.collected_treasures, key[1])
+        self.keys[adventurer] = key
+        insort(self.entries, (key, adventurer))
+
+    def copy(self, mapping=None):
+        """
+        :param mapping: Adventurers of the copy, indexed by the adventurers of this board (the same ones if None)
+        :return: An independent board with the same order
+        """
+        board = LeaderBoard()
+        board.arrivals = self.arrivals
+        if mapping is None:
+            board.entries = list(self.entries)
+            board.keys = dict(self.keys)
+        else:
+            board.entries = [(key, mapping[adventurer]) for key, adventurer in self.entries]
+            board.keys = {mapping[adventurer]: key for adventurer, key in self.keys.items()}
+        return board
+
+    def top(self, size=None):
+        """
+        :param size: Amount of adventurers requested (all of them if None)
+        :return: The best adventurers, best first
+        """
+        return [adventurer for _, adventurer in self.entries[:size]]
@@ -0,0 +1,84 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import src.treasure_quest as tq
+
+
+def play_random_quest(seed):
+    """
+    Plays headlessly the random quest generated from a seed.
+
+    :param seed: Seed of the random quest
+    :return: Summary of the quest, example: {"seed": 3, "turns": 40, "exhausted": False, "total": 21,
+        "collected": 12, "scores": {"Lara": 5, "Tom": 7}}
+    """
+    tm = tq.random_map(seed=seed)
+    total = tm.get_treasures_count()
+    tm.run()
+
+    scores = {adventurer.name: adventurer.collected_treasures for adventurer in tm.adventurers}
+    return {
+        "seed": seed,
+        "turns": tm.iteration,
+        "exhausted": not tm.treasures,
+        "total": total,
+        "collected": total - tm.get_treasures_count(),
+        "scores": scores,
+    }
+
+
+def sweep(runs, seed=0, workers=1, chunksize=16):
+    """
+    Plays the random quests generated from the seeds seed, seed + 1, ..., seed + runs - 1 and aggregates their results.
+
+    :param runs: Amount of random quests
+    :param seed: First seed
+    :param workers: Amount of worker processes (1 plays in the current process)
+    :param chunksize: Amount of quests sent at once to a worker
+    :return: The aggregated statistics (see aggregate)
+    """
+    seeds = range(seed, seed + runs)
+    if workers == 1:
+        return aggregate(map(play_random_quest, seeds))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return aggregate(executor.map(play_random_quest, seeds, chunksize=chunksize))
+
+
+def aggregate(results):
+    """
+    :param results: Iterable of quests summaries (see play_random_quest)
+    :return: Statistics of the quests:
+        - runs: Amount of quests
+        - collected: Distribution of the amount of collected treasures ({amount: quests})
+        - collected_ratio: Mean ratio of collected treasures
+        - exhausted: Amount of quests where every treasure has been collected
+        - turns_to_exhaustion: Distribution of the turns needed to collect every treasure ({turns: quests})
+        - win_rates: Ratio of the quests won by each adventurer, among the quests played ({name: ratio})
+    """
+    runs, exhausted, ratios = 0, 0, 0
+    collected, turns_to_exhaustion = Counter(), Counter()
+    played, wins = Counter(), Counter()
+
+    for result in results:
+        runs += 1
+        collected[result["collected"]] += 1
+        ratios += result["collected"] / result["total"] if result["total"] else 1
+        if result["exhausted"]:
+            exhausted += 1
+            turns_to_exhaustion[result["turns"]] += 1
+
+        scores = result["scores"]
+        best = max(scores.values(), default=0)
+        played.update(scores.keys())
+        if best:
+            wins.update(name for name, score in scores.items() if score == best)
+
+    return {
+        "runs": runs,
+        "collected": dict(sorted(collected.items())),
+        "collected_ratio": ratios / runs if runs else 0,
+        "exhausted": exhausted,
+        "turns_to_exhaustion": dict(sorted(turns_to_exhaustion.items())),
+        "win_rates": {name: wins[name] / played[name] for name in sorted(played)},
+    }
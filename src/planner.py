@@ -0,0 +1,588 @@
+import heapq
+import re
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict, deque
+from itertools import product
+
+from src.adventurer import DIRECTION_DELTAS
+from src.grid import PLAIN
+from src.script import Script, FORWARD
+from src.treasures import TreasureIndex
+
+# Amount of distance fields kept by a Planner (a field takes 16 bytes per cell)
+FIELDS_CACHE_SIZE = 8
+
+# Estimates of the weighted searches are rounded to eighths of a move
+WEIGHT_SCALE = 8
+# The greedy plan searches the shortest moves up to this distance, and moves at most PLAN_WEIGHT times longer beyond
+EXACT_DISTANCE = 64
+PLAN_WEIGHT = 1.125
+
+# An adventurer blocked on its way onto a treasure cell waits for it to be left this amount of turns before going around
+WAIT_TURNS = 2
+# Moves around a blocked cell are at most this amount of moves longer than the planned ones
+DETOUR_MOVES = 16
+# Times an adventurer can be blocked between two pickups before it is no longer piloted
+BLOCKS_PER_PICKUP = 8
+
+# Character of the move between two states: forward, quarter turn right, quarter turn left
+FORWARD_CHAR, RIGHT_CHAR, LEFT_CHAR = "A", "D", "G"
+# Fewest quarter turns to turn clockwise by (direction + 0, 1, 2 or 3) & 3
+TURN_CHARS = ["", RIGHT_CHAR, RIGHT_CHAR * 2, LEFT_CHAR]
+
+PLAIN_RUN = re.compile(re.escape(bytes([PLAIN])) + b"+")
+
+# Minimum amount of quarter turns to move onto a cell, indexed by turns_index(di, dj) | direction where (di, dj) is
+# the offset of the cell from the adventurer
+TURNS_ESTIMATE = [0] * 64
+for south, north, east, west in product(range(2), repeat=4):
+    needed = [direction for direction, flag in enumerate((north, east, south, west)) if flag]
+    for direction in range(4):
+        turns = min([min((direction - other) % 4, (other - direction) % 4) for other in needed], default=0)
+        TURNS_ESTIMATE[(south << 3 | north << 2 | east << 1 | west) << 2 | direction] = turns + max(len(needed) - 1, 0)
+
+
+class Planner:
+    """
+    Shortest moves of the adventurers on the terrain of a TreasureMap, as "A", "D" and "G" strings.
+
+    A state is a cell and a direction, stored as cell * 4 + direction where cell = i * height + j.
+    Every move (forward or quarter turn) takes one turn. A treasure is picked up when an adventurer moves forward onto
+    its cell. The terrain is copied once and the distance fields are cached until a mountain is added to the map.
+
+    Plans are searched leg by leg with A* (see search and plan), ignoring the other adventurers: a distance field (see
+    field and route) gives the moves from every state onto one target, but a field per treasure takes too long and too
+    much memory on large maps. Once the plans are applied, the planner pilots the adventurers as the observer of
+    TreasureMap.run (see __call__).
+    """
+
+    def __init__(self, tm, cache_size=FIELDS_CACHE_SIZE):
+        """
+        :param tm: The TreasureMap whose terrain is planned on
+        :param cache_size: Amount of distance fields kept
+        """
+        self.map = tm
+        self.cache_size = cache_size
+        self.version = None
+        self.runs = None
+        self.fields = OrderedDict()
+        # Course of the piloted adventurers (see apply), and the amount of pickups planned in each cell by their courses
+        self.courses = {}
+        self.pickups = {}
+
+    def __call__(self, tm):
+        """
+        Pilots the adventurers after each turn: an adventurer blocked by another one goes around it (or waits for it to
+        leave a treasure cell) instead of playing the rest of its plan from the wrong cell, and an adventurer done with
+        its plan heads for the closest treasure no course plans to pick up. An adventurer blocked too often on its plan
+        heads for the closest treasures one at a time, and is no longer piloted once blocked too often again.
+        """
+        height = tm.height
+        for adventurer, script in tm.adventurers.items():
+            course = self.courses.get(adventurer)
+            if course is None:
+                continue
+            if adventurer.collected_treasures != course.collected:
+                course.collected, course.blocks = adventurer.collected_treasures, BLOCKS_PER_PICKUP
+
+            if adventurer.pos != course.pos:
+                course.pos, course.waits = adventurer.pos, 0
+                self.release(course, adventurer.pos[0] * height + adventurer.pos[1])
+            elif script.played <= course.end and script.last() == FORWARD:
+                if course.blocks == 0 and course.target is None:
+                    # Blocked too often on its plan, the adventurer is planned again one treasure at a time
+                    self.forget(course)
+                    course.end, course.blocks = script.played, BLOCKS_PER_PICKUP
+                elif course.blocks == 0 or not self.go_around(adventurer, script, course):
+                    self.drop(adventurer)
+                    continue
+                else:
+                    course.blocks -= 1
+
+            if script.played >= course.end or course.target is not None and not tm.treasures.get(
+                    divmod(course.target, height)):
+                if not self.next_leg(adventurer, script, course):
+                    self.drop(adventurer)
+
+    @property
+    def terrain(self):
+        """
+        :return: The terrain as bytes (one cell type per byte), copied again once the map's terrain has changed
+        """
+        if self.version != self.map.terrain.version:
+            self.cells = bytes(self.map.grid.cells)
+            self.runs = None
+            self.fields.clear()
+            self.version = self.map.terrain.version
+        return self.cells
+
+    def forward(self, state):
+        """
+        :return: The state reached by moving forward, None when the move is blocked by a mountain or the map's edge
+        """
+        cells = self.terrain
+        height, size = self.map.height, len(cells)
+        cell, direction = state >> 2, state & 3
+        if direction == 0:
+            target = cell - height if cell >= height else -1
+        elif direction == 1:
+            target = cell + 1 if (cell + 1) % height else -1
+        elif direction == 2:
+            target = cell + height if cell + height < size else -1
+        else:
+            target = cell - 1 if cell % height else -1
+        if target < 0 or cells[target] != PLAIN:
+            return None
+        return target << 2 | direction
+
+    def component(self, cell):
+        """
+        The plain cells are split into runs along the rows, and the runs touching each other in consecutive rows are
+        merged (union-find). Runs are computed once per terrain.
+
+        :return: The label of the cell's connected component (cells with the same label can reach each other)
+        """
+        terrain = self.terrain
+        if self.runs is None:
+            self.label_runs(terrain)
+
+        i, j = divmod(cell, self.map.height)
+        k = bisect_right(self.runs[i], j) - 1 + self.first_runs[i]
+        parents = self.run_parents
+        root = k
+        while parents[root] != root:
+            root = parents[root]
+        while parents[k] != root:
+            parents[k], k = root, parents[k]
+        return root
+
+    def label_runs(self, terrain):
+        height = self.map.height
+        parents = self.run_parents = []
+        self.runs, self.first_runs = [], []
+
+        def union(a, b):
+            while parents[a] != a:
+                a = parents[a]
+            while parents[b] != b:
+                b = parents[b]
+            if a != b:
+                parents[max(a, b)] = min(a, b)
+
+        previous = []
+        for i in range(self.map.width):
+            first = len(parents)
+            row = [(match.start() - i * height, match.end() - i * height)
+                   for match in PLAIN_RUN.finditer(terrain, i * height, (i + 1) * height)]
+            parents.extend(range(first, first + len(row)))
+
+            # Runs sharing a column with a run of the previous row
+            a = b = 0
+            while a < len(previous) and b < len(row):
+                (start, stop, k), (other_start, other_stop) = previous[a], row[b]
+                if start < other_stop and other_start < stop:
+                    union(k, first + b)
+                if stop < other_stop:
+                    a += 1
+                else:
+                    b += 1
+
+            self.runs.append([start for start, _ in row])
+            self.first_runs.append(first)
+            previous = [(start, stop, first + b) for b, (start, stop) in enumerate(row)]
+
+    def search(self, state, target, weight=1, avoid=None, limit=None):
+        """
+        A* search of the shortest moves onto the target, guided by the amount of forward moves and quarter turns
+        the target is at least away. States of equal estimate are expanded deepest first. The start cell is a target
+        only once left.
+
+        Far targets take long to search as every path around the mountains of the same length is tried: the estimate
+        can be weighted to find moves at most weight times longer than the shortest ones, much faster.
+
+        :param state: The start state
+        :param target: The target cell
+        :param weight: Weight of the estimate (1 for the shortest moves)
+        :param avoid: A cell not to move onto, example: a cell occupied by another adventurer
+        :param limit: Maximum amount of moves beyond the least amount the target is away (None for no limit)
+        :return: (state reached, moves), None when the target cannot be reached
+        """
+        cells = self.terrain
+        width, height = self.map.width, self.map.height
+        if cells[target] != PLAIN or self.component(state >> 2) != self.component(target):
+            return None
+        ti, tj = divmod(target, height)
+
+        i, j = divmod(state >> 2, height)
+        scale = round(weight * WEIGHT_SCALE)
+        lowest = scale * (TURNS_ESTIMATE[turns_index(ti - i, tj - j) | state & 3] + abs(ti - i) + abs(tj - j))
+        parents = {state: None}
+        costs = {state: 0}
+        # Stacks of states by estimated total cost, from the lowest estimate
+        buckets = [[state]]
+        for index, bucket in enumerate(buckets):
+            if limit is not None and index > limit * WEIGHT_SCALE:
+                return None
+            while bucket:
+                current = bucket.pop()
+                cost = costs[current] + 1
+                cell, direction = current >> 2, current & 3
+                i, j = divmod(cell, height)
+
+                di, dj = DIRECTION_DELTAS[direction]
+                ahead = cell + di * height + dj
+                if 0 <= i + di < width and 0 <= j + dj < height and cells[ahead] == PLAIN and ahead != avoid:
+                    if ahead == target:
+                        return target << 2 | direction, self.moves(parents, current) + FORWARD_CHAR
+                    following = [(i + di, j + dj, ahead << 2 | direction)]
+                else:
+                    following = []
+                following.append((i, j, cell << 2 | (direction + 1) & 3))
+                following.append((i, j, cell << 2 | (direction + 3) & 3))
+
+                for i, j, other in following:
+                    if cost < costs.get(other, cost + 1):
+                        costs[other] = cost
+                        parents[other] = current
+                        k = WEIGHT_SCALE * cost - lowest + scale * (abs(ti - i) + abs(tj - j) + TURNS_ESTIMATE[
+                            ((ti > i) << 3 | (ti < i) << 2 | (tj > j) << 1 | (tj < j)) << 2 | other & 3])
+                        k = max(k, index)
+                        while len(buckets) <= k:
+                            buckets.append([])
+                        buckets[k].append(other)
+        return None
+
+    def field(self, target):
+        """
+        Breadth-first search from the target backwards over the whole map.
+
+        :param target: The target cell
+        :return: Amount of turns needed to move onto the target from each state (-1 when it cannot be reached)
+        """
+        terrain = self.terrain
+        field = self.fields.get(target)
+        if field is not None:
+            self.fields.move_to_end(target)
+            return field
+
+        height, size = self.map.height, len(terrain)
+        field = array("i", [-1]) * (4 * size)
+        queue = deque()
+        # Moving forward onto the target from its neighbours
+        for direction in range(4):
+            state = target << 2 | direction
+            behind = self.backward(state, height, size)
+            if behind is not None and field[behind] < 0:
+                field[behind] = 1
+                queue.append(behind)
+
+        while queue:
+            state = queue.popleft()
+            distance = field[state] + 1
+            cell, direction = state >> 2, state & 3
+            previous = [cell << 2 | (direction + 1) & 3, cell << 2 | (direction + 3) & 3]
+            if cell != target:
+                behind = self.backward(state, height, size)
+                if behind is not None:
+                    previous.append(behind)
+            for other in previous:
+                if field[other] < 0:
+                    field[other] = distance
+                    queue.append(other)
+
+        self.fields[target] = field
+        if len(self.fields) > self.cache_size:
+            self.fields.popitem(last=False)
+        return field
+
+    def backward(self, state, height, size):
+        """
+        :return: The state from which moving forward reaches this state, None when it is a mountain or off the map
+        """
+        cell, direction = state >> 2, state & 3
+        if direction == 0:
+            source = cell + height if cell + height < size else -1
+        elif direction == 1:
+            source = cell - 1 if cell % height else -1
+        elif direction == 2:
+            source = cell - height if cell >= height else -1
+        else:
+            source = cell + 1 if (cell + 1) % height else -1
+        if source < 0 or self.cells[source] != PLAIN:
+            return None
+        return source << 2 | direction
+
+    def route(self, state, target):
+        """
+        Follows the distance field of the target, the cells crossed on the way are not avoided.
+
+        :return: The shortest moves to move onto the target, None when it cannot be reached
+        """
+        field = self.field(target)
+        if field[state] < 0:
+            return None
+
+        moves = []
+        while True:
+            distance = field[state]
+            ahead = self.forward(state)
+            if ahead is not None and ahead >> 2 == target and distance == 1:
+                moves.append(FORWARD_CHAR)
+                return "".join(moves)
+
+            cell, direction = state >> 2, state & 3
+            candidates = [(ahead, FORWARD_CHAR), (cell << 2 | (direction + 1) & 3, RIGHT_CHAR),
+                          (cell << 2 | (direction + 3) & 3, LEFT_CHAR)]
+            state, move = next((other, move) for other, move in candidates
+                               if other is not None and field[other] == distance - 1)
+            moves.append(move)
+
+    def moves(self, parents, state):
+        """
+        :return: The moves leading to the state in a search tree of (state: previous state)
+        """
+        moves = []
+        previous = parents[state]
+        while previous is not None:
+            if previous >> 2 != state >> 2:
+                moves.append(FORWARD_CHAR)
+            else:
+                moves.append(RIGHT_CHAR if (state - previous) & 3 == 1 else LEFT_CHAR)
+            state, previous = previous, parents[previous]
+        return "".join(reversed(moves))
+
+    def state(self, adventurer):
+        i, j = adventurer.pos
+        return (i * self.map.height + j) << 2 | adventurer.dir
+
+    def plan(self):
+        """
+        Greedy assignment: the adventurer whose plan ends first goes to the closest treasure left it can reach,
+        until every treasure is planned to be collected (a cell holding several treasures is visited several times).
+        The treasures crossed on the way are collected too.
+
+        Adventurers are not planned around each other: a move blocked by another adventurer shifts the rest of its
+        plan, which can be planned again from there.
+
+        :return: The planned moves of each adventurer, example: {adventurer: "AADA", ...}
+        """
+        height = self.map.height
+        treasures = TreasureIndex(self.map.width, height, dict(self.map.treasures))
+        plans = {adventurer: [] for adventurer in self.map.adventurers}
+        adventurers = list(plans)
+        # Target cells an adventurer cannot reach though they are in its component: its start cell when it is walled in
+        unreachable = [set() for _ in adventurers]
+
+        # (turn when the plan ends, order, state) of the adventurers still planning
+        queue = [(0, k, self.state(adventurer)) for k, adventurer in enumerate(adventurers)]
+        heapq.heapify(queue)
+        while queue and treasures:
+            turn, k, state = heapq.heappop(queue)
+            cell = state >> 2
+            component, skipped = self.component(cell), unreachable[k]
+            target = treasures.nearest(*divmod(cell, height),
+                                       lambda other: other not in skipped and self.component(other) == component)
+            if target is None:
+                continue
+
+            distance = abs(target[0] - cell // height) + abs(target[1] - cell % height)
+            found = self.search(state, target[0] * height + target[1],
+                                weight=1 if distance <= EXACT_DISTANCE else PLAN_WEIGHT)
+            if found is None:
+                skipped.add(target[0] * height + target[1])
+                heapq.heappush(queue, (turn, k, state))
+                continue
+            state, moves = found
+            for crossed in self.crossed(state, moves):
+                treasures.collect(*divmod(crossed, height))
+            plans[adventurers[k]].append(moves)
+            heapq.heappush(queue, (turn + len(moves), k, state))
+
+        return {adventurer: "".join(moves) for adventurer, moves in plans.items()}
+
+    def crossed(self, state, moves):
+        """
+        :param state: The state reached at the end of the moves
+        :return: The cells entered by the forward moves, last one first
+        """
+        cells = []
+        height = self.map.height
+        for move in reversed(moves):
+            cell, direction = state >> 2, state & 3
+            if move == FORWARD_CHAR:
+                cells.append(cell)
+                di, dj = DIRECTION_DELTAS[direction]
+                state = (cell - di * height - dj) << 2 | direction
+            else:
+                state = cell << 2 | (direction + (3 if move == RIGHT_CHAR else 1)) & 3
+        return cells
+
+    def apply(self, plans=None):
+        """
+        Replaces the movements left in the adventurers' scripts by the planned ones, the adventurers are piloted from
+        now on (see __call__).
+
+        :param plans: The planned moves of each adventurer (see plan), planned now if None
+        """
+        tm = self.map
+        for adventurer, moves in (self.plan() if plans is None else plans).items():
+            played = tm.adventurers[adventurer].played
+            script = Script(tm.get_previous_moves(adventurer) + moves)
+            script.skip(played)
+            tm.adventurers[adventurer] = script
+            tm.turns = max(tm.turns, len(moves))
+
+            # Pickups of the plan, a cell holding several treasures being planned as many times at most
+            course = self.courses[adventurer] = Course(len(script), adventurer.pos, adventurer.collected_treasures)
+            state = self.state(adventurer)
+            for move in moves:
+                if move != FORWARD_CHAR:
+                    state = turn(state, move)
+                    continue
+                state = self.forward(state)
+                if tm.treasures.get(divmod(state >> 2, tm.height), 0) > self.pickups.get(state >> 2, 0):
+                    self.plan_pickup(course, state >> 2)
+
+    def plan_pickup(self, course, cell):
+        course.pickups[cell] = course.pickups.get(cell, 0) + 1
+        self.pickups[cell] = self.pickups.get(cell, 0) + 1
+
+    def release(self, course, cell):
+        """
+        Forgets a pickup the course planned in the cell, if any (the adventurer entered the cell or went around it).
+        """
+        if cell in course.pickups:
+            for pickups in (course.pickups, self.pickups):
+                pickups[cell] -= 1
+                if not pickups[cell]:
+                    del pickups[cell]
+
+    def forget(self, course):
+        """
+        Forgets every pickup the course planned, they are left to the others.
+        """
+        for cell, count in course.pickups.items():
+            self.pickups[cell] -= count
+            if not self.pickups[cell]:
+                del self.pickups[cell]
+        course.pickups = {}
+
+    def drop(self, adventurer):
+        """
+        Stops piloting the adventurer.
+        """
+        self.forget(self.courses.pop(adventurer))
+
+    def go_around(self, adventurer, script, course):
+        """
+        Replaces the moves left in the course of an adventurer blocked by another one: it goes around the blocked cell
+        back onto its planned moves, or tries its move again at the next turn.
+
+        :return: False when the adventurer was blocked by a mountain added to the map after its plan
+        """
+        tm = self.map
+        state = self.state(adventurer)
+        ahead = self.forward(state)
+        if ahead is None:
+            return False
+
+        # Planned moves from the state, the first one moving onto the blocked cell, until the next forward move
+        blocked = ahead >> 2
+        moves = FORWARD_CHAR + script.decode(script.played, course.end)
+        rejoin = None
+        for k in range(1, min(len(moves), DETOUR_MOVES)):
+            if moves[k] != FORWARD_CHAR:
+                ahead = turn(ahead, moves[k])
+                continue
+            ahead = self.forward(ahead)
+            if ahead is not None:
+                rejoin = k
+            break
+
+        found = None
+        if rejoin is not None and (course.waits >= WAIT_TURNS or not tm.treasures.get(divmod(blocked, tm.height))):
+            found = self.search(state, ahead >> 2, avoid=blocked, limit=DETOUR_MOVES)
+        if found is None:
+            course.waits += 1
+        else:
+            reached, detour = found
+            moves = detour + TURN_CHARS[(ahead - reached) & 3] + moves[rejoin + 1:]
+            self.release(course, blocked)
+
+        script.truncate(script.played)
+        script.extend(moves)
+        course.end = len(script)
+        tm.turns = max(tm.turns, len(moves))
+        return True
+
+    def next_leg(self, adventurer, script, course):
+        """
+        Replaces the moves left in the course of an adventurer by the moves onto the closest treasure left which no
+        course plans to pick up.
+
+        :return: False when there are no such treasures the adventurer can reach
+        """
+        tm = self.map
+        height = tm.height
+        index = tm.treasure_index if tm.treasure_index is not None else tm.index_treasures()
+        state = self.state(adventurer)
+        component = self.component(state >> 2)
+        if course.target is not None:
+            self.release(course, course.target)
+
+        def accept(cell):
+            return (cell not in course.skipped and index.amounts[divmod(cell, height)] > self.pickups.get(cell, 0)
+                    and self.component(cell) == component)
+
+        while True:
+            target = index.nearest(*adventurer.pos, accept)
+            if target is None:
+                return False
+            target = target[0] * height + target[1]
+            distance = abs(target // height - adventurer.pos[0]) + abs(target % height - adventurer.pos[1])
+            found = self.search(state, target, weight=1 if distance <= EXACT_DISTANCE else PLAN_WEIGHT)
+            if found is not None:
+                break
+            course.skipped.add(target)
+
+        script.truncate(script.played)
+        script.extend(found[1])
+        course.end, course.target = len(script), target
+        self.plan_pickup(course, target)
+        tm.turns = max(tm.turns, len(found[1]))
+        return True
+
+
+class Course:
+    """
+    Piloted adventurer: the end of its planned moves in its script, its position after the last turn, its collected
+    treasures and the times it can still be blocked until its next pickup, the turns it waited for the cell ahead, the
+    treasure cell it heads for once its plan is over, the cells it cannot reach and the amount of pickups it plans in
+    each cell.
+    """
+
+    __slots__ = ("end", "pos", "collected", "blocks", "waits", "target", "skipped", "pickups")
+
+    def __init__(self, end, pos, collected):
+        self.end, self.pos, self.collected = end, pos, collected
+        self.blocks = BLOCKS_PER_PICKUP
+        self.waits = 0
+        self.target = None
+        self.skipped = set()
+        self.pickups = {}
+
+
+def turn(state, move):
+    """
+    :param move: A quarter turn, RIGHT_CHAR or LEFT_CHAR
+    :return: The state after the quarter turn
+    """
+    return state & ~3 | (state + (1 if move == RIGHT_CHAR else 3)) & 3
+
+
+def turns_index(di, dj):
+    """
+    :return: Index in TURNS_ESTIMATE of the cell at the offset (di, dj), for an adventurer facing north
+    """
+    return ((di > 0) << 3 | (di < 0) << 2 | (dj > 0) << 1 | (dj < 0)) << 2
@@ -0,0 +1,217 @@
+import io
+import struct
+import zlib
+from bisect import bisect_right
+
+import src.treasure_quest as tq
+
+MAGIC = b"TQRC"
+VERSION = 1
+
+# magic, version, keyframe interval, adventurers count, compressed quest length (followed by the quest)
+HEADER = struct.Struct("<4sHIII")
+# first turn, amount of turns, compressed keyframe length, compressed moves length (followed by both)
+BLOCK = struct.Struct("<IIII")
+# turns left, treasure cells count (followed by the adventurers and the treasures)
+KEYFRAME = struct.Struct("<qI")
+# i, j, direction, collected treasures
+ADVENTURER_STATE = struct.Struct("<iiBI")
+# i, j, amount
+TREASURE = struct.Struct("<iiI")
+
+# Amount of turns between two keyframes
+KEYFRAME_INTERVAL = 1024
+
+# Four opcodes of 2 bits per byte, first opcode in the lowest bits
+UNPACK_TABLE = [bytes((byte >> shift) & 3 for shift in (0, 2, 4, 6)) for byte in range(256)]
+
+
+class RecordingFormatError(ValueError):
+    pass
+
+
+class Recorder:
+    """
+    Observer recording a quest (see TreasureMap.run): the quest as it is when the recording starts, then blocks of turns.
+
+    Each block starts with a keyframe (positions, directions, scores, treasures and turns left) followed by the
+    opcode played by every adventurer at each turn, packed on 2 bits. Blocks are compressed with zlib.
+    """
+
+    def __init__(self, tm, path, interval=KEYFRAME_INTERVAL):
+        """
+        :param tm: The recorded TreasureMap
+        :param path: Path of the recording
+        :param interval: Amount of turns between two keyframes
+        """
+        self.map = tm
+        tm.recorder = self
+        self.scripts = list(tm.adventurers.values())
+        self.interval = max(1, interval)
+
+        quest = io.StringIO()
+        tq.write_quest(tm, quest, scripts=False)
+        quest = zlib.compress(quest.getvalue().encode())
+
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, self.interval, len(self.scripts), len(quest)) + quest)
+        self.begin_block()
+
+    def __call__(self, tm):
+        self.moves += bytes(script.last() for script in self.scripts)
+        self.turns += 1
+        if self.turns == self.interval:
+            self.write_block()
+            self.begin_block()
+
+    def begin_block(self):
+        self.first = self.map.iteration
+        self.keyframe = zlib.compress(keyframe(self.map))
+        self.moves = bytearray()
+        self.turns = 0
+
+    def write_block(self):
+        moves = zlib.compress(pack_moves(self.moves))
+        self.file.write(BLOCK.pack(self.first, self.turns, len(self.keyframe), len(moves)))
+        self.file.write(self.keyframe)
+        self.file.write(moves)
+
+    def close(self):
+        """
+        Writes the last block (its keyframe is the final state when no turn has been played since the previous block).
+        """
+        self.write_block()
+        self.file.close()
+        self.map.recorder = None
+
+
+class Recording:
+    """
+    Recording read back for replays: any turn is reached from the previous keyframe.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            header = file.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise RecordingFormatError(f"{path}: truncated header")
+            magic, version, self.interval, self.adventurers, length = HEADER.unpack(header)
+            if magic != MAGIC:
+                raise RecordingFormatError(f"{path}: not a recording")
+            if version != VERSION:
+                raise RecordingFormatError(f"{path}: unsupported version {version}")
+            self.quest = zlib.decompress(file.read(length)).decode()
+
+            # (first turn, amount of turns, offset of the keyframe, keyframe length, moves length) of each block
+            self.blocks = []
+            while True:
+                data = file.read(BLOCK.size)
+                if len(data) < BLOCK.size:
+                    break
+                first, turns, keyframe_length, moves_length = BLOCK.unpack(data)
+                self.blocks.append((first, turns, file.tell(), keyframe_length, moves_length))
+                file.seek(keyframe_length + moves_length, io.SEEK_CUR)
+
+        if not self.blocks:
+            raise RecordingFormatError(f"{path}: no turn recorded")
+
+    @property
+    def first_turn(self):
+        return self.blocks[0][0]
+
+    @property
+    def last_turn(self):
+        first, turns, *_ = self.blocks[-1]
+        return first + turns
+
+    def seek(self, turn):
+        """
+        :param turn: Turn number (the map's iteration), clamped to the recorded turns
+        :return: The TreasureMap at this turn
+        """
+        return next(self.replay(turn))
+
+    def replay(self, turn=None):
+        """
+        :param turn: First turn to replay (defaults to the first recorded turn)
+        :return: Generator of the TreasureMap at this turn, then after each of the following turns
+        """
+        turn = self.first_turn if turn is None else min(max(turn, self.first_turn), self.last_turn)
+        k = bisect_right([block[0] for block in self.blocks], turn) - 1
+
+        tm = tq.integrate(self.quest)
+        adventurers = list(tm.adventurers)
+        count = len(adventurers)
+
+        with open(self.path, "rb") as file:
+            for index, (first, turns, offset, keyframe_length, moves_length) in enumerate(self.blocks[k:]):
+                file.seek(offset)
+                data = file.read(keyframe_length + moves_length)
+                if index == 0:
+                    restore_keyframe(tm, zlib.decompress(data[:keyframe_length]), first)
+                    if turn == first:
+                        yield tm
+                moves = unpack_moves(zlib.decompress(data[keyframe_length:]), turns * count)
+
+                for t in range(turns):
+                    for adventurer, opcode in zip(adventurers, moves[t * count:(t + 1) * count]):
+                        tm.handle_adventurer(adventurer, opcode)
+                    tm.iteration += 1
+                    tm.turns -= 1
+                    if tm.iteration >= turn:
+                        yield tm
+
+
+def keyframe(tm):
+    """
+    :return: The mutable state of the map, as bytes
+    """
+    parts = [KEYFRAME.pack(tm.turns, len(tm.treasures))]
+    parts += [ADVENTURER_STATE.pack(*adventurer.pos, adventurer.dir, adventurer.collected_treasures)
+              for adventurer in tm.adventurers]
+    parts += [TREASURE.pack(i, j, amount) for (i, j), amount in tm.treasures.items()]
+    return b"".join(parts)
+
+
+def restore_keyframe(tm, data, turn):
+    """
+    Sets the mutable state of a map built from the recorded quest.
+    """
+    turns, treasures_count = KEYFRAME.unpack_from(data)
+    offset = KEYFRAME.size
+
+    tm.occupied = {}
+    for adventurer in tm.adventurers:
+        i, j, adventurer.dir, adventurer.collected_treasures = ADVENTURER_STATE.unpack_from(data, offset)
+        adventurer.pos = (i, j)
+        tm.occupied[adventurer.pos] = adventurer
+        tm.leader_board.update(adventurer)
+        offset += ADVENTURER_STATE.size
+
+    tm.treasures = {}
+    for _ in range(treasures_count):
+        i, j, amount = TREASURE.unpack_from(data, offset)
+        tm.treasures[(i, j)] = amount
+        offset += TREASURE.size
+    tm.treasures_count = sum(tm.treasures.values())
+    if tm.treasure_index is not None:
+        tm.index_treasures(tm.treasure_index.size)
+
+    tm.iteration, tm.turns = turn, turns
+
+
+def pack_moves(opcodes):
+    """
+    :param opcodes: One opcode per byte
+    :return: The opcodes packed on 2 bits
+    """
+    padded = bytes(opcodes) + bytes(-len(opcodes) % 4)
+    return bytes(a | b << 2 | c << 4 | d << 6 for a, b, c, d in zip(*[iter(padded)] * 4))
+
+
+def unpack_moves(data, count):
+    """
+    :return: The first count opcodes packed in data, one per byte
+    """
+    return b"".join([UNPACK_TABLE[byte] for byte in data])[:count]
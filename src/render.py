@@ -0,0 +1,68 @@
+import sys
+import time
+
+CLEAR_SCREEN = "\x1b[2J\x1b[H"
+CLEAR_LINE_END = "\x1b[K"
+CLEAR_SCREEN_END = "\x1b[J"
+
+
+def move_cursor(line):
+    return f"\x1b[{line + 1};1H"
+
+
+class TerminalRenderer:
+    """
+    Observer drawing the map on the terminal after each simulated turn.
+    Only the lines which changed since the previous frame are redrawn, using ANSI cursor positioning.
+    """
+
+    def __init__(self, fps=2, frame_skip=0, stream=None):
+        """
+        :param fps: Maximum amount of frames drawn per second (0 or None to draw as fast as possible)
+        :param frame_skip: Amount of turns simulated without being drawn between two frames
+        :param stream: Text stream of the terminal (defaults to the standard output)
+        """
+        self.delay = 1 / fps if fps else 0
+        self.frame_skip = frame_skip if frame_skip > 0 else 0
+        self.stream = stream or sys.stdout
+        self.turns = 0
+
+        self.lines = None
+        self.last_frame = 0
+
+    def __call__(self, treasure_map):
+        self.turns += 1
+        if (self.turns - 1) % (self.frame_skip + 1):
+            return
+
+        self.draw(str(treasure_map).split("\n"))
+        if self.delay:
+            time.sleep(max(0, self.last_frame + self.delay - time.monotonic()))
+            self.last_frame = time.monotonic()
+
+    def draw(self, lines):
+        """
+        :param lines: Lines of the frame to draw
+        """
+        if self.lines is None:
+            output = [CLEAR_SCREEN, "\n".join(lines)]
+        else:
+            output = [
+                move_cursor(k) + line + CLEAR_LINE_END
+                for k, (line, previous) in enumerate(zip(lines, self.lines))
+                if line != previous
+            ]
+            if len(lines) > len(self.lines):
+                output.append(move_cursor(len(self.lines)) + "\n".join(lines[len(self.lines):]))
+            elif len(lines) < len(self.lines):
+                output.append(move_cursor(len(lines)) + CLEAR_SCREEN_END)
+            output.append(move_cursor(len(lines)))
+
+        self.lines = lines
+        self.stream.write("".join(output))
+        self.stream.flush()
+
+    def clear(self):
+        self.lines = None
+        self.stream.write(CLEAR_SCREEN)
+        self.stream.flush()
@@ -0,0 +1,66 @@
+import random
+
+from src.back import TreasureMap
+from src.treasure_quest import ADVENTURERS_NAMES, int_to_roman
+
+SCRIPT_MOVES = "AAAAGD"
+
+
+def generate(width, height, **options):
+    """
+    Generates a quest of any size (see elements for the options).
+
+    :return: The TreasureMap
+    """
+    return TreasureMap(**elements(width, height, **options))
+
+
+def elements(width, height, mountain_density=0.1, treasures=None, adventurers=None, script_length=20,
+             max_treasures=5, seed=None, script_moves=SCRIPT_MOVES):
+    """
+    Draws the elements of a quest of any size, every element standing on its own cell.
+
+    :param width: Width of the map
+    :param height: Height of the map
+    :param mountain_density: Ratio of the cells covered by mountains
+    :param treasures: Amount of cells holding treasures (defaults to one cell out of 20)
+    :param adventurers: Amount of adventurers (defaults to one per 50 cells)
+    :param script_length: Length of the adventurers' scripts (random moves are played once they are exhausted)
+    :param max_treasures: Maximum amount of treasures on a cell
+    :param seed: Seed of the quest generation and of the adventurers' moves (same seed, same quest)
+    :param script_moves: Moves the scripts are drawn from, example: "AAAAGDX" (unknown moves are played as no move)
+    :return: The arguments of TreasureMap, example: {"width": 3, "height": 4, "mountains": [(1, 0)], ...}
+    """
+    rnd = random.Random(seed)
+    size = max(0, width) * max(0, height)
+
+    mountains = min(size, int(size * mountain_density))
+    treasures = min(size - mountains, size // 20 if treasures is None else treasures)
+    adventurers = min(size - mountains - treasures, max(1, size // 50) if adventurers is None else adventurers)
+    cells = rnd.sample(range(size), mountains + treasures + adventurers)
+
+    mtn = [divmod(cell, height) for cell in cells[:mountains]]
+    tsr = [(*divmod(cell, height), rnd.randint(1, max_treasures)) for cell in cells[mountains:mountains + treasures]]
+    plyr = [
+        (adventurer_name(k), *divmod(cell, height), rnd.choice("NSEW"), "".join(rnd.choices(script_moves, k=script_length)))
+        for k, cell in enumerate(cells[mountains + treasures:])
+    ]
+
+    return {"width": width, "height": height, "mountains": mtn, "treasures": tsr, "adventurers": plyr,
+            "seed": rnd.getrandbits(64)}
+
+
+def adventurer_name(k):
+    """
+    :return: Unique name of the k-th adventurer, example: "Lara", ..., "Zain", "Lara I", ...
+    """
+    name = ADVENTURERS_NAMES[k % len(ADVENTURERS_NAMES)]
+    repeat = k // len(ADVENTURERS_NAMES)
+    return name + (" " + int_to_roman(repeat) if repeat else "")
+
+
+def square_side(cells):
+    """
+    :return: Side of the square map of about the given amount of cells, example: 10 ** 6 cells gives 1000
+    """
+    return max(1, round(cells ** 0.5))
@@ -0,0 +1,196 @@
+from itertools import groupby
+
+from src.adventurer import RelativeDirection
+
+FORWARD, RIGHT, LEFT, NOOP = range(4)
+
+CHAR_TO_OPCODE = {
+    "A": FORWARD,
+    "R": RIGHT,
+    "D": RIGHT,
+    "L": LEFT,
+    "G": LEFT,
+}
+
+# Canonical character of each opcode (the unknown moves are decoded as "X")
+OPCODE_TO_CHAR = "ADGX"
+DECODE_TABLE = bytes.maketrans(bytes(range(len(OPCODE_TO_CHAR))), OPCODE_TO_CHAR.encode())
+
+OPCODE_TO_RELATIVE_DIRECTION = {
+    RIGHT: RelativeDirection.RIGHT,
+    LEFT: RelativeDirection.LEFT,
+}
+
+# Quarter turns clockwise of each opcode
+OPCODE_TO_ROTATION = [0, RelativeDirection.RIGHT.value, RelativeDirection.LEFT.value, 0]
+
+MAX_RUN = 255
+
+
+class Script:
+    """
+    Adventurer's movements compiled into runs of opcodes: pairs of bytes (opcode, run length),
+    example: "AAADA" is stored as (FORWARD, 3), (RIGHT, 1), (FORWARD, 1).
+    The script is played step by step through a cursor.
+    """
+
+    __slots__ = ("code", "length", "played", "index", "offset")
+
+    def __init__(self, movements=""):
+        self.code = bytearray()
+        self.length = 0
+
+        self.played = 0
+        self.index = 0
+        self.offset = 0
+
+        self.extend(movements)
+
+    def __len__(self):
+        return self.length
+
+    def __str__(self):
+        return self.decode()
+
+    def extend(self, movements):
+        """
+        :param movements: The movements to compile at the end of the script, example: "AADAGA"
+        """
+        for opcode, run in groupby(CHAR_TO_OPCODE.get(c, NOOP) for c in movements):
+            self.append(opcode, sum(1 for _ in run))
+
+    def append(self, opcode, count=1):
+        code = self.code
+        if type(code) is bytes:
+            # The code is shared with copies of the script (see copy)
+            code = self.code = bytearray(code)
+        self.length += count
+
+        # The last run can only grow while the cursor has not gone past it
+        if len(code) - 2 >= self.index and code[-2] == opcode:
+            grow = min(count, MAX_RUN - code[-1])
+            code[-1] += grow
+            count -= grow
+
+        while count > 0:
+            run = min(count, MAX_RUN)
+            code += bytes((opcode, run))
+            count -= run
+
+    def truncate(self, length):
+        """
+        Drops the steps after the first length ones, which cannot have been played yet. A state taken before (see state)
+        can no longer be restored.
+        """
+        drop = self.length - max(length, self.played)
+        if drop <= 0:
+            return
+        code = self.code = bytearray(self.code)
+        self.length -= drop
+
+        while drop:
+            run = code[-1]
+            if run > drop:
+                code[-1] -= drop
+                break
+            del code[-2:]
+            drop -= run
+
+        # The cursor cannot stay at the end of the run it was in
+        if self.offset and self.offset == code[self.index + 1]:
+            self.index += 2
+            self.offset = 0
+
+    def copy(self):
+        """
+        :return: A script with the same movements and cursor, sharing the compiled code until one of them is extended
+        """
+        if type(self.code) is not bytes:
+            self.code = bytes(self.code)
+
+        script = Script.__new__(Script)
+        script.code, script.length = self.code, self.length
+        script.played, script.index, script.offset = self.played, self.index, self.offset
+        return script
+
+    def state(self):
+        """
+        :return: The cursor and the end of the code, enough to undo the moves played and appended since (see restore)
+        """
+        return self.length, self.played, self.index, self.offset, len(self.code), bytes(self.code[-2:])
+
+    def restore(self, state):
+        """
+        :param state: A state returned by the state method of this script
+        """
+        self.length, self.played, self.index, self.offset, size, last = state
+        if len(self.code) != size or self.code[-2:] != last:
+            self.code = bytearray(self.code[:size])
+            self.code[-2:] = last
+
+    def next(self):
+        """
+        :return: The next opcode to play, None when the script is exhausted.
+        """
+        code, index = self.code, self.index
+        if index >= len(code):
+            return None
+
+        self.played += 1
+        self.offset += 1
+        if self.offset == code[index + 1]:
+            self.index += 2
+            self.offset = 0
+        return code[index]
+
+    def peek(self):
+        """
+        :return: The next opcode and the amount of times it is repeated from the cursor, (None, 0) when exhausted.
+        """
+        if self.index >= len(self.code):
+            return None, 0
+        return self.code[self.index], self.code[self.index + 1] - self.offset
+
+    def last(self):
+        """
+        :return: The last opcode played, None when nothing has been played yet.
+        """
+        if self.offset:
+            return self.code[self.index]
+        return self.code[self.index - 2] if self.index else None
+
+    def skip(self, steps):
+        """
+        Moves the cursor forward without playing the steps.
+        """
+        steps = min(steps, self.length - self.played)
+        self.played += steps
+        code = self.code
+        while steps:
+            left = code[self.index + 1] - self.offset
+            if steps < left:
+                self.offset += steps
+                return
+            steps -= left
+            self.index += 2
+            self.offset = 0
+
+    def runs(self):
+        """
+        :return: Generator of (opcode, run length)
+        """
+        code = self.code
+        for k in range(0, len(code), 2):
+            yield code[k], code[k + 1]
+
+    def expand(self):
+        """
+        :return: One opcode per step, as bytes
+        """
+        return b"".join(bytes((opcode,)) * run for opcode, run in self.runs())
+
+    def decode(self, start=0, stop=None):
+        """
+        :return: The movements of the steps [start, stop) using canonical characters, example: "AADAGA"
+        """
+        return self.expand()[start:stop].translate(DECODE_TABLE).decode()
@@ -0,0 +1,268 @@
+import asyncio
+import io
+import json
+from collections import deque
+
+import src.treasure_quest as tq
+from src.events import MOVE, ROTATE, PICKUP
+
+# Amount of messages waiting for a viewer before it is considered too slow
+VIEWER_QUEUE_SIZE = 64
+# Seconds between two turns of a session
+TURN_INTERVAL = 0.5
+
+# Events sent to the viewers, the other ones do not change the map
+BROADCAST_EVENTS = (MOVE, ROTATE, PICKUP)
+
+
+def encode(message):
+    """
+    :return: The message as a line of compact JSON, as bytes
+    """
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode()
+
+
+class Viewer:
+    """
+    Subscriber of a Session, whose messages are queued without ever waiting for the viewer.
+
+    A viewer whose queue is full is too slow: its pending turns are dropped and it is sent the whole state of the map
+    instead, from which the next turns apply again.
+    """
+
+    def __init__(self, size=VIEWER_QUEUE_SIZE):
+        """
+        :param size: Amount of messages kept for the viewer (at least 2)
+        """
+        self.size = max(2, size)
+        self.messages = deque()
+        self.ready = asyncio.Event()
+        self.dropped = 0
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        """
+        :return: The next message, as a line of JSON (see encode)
+        """
+        while not self.messages:
+            if self.closed:
+                raise StopAsyncIteration
+            self.ready.clear()
+            await self.ready.wait()
+        return self.messages.popleft()
+
+    def send(self, message, state):
+        """
+        :param message: The encoded message
+        :param state: Function returning the encoded state of the map, sent instead when the viewer is too slow
+        """
+        if len(self.messages) >= self.size:
+            self.dropped += len(self.messages)
+            self.messages.clear()
+            message = state()
+        self.messages.append(message)
+        self.ready.set()
+
+    def close(self, message=None):
+        """
+        :param message: The last message, always delivered
+        """
+        if message is not None:
+            if len(self.messages) >= self.size:
+                self.dropped += len(self.messages)
+                self.messages.clear()
+            self.messages.append(message)
+        self.closed = True
+        self.ready.set()
+
+
+class Session:
+    """
+    Quest played turn after turn on the event loop, its changes being broadcast to its viewers.
+
+    Messages (lines of JSON):
+        - state: {"type": "state", "session": "quest", "turn": 3, "quest": "C - 3 - 4\\nM - 1 - 0\\n...",
+          "scores": [2, 0]}, the map in the text format (adventurers without movements) and the adventurers' treasures
+        - turn: {"type": "turn", "session": "quest", "turn": 4, "events": [[kind, adventurer, i, j, value], ...]},
+          the moves, rotations and pickups of the turn (see events, adventurers are indexed like in the quest)
+        - end: {"type": "end", "session": "quest", "turn": 12, "result": "C - 3 - 4\\n..."}
+    """
+
+    def __init__(self, name, tm, interval=TURN_INTERVAL):
+        """
+        :param name: Name of the session
+        :param tm: The TreasureMap played
+        :param interval: Seconds between two turns
+        """
+        self.name = name
+        self.map = tm
+        self.interval = interval
+        # A turn records at most two events per adventurer (move and pickup) and its end
+        self.log = tm.events if tm.events is not None else tm.record_events(capacity=4 * len(tm.adventurers) + 16)
+        self.viewers = set()
+        self.encoded_state = None
+
+    @property
+    def finished(self):
+        return not (self.map.turns > 0 and self.map.treasures_count)
+
+    def state(self):
+        """
+        :return: The encoded state of the map, encoded once per turn
+        """
+        if self.encoded_state is None:
+            quest = io.StringIO()
+            tq.write_quest(self.map, quest, scripts=False)
+            scores = [adventurer.collected_treasures for adventurer in self.map.adventurers]
+            self.encoded_state = encode({"type": "state", "session": self.name, "turn": self.map.iteration,
+                                         "quest": quest.getvalue(), "scores": scores})
+        return self.encoded_state
+
+    def subscribe(self, size=VIEWER_QUEUE_SIZE):
+        """
+        :param size: Amount of messages kept for the viewer
+        :return: A Viewer, whose first message is the current state
+        """
+        viewer = Viewer(size)
+        if self.finished:
+            viewer.close(self.end())
+        else:
+            viewer.send(self.state(), self.state)
+            self.viewers.add(viewer)
+        return viewer
+
+    def unsubscribe(self, viewer):
+        self.viewers.discard(viewer)
+
+    def step(self):
+        """
+        Plays one turn.
+
+        :return: The encoded turn message
+        """
+        tm = self.map
+        recorded = self.log.recorded
+        tm.next()
+        tm.turns -= 1
+        self.encoded_state = None
+
+        changes = [list(event) for event in self.log.since(recorded) if event.kind in BROADCAST_EVENTS]
+        return encode({"type": "turn", "session": self.name, "turn": tm.iteration, "events": changes})
+
+    def end(self):
+        result = tq.format_result(self.map.get_data())
+        return encode({"type": "end", "session": self.name, "turn": self.map.iteration, "result": result})
+
+    async def run(self):
+        """
+        Plays the quest until its end, waiting interval seconds between turns (other sessions play meanwhile).
+        """
+        while not self.finished:
+            await asyncio.sleep(self.interval)
+            message = self.step()
+            for viewer in self.viewers:
+                viewer.send(message, self.state)
+
+        end = self.end()
+        for viewer in self.viewers:
+            viewer.close(end)
+        self.viewers.clear()
+
+
+class QuestServer:
+    """
+    Hosts many sessions on one event loop and streams them to TCP clients.
+
+    Protocol (one command per line, answered with lines of JSON):
+        - "list": {"type": "sessions", "sessions": [{"name": "quest", "turn": 3, "viewers": 1, "finished": false}]}
+        - "watch NAME": the messages of the session (see Session) until its end
+    """
+
+    def __init__(self, interval=TURN_INTERVAL, queue_size=VIEWER_QUEUE_SIZE):
+        """
+        :param interval: Seconds between two turns of the sessions
+        :param queue_size: Amount of messages kept for each viewer
+        """
+        self.interval = interval
+        self.queue_size = queue_size
+        self.sessions = {}
+        self.tasks = set()
+        self.running = False
+
+    def add(self, tm, name=None):
+        """
+        Hosts a quest, which starts playing once the server is started.
+
+        :return: The Session
+        """
+        name = name or f"quest-{len(self.sessions) + 1}"
+        session = self.sessions[name] = Session(name, tm, interval=self.interval)
+        if self.running:
+            self.launch(session)
+        return session
+
+    def launch(self, session):
+        task = asyncio.get_running_loop().create_task(session.run())
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    def start(self):
+        """
+        Starts playing the hosted sessions (must be called from the event loop).
+        """
+        self.running = True
+        for session in self.sessions.values():
+            self.launch(session)
+
+    async def wait(self):
+        """
+        Waits until every session has ended.
+        """
+        while self.tasks:
+            await asyncio.gather(*self.tasks)
+
+    def listing(self):
+        sessions = [{"name": name, "turn": session.map.iteration, "viewers": len(session.viewers),
+                     "finished": session.finished} for name, session in self.sessions.items()]
+        return encode({"type": "sessions", "sessions": sessions})
+
+    async def handle(self, reader, writer):
+        """
+        Serves a TCP client (see the protocol).
+        """
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command, _, argument = line.decode().strip().partition(" ")
+                if command == "list":
+                    writer.write(self.listing())
+                elif command == "watch" and argument in self.sessions:
+                    session = self.sessions[argument]
+                    viewer = session.subscribe(self.queue_size)
+                    try:
+                        async for message in viewer:
+                            writer.write(message)
+                            await writer.drain()
+                    finally:
+                        session.unsubscribe(viewer)
+                else:
+                    writer.write(encode({"type": "error", "message": f"unknown command: {line.decode().strip()}"}))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        """
+        Plays the sessions and serves the clients until cancelled.
+        """
+        server = await asyncio.start_server(self.handle, host, port)
+        self.start()
+        async with server:
+            await server.serve_forever()
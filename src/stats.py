@@ -0,0 +1,58 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# Counters of the turns, of the moves forward by outcome and of the treasures picked up (see TreasureMap.next)
+TURNS = "turns"
+MOVES_DONE, MOVES_BLOCKED, MOVES_COLLIDED = "moves_done", "moves_blocked", "moves_collided"
+PICKUPS = "pickups"
+
+
+class Stats:
+    """
+    Timers and counters of the phases of a quest, only recorded when the map is profiled.
+
+    Timers: parse, create_map, add_treasures, add_adventurers, plan, next, render, format_result
+    Counters: turns, moves_attempted, moves_done, moves_blocked (mountain or map's edge), moves_collided
+    (other adventurer), pickups
+    """
+
+    def __init__(self):
+        self.timers = {}
+        self.counters = Counter()
+
+    def add_time(self, phase, seconds):
+        calls, total = self.timers.get(phase, (0, 0))
+        self.timers[phase] = (calls + 1, total + seconds)
+
+    @contextmanager
+    def timer(self, phase):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(phase, time.perf_counter() - start)
+
+    def count(self, counter, amount=1):
+        self.counters[counter] += amount
+
+    def report(self):
+        """
+        :return: The timers and counters, example: {"timers": {"next": {"calls": 3, "seconds": 0.02}, ...},
+            "counters": {"turns": 3, "moves_attempted": 12, ...}}
+        """
+        counters = dict(self.counters)
+        counters["moves_attempted"] = sum(self.counters[counter] for counter in (MOVES_DONE, MOVES_BLOCKED, MOVES_COLLIDED))
+        return {
+            "timers": {phase: {"calls": calls, "seconds": seconds} for phase, (calls, seconds) in self.timers.items()},
+            "counters": counters,
+        }
+
+
+def write_report(tm, path):
+    """
+    Writes the JSON report of the map's stats.
+    """
+    import json
+    with open(path, "w") as file:
+        json.dump(tm.stats(), file, indent=2)
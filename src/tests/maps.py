@@ -0,0 +1,31 @@
+import src.treasure_quest as tq
+from src import scenario
+from src.scenario import SCRIPT_MOVES
+
+
+def crowded_map(seed, size=12, adventurers=60, script_length=30):
+    """
+    :return: A square quest where most cells hold a mountain, a treasure or an adventurer, so that many moves are
+        blocked. Scripts contain unknown moves too
+    """
+    return scenario.generate(size, size, mountain_density=1 / 6, treasures=size * 3, adventurers=adventurers,
+                             script_length=script_length, seed=seed, script_moves=SCRIPT_MOVES + "X")
+
+
+def state(treasure_map, scripts=True):
+    """
+    :param scripts: Whether the adventurers' scripts and played moves are part of the state (a replayed quest has none)
+    :return: The state of a quest which two engines playing it must reach alike
+    """
+    common = (
+        treasure_map.iteration,
+        treasure_map.turns,
+        str(treasure_map),
+        tq.format_result(treasure_map.get_data()),
+    )
+    if not scripts:
+        return common
+    return common + (
+        [str(script) for script in treasure_map.adventurers.values()],
+        [treasure_map.get_previous_moves(adventurer) for adventurer in treasure_map.adventurers],
+    )
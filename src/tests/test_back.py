@@ -1,7 +1,7 @@
 import unittest
 from parameterized import parameterized
 
-from src.back import TreasureMap
+from src.back import TreasureMap, MOUNTAIN_CHAR
 
 
 class TreasureMapTest(unittest.TestCase):
@@ -119,6 +119,116 @@ class TreasureMapTest(unittest.TestCase):
         assert p.collected_treasures == picked_up
         assert treasure_map.get_treasures_count() == remaining
 
+    @parameterized.expand([
+        ["Play every turn", [(2, 3, 1)], [("Lara", 0, 0, "E", "AAA")], 3],
+        ["Stop once all treasures are collected", [(0, 1, 1)], [("Lara", 0, 0, "E", "AAA")], 1],
+        ["Nothing to play without treasures", [], [("Lara", 0, 0, "E", "AAA")], 0],
+    ])
+    def test_headless_run(self, name, treasures, adventurers, expected):
+        treasure_map = TreasureMap(3, 4, treasures=treasures, adventurers=adventurers)
+        frames = []
+        assert treasure_map.run(observer=frames.append) == expected
+        assert len(frames) == expected
+        assert treasure_map.turns == 3 - expected
+
+    @parameterized.expand([
+        ["Adventurers blocking each other", 2, 2, [("Lara", 0, 0, "E", "AAA"), ("Indiana", 0, 1, "S", "ADA")]],
+        ["Adventurers crossing paths", 3, 4, [("Lara", 1, 0, "E", "AAAD"), ("Indiana", 0, 2, "S", "AAGA"), ("Tom", 2, 3, "W", "ADAA")]],
+        ["Adventurers wandering randomly", 5, 5, [("Lara", 0, 0, "E", ""), ("Indiana", 4, 4, "W", ""), ("Tom", 2, 2, "N", "")]],
+    ])
+    def test_occupancy_index(self, name, width, height, adventurers):
+        treasure_map = TreasureMap(width, height, adventurers=adventurers)
+        for _ in range(10):
+            treasure_map.next()
+            positions = {adventurer.pos: adventurer for adventurer in treasure_map.adventurers.keys()}
+            assert treasure_map.occupied == positions
+            assert all(treasure_map.get_occupant(pos) is adv for pos, adv in positions.items())
+
+    @parameterized.expand([[seed] for seed in range(3)])
+    def test_incremental_counters(self, seed):
+        treasures = [(i, j, 1 + (i + j) % 3) for i in range(6) for j in range(6) if (i * j + seed) % 4 == 0]
+        adventurers = [("Lara", 0, 1, "E", ""), ("Indiana", 5, 5, "W", ""), ("Tom", 2, 2, "N", ""), ("Amy", 3, 0, "S", "")]
+        treasure_map = TreasureMap(6, 6, treasures=treasures, adventurers=adventurers, seed=seed)
+        for _ in range(30):
+            treasure_map.next()
+            assert treasure_map.get_treasures_count() == sum(treasure_map.treasures.values())
+            expected = sorted(treasure_map.adventurers.keys(), key=lambda a: a.collected_treasures, reverse=True)
+            assert treasure_map.leader_board.top() == expected
+            assert treasure_map.leader_board.top(2) == expected[:2]
+
+    @parameterized.expand([[seed] for seed in range(3)])
+    def test_snapshot_and_restore(self, seed):
+        treasures = [(i, j, 1 + (i + j) % 3) for i in range(6) for j in range(6) if (i * j + seed) % 4 == 0]
+        adventurers = [("Lara", 0, 1, "E", "AADA"), ("Indiana", 5, 5, "W", ""), ("Tom", 2, 2, "N", "AGAAA")]
+        treasure_map = TreasureMap(6, 6, mountains=[(3, 3)], treasures=treasures, adventurers=adventurers, seed=seed)
+        for _ in range(3):
+            treasure_map.next()
+
+        snapshot = treasure_map.snapshot()
+        for _ in range(20):
+            treasure_map.next()
+        expected = (treasure_map.get_data(), treasure_map.leader_board.top(), treasure_map.iteration)
+
+        for _ in range(2):
+            treasure_map.restore(snapshot)
+            assert treasure_map.iteration == 3
+            for _ in range(20):
+                treasure_map.next()
+            assert (treasure_map.get_data(), treasure_map.leader_board.top(), treasure_map.iteration) == expected
+            assert treasure_map.occupied == {adventurer.pos: adventurer for adventurer in treasure_map.adventurers}
+
+    @parameterized.expand([[seed] for seed in range(3)])
+    def test_fork(self, seed):
+        treasures = [(i, j, 1 + (i + j) % 3) for i in range(6) for j in range(6) if (i * j + seed) % 4 == 0]
+        adventurers = [("Lara", 0, 1, "E", "AADA"), ("Indiana", 5, 5, "W", ""), ("Tom", 2, 2, "N", "AGAAA")]
+        treasure_map = TreasureMap(6, 6, mountains=[(3, 3)], treasures=treasures, adventurers=adventurers, seed=seed)
+        for _ in range(3):
+            treasure_map.next()
+        before = treasure_map.get_data()
+
+        fork = treasure_map.fork()
+        assert fork.grid is treasure_map.grid
+        for _ in range(20):
+            fork.next()
+        assert treasure_map.get_data() == before
+        assert treasure_map.iteration == 3
+
+        for _ in range(20):
+            treasure_map.next()
+        assert fork.get_data() == treasure_map.get_data()
+        assert [a.name for a in fork.leader_board.top()] == [a.name for a in treasure_map.leader_board.top()]
+        assert all(fork.get_occupant(adventurer.pos) is adventurer for adventurer in fork.adventurers)
+        assert all(fork.get_adventurer(adventurer.name) is adventurer for adventurer in fork.adventurers)
+
+    def test_mountains_added_to_forks(self):
+        treasure_map = TreasureMap(3, 4, treasures=[(1, 1, 2), (2, 2, 1)], adventurers=[("Lara", 0, 0, "S", "AA")])
+        str(treasure_map)
+        fork = treasure_map.fork()
+        assert fork.grid is treasure_map.grid
+
+        treasure_map.add_mountain(1, 0)
+        for tm in (treasure_map, fork):
+            assert not tm.is_accessible((1, 0))
+            assert tm.get_rows()[1].startswith(MOUNTAIN_CHAR)
+            assert tm.terrain.version == 1
+
+        fork.add_mountain(1, 1)
+        for tm in (treasure_map, fork):
+            assert tm.treasures == {(2, 2): 1}
+            assert tm.get_treasures_count() == 1
+
+        fork.add_mountains([(2, 2), (0, 3)])
+        for tm in (treasure_map, fork):
+            assert tm.treasures == {} and tm.get_treasures_count() == 0
+            assert not tm.is_accessible((0, 3))
+
+    def test_add_mountains(self):
+        treasure_map = TreasureMap(3, 4, treasures=[(1, 1, 2), (2, 2, 1)])
+        treasure_map.add_mountains([(1, 1), (0, 3), (5, 5)])
+        assert treasure_map.get_mountains_count() == 2
+        assert treasure_map.treasures == {(2, 2): 1}
+        assert treasure_map.get_treasures_count() == 1
+
 
 if __name__ == "__main__":
     unittest.main()
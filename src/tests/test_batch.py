@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+from parameterized import parameterized
+
+import src.treasure_quest as tq
+from src.batch import find_scenarios, run_batch, write_results
+
+QUESTS = [
+    "C - 3 - 4\nM - 0 - 2\nT - 0 - 3 - 2\nA - Indiana - 1 - 1 - S - AADADA\n",
+    "C - 4 - 4\nT - 1 - 3 - 3\nA - Lara - 0 - 0 - E - AAADAA\n",
+    "C - 3 - 4\nM - 1\n",
+    "C - 2 - 2\nT - 1 - 1 - 1\nA - Tom - 1 - 0 - E - A\n",
+]
+
+
+class BatchTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.paths = []
+        for k, quest in enumerate(QUESTS):
+            path = os.path.join(self.directory.name, f"quest_{k}.txt")
+            with open(path, "w") as file:
+                file.write(quest)
+            self.paths.append(path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    @parameterized.expand([
+        ["In process", 1, 1],
+        ["Pool of processes", 2, 1],
+        ["Pool of processes with chunks", 2, 3],
+    ])
+    def test_run_batch(self, name, workers, chunksize):
+        results = list(run_batch(find_scenarios(self.directory.name), workers=workers, chunksize=chunksize))
+        assert [path for path, _ in results] == self.paths
+        expected = tq.integrate(QUESTS[0])
+        expected.run()
+        assert results[0][1] == tq.format_result(expected.get_data())
+        assert results[2][1].startswith("# error: line 2")
+        assert results[3][1].endswith("A - Tom - 1 - 1 - E - 1\n")
+
+    def test_write_results(self):
+        output = os.path.join(self.directory.name, "results.txt")
+        output_dir = os.path.join(self.directory.name, "results")
+        os.mkdir(output_dir)
+
+        results = run_batch(find_scenarios(os.path.join(self.directory.name, "*.txt")), workers=1)
+        assert write_results(results, output=output, output_dir=output_dir) == len(QUESTS)
+
+        with open(output) as file:
+            assert file.read().count("# ") == len(QUESTS) + 1
+        assert sorted(os.listdir(output_dir)) == [f"quest_{k}.txt.result" for k in range(len(QUESTS))]
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import io
+import os
+import tempfile
+import unittest
+
+import src.treasure_quest as tq
+from src.binary import dump_binary, load_binary, convert, is_binary, BinaryFormatError
+from src.grid import BitmapGrid
+
+QUEST = """C - 5 - 4
+M - 0 - 2
+M - 2 - 2
+M - 4 - 3
+T - 0 - 3 - 2
+T - 1 - 3 - 1
+A - Indiana - 1 - 1 - S - AADADA
+A - Lara - 0 - 4 - E - AGAAD
+"""
+
+
+class BinaryFormatTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.text_path = os.path.join(self.directory.name, "quest.txt")
+        self.binary_path = os.path.join(self.directory.name, "quest.tqb")
+        with open(self.text_path, "w") as file:
+            file.write(QUEST)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_load_binary(self):
+        expected = tq.integrate(QUEST)
+        with open(self.binary_path, "wb") as file:
+            dump_binary(expected, file)
+
+        treasure_map = load_binary(self.binary_path)
+        assert isinstance(treasure_map.grid, BitmapGrid)
+        assert treasure_map.get_mountains_count() == 3
+        assert tq.format_result(treasure_map.get_data()) == tq.format_result(expected.get_data())
+
+        treasure_map.random.seed(0)
+        treasure_map.run()
+        expected.random.seed(0)
+        expected.run()
+        assert tq.format_result(treasure_map.get_data()) == tq.format_result(expected.get_data())
+
+    def test_round_trip(self):
+        text_copy = os.path.join(self.directory.name, "copy.txt")
+        convert(self.text_path, self.binary_path)
+        convert(self.binary_path, text_copy)
+
+        assert is_binary(self.binary_path) and not is_binary(text_copy)
+        with open(text_copy) as file:
+            output = io.StringIO()
+            tq.write_quest(tq.integrate(QUEST), output)
+            assert file.read() == output.getvalue()
+
+    def test_invalid_file(self):
+        with open(self.binary_path, "wb") as file:
+            dump_binary(tq.integrate(QUEST), file)
+        with open(self.binary_path, "rb+") as file:
+            file.truncate(30)
+
+        with self.assertRaises(BinaryFormatError):
+            load_binary(self.binary_path)
+        with self.assertRaises(BinaryFormatError):
+            load_binary(self.text_path)
+
+    def test_truncated_script(self):
+        convert(self.text_path, self.binary_path)
+        with open(self.binary_path, "rb+") as file:
+            file.truncate(os.path.getsize(self.binary_path) - 3)
+
+        with self.assertRaises(BinaryFormatError) as context:
+            load_binary(self.binary_path)
+        assert str(context.exception).endswith("truncated adventurers table")
+
+    def test_invalid_name(self):
+        convert(self.text_path, self.binary_path)
+        with open(self.binary_path, "rb") as file:
+            content = file.read()
+        with open(self.binary_path, "wb") as file:
+            file.write(content.replace(b"Lara", b"L\xffra"))
+
+        with self.assertRaises(BinaryFormatError):
+            load_binary(self.binary_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+import os
+import tempfile
+import unittest
+from parameterized import parameterized
+
+from src import events
+from src.back import TreasureMap
+from src.commands import (CommandQueue, MOVE, ADD, REMOVE, UNKNOWN_ADVENTURER, UNAVAILABLE_CELL, UNKNOWN_COMMAND,
+                          INVALID_ARGUMENT, INVALID_MOVES, INVALID_DIRECTION, RECORDED_QUEST)
+from src.recording import Recorder
+
+
+class CommandQueueTest(unittest.TestCase):
+    def test_moves_are_applied_at_turn_boundaries(self):
+        treasure_map = TreasureMap(3, 4, treasures=[(0, 3, 1)], adventurers=[("Lara", 0, 0, "E", "A")])
+        queue = CommandQueue(treasure_map)
+        queue.move("Lara", "A")
+        queue.move("Lara", "A")
+        assert treasure_map.adventurers[treasure_map.get_adventurer("Lara")].decode() == "A"
+
+        reports = [queue.step() for _ in range(3)]
+        assert [report.turn for report in reports] == [1, 2, 3]
+        assert [report.outcomes for report in reports] == [
+            [("Lara", (0, 1), "E", 0, 2)],
+            [("Lara", (0, 2), "E", 0, 1)],
+            [("Lara", (0, 3), "E", 1, 0)],
+        ]
+
+    def test_moves_replace_random_moves(self):
+        treasure_map = TreasureMap(3, 4, adventurers=[("Lara", 0, 0, "E", "A")], seed=1)
+        queue = CommandQueue(treasure_map)
+        treasure_map.turns = 4
+        queue.step()
+        queue.step()
+        script = treasure_map.adventurers[treasure_map.get_adventurer("Lara")]
+        assert len(script) - script.played > 0
+
+        queue.move("Lara", "D")
+        report = queue.step()
+        assert report.outcomes[0].moves_left == 0
+        assert treasure_map.get_previous_moves(treasure_map.get_adventurer("Lara"))[-1] == "D"
+
+    def test_add_and_remove_adventurers(self):
+        treasure_map = TreasureMap(3, 4, adventurers=[("Lara", 0, 0, "E", "AAA")])
+        queue = CommandQueue(treasure_map)
+        queue.add("Tom", 2, 0, "N", "AA")
+        queue.step()
+        tom = treasure_map.get_adventurer("Tom")
+        assert tom.pos == (1, 0)
+        assert treasure_map.turns == 2
+
+        queue.remove("Lara")
+        report = queue.step()
+        assert [outcome.name for outcome in report.outcomes] == ["Tom"]
+        assert treasure_map.get_adventurer("Lara") is None
+        assert treasure_map.occupied == {(0, 0): tom}
+        assert treasure_map.leader_board.top() == [tom]
+
+    @parameterized.expand([
+        ["Unknown adventurer's moves", (MOVE, "Indiana", "AA"), UNKNOWN_ADVENTURER],
+        ["Unknown adventurer's removal", (REMOVE, "Indiana", None), UNKNOWN_ADVENTURER],
+        ["Addition on a mountain", (ADD, "Indiana", (1, 1, "S", "")), UNAVAILABLE_CELL],
+        ["Addition on an adventurer", (ADD, "Indiana", (0, 0, "S", "")), UNAVAILABLE_CELL],
+        ["Unknown command", (7, "Lara", None), UNKNOWN_COMMAND],
+        ["Invalid movements", (MOVE, "Lara", "AXZ!"), INVALID_MOVES],
+        ["Movements which are not a string", (MOVE, "Lara", 3), INVALID_ARGUMENT],
+        ["Invalid direction", (ADD, "Bob", (2, 0, "Q", "")), INVALID_DIRECTION],
+        ["Invalid movements of an addition", (ADD, "Bob", (2, 0, "N", "AAB")), INVALID_MOVES],
+        ["Missing argument of an addition", (ADD, "Bob", (2, 0, "N")), INVALID_ARGUMENT],
+        ["Addition without argument", (ADD, "Bob", None), INVALID_ARGUMENT],
+        ["Invalid coordinates", (ADD, "Bob", ("2", 0, "N", "")), INVALID_ARGUMENT],
+        ["Name which is not a string", (ADD, None, (2, 0, "N", "")), INVALID_ARGUMENT],
+        ["Command which is not a triple", (MOVE, "Lara"), INVALID_ARGUMENT],
+    ])
+    def test_rejected_commands(self, name, command, reason):
+        treasure_map = TreasureMap(3, 4, mountains=[(1, 1)], adventurers=[("Lara", 0, 0, "E", "")])
+        queue = CommandQueue(treasure_map)
+        queue.submit([command, (MOVE, "Lara", "D")])
+        report = queue.step()
+        assert report.rejected == [(command, reason)]
+        assert [outcome.name for outcome in report.outcomes] == ["Lara"]
+        assert report.outcomes[0].direction == "S"
+        assert treasure_map.adventurers[treasure_map.get_adventurer("Lara")].decode() == "D"
+
+    @parameterized.expand([["Events traced"], ["Quest recorded"]])
+    def test_recorded_quest(self, name):
+        treasure_map = TreasureMap(3, 4, adventurers=[("Lara", 0, 0, "S", "")])
+        queue = CommandQueue(treasure_map)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "quest.rec")
+            if name == "Events traced":
+                treasure_map.record_events(trace=path)
+            else:
+                recorder = Recorder(treasure_map, path)
+
+            commands = [(ADD, "Tom", (2, 0, "N", "A")), (REMOVE, "Lara", None), (MOVE, "Lara", "A")]
+            queue.submit(commands)
+            report = queue.step()
+            assert report.rejected == [(commands[0], RECORDED_QUEST), (commands[1], RECORDED_QUEST)]
+            assert report.outcomes == [("Lara", (1, 0), "S", 0, 0)]
+            with self.assertRaises(ValueError):
+                treasure_map.remove_adventurer(treasure_map.get_adventurer("Lara"))
+
+            if name == "Events traced":
+                treasure_map.events.close()
+                assert events.replay(path).get_adventurer("Lara").pos == (1, 0)
+            else:
+                recorder.close()
+                assert treasure_map.add_adventurer("Tom", 2, 0, "N") is not None
+
+    def test_commands_in_submission_order(self):
+        treasure_map = TreasureMap(3, 4, adventurers=[("Lara", 0, 0, "E", "")])
+        queue = CommandQueue(treasure_map)
+        queue.submit([(REMOVE, "Lara", None), (ADD, "Lara", (2, 3, "N", "")), (MOVE, "Lara", "G")])
+        assert queue.apply() == []
+        lara = treasure_map.get_adventurer("Lara")
+        assert lara.pos == (2, 3)
+        assert treasure_map.adventurers[lara].decode() == "G"
+
+    def test_observer_of_run(self):
+        treasure_map = TreasureMap(1, 6, treasures=[(0, 5, 1)], adventurers=[("Lara", 0, 0, "E", "A")])
+        queue = CommandQueue(treasure_map)
+
+        def controller(tm):
+            queue.move("Lara", "A")
+            queue(tm)
+
+        assert treasure_map.run(observer=controller) == 5
+        assert treasure_map.get_treasures_count() == 0
+
+    def test_same_names(self):
+        treasure_map = TreasureMap(3, 4, adventurers=[("Lara", 0, 0, "E", ""), ("Lara", 1, 0, "E", "")])
+        first, second = treasure_map.adventurers
+        assert treasure_map.get_adventurer("Lara") is first
+        treasure_map.remove_adventurer(first)
+        assert treasure_map.get_adventurer("Lara") is second
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+from parameterized import parameterized
+
+import src.treasure_quest as tq
+from src import events
+from src.back import TreasureMap
+
+
+class EventLogTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.trace = os.path.join(self.directory.name, "trace.bin")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_lines(self):
+        treasure_map = TreasureMap(3, 4, [(1, 1)], [(0, 1, 1)], [("Lara", 0, 0, "E", "AADA"), ("Tom", 0, 2, "W", "AA")])
+        treasure_map.record_events()
+        treasure_map.next()
+        treasure_map.next()
+        assert list(treasure_map.events.lines()) == [
+            "Lara moves to (0, 1) facing EAST",
+            "Lara picks up a treasure at (0, 1) (1 collected)",
+            "Tom is blocked by an adventurer at (0, 1)",
+            "Turn 1",
+            "Lara is blocked by an adventurer at (0, 2)",
+            "Tom is blocked by an adventurer at (0, 1)",
+            "Turn 2",
+        ]
+
+    def test_ring_buffer_keeps_the_latest_events(self):
+        treasure_map = TreasureMap(1, 1, [], [], [("Lara", 0, 0, "N", "D" * 10)])
+        log = treasure_map.record_events(capacity=3)
+        for _ in range(10):
+            treasure_map.next()
+        assert log.recorded == 20
+        assert [event.kind for event in log] == [events.TURN, events.ROTATE, events.TURN]
+        assert list(log)[-1].value == 10
+
+    @parameterized.expand([[seed] for seed in range(5)])
+    def test_replay_trace(self, seed):
+        treasure_map, expected = tq.random_map(seed), tq.random_map(seed)
+        treasure_map.record_events(capacity=1, trace=self.trace)
+        treasure_map.run()
+        treasure_map.events.close()
+        expected.run()
+
+        replayed = events.replay(self.trace)
+        assert tq.format_result(replayed.get_data()) == tq.format_result(expected.get_data())
+        assert replayed.iteration == expected.iteration
+        assert replayed.leader_board.top() == [replayed.get_adventurer(a.name) for a in expected.leader_board.top()]
+
+    def test_not_a_trace(self):
+        with open(self.trace, "wb") as file:
+            file.write(b"C - 3 - 4\n")
+        with self.assertRaises(events.TraceFormatError):
+            events.read_trace(self.trace)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import random
+import unittest
+from parameterized import parameterized
+
+import src.treasure_quest as tq
+from src.back import TreasureMap
+from src.fast_forward import FastForwardEngine
+from src.tests.maps import state
+
+
+def random_runs_map(seed, size=10, adventurers=12, runs=12, turns=None):
+    rnd = random.Random(seed)
+    cells = [(i, j) for i in range(size) for j in range(size)]
+    mtn = rnd.sample(cells, size * 2)
+    tsr = [(i, j, rnd.randint(1, 3)) for i, j in rnd.sample(cells, size)]
+    plyr = [
+        (f"A{k}", i, j, rnd.choice("NSEW"), "".join(rnd.choice("AAGDX") * rnd.randint(1, 9) for _ in range(rnd.randint(0, runs))))
+        for k, (i, j) in enumerate(rnd.sample(cells, adventurers))
+    ]
+    treasure_map = TreasureMap(size, size, mtn, tsr, plyr, seed=seed)
+    if turns is not None:
+        treasure_map.turns = turns
+    return treasure_map
+
+
+class FastForwardEngineTest(unittest.TestCase):
+    @parameterized.expand([[seed] for seed in range(40)])
+    def test_same_results_as_step_by_step(self, seed):
+        treasure_map, expected = random_runs_map(seed), random_runs_map(seed)
+        assert FastForwardEngine(treasure_map).run() == expected.run()
+        assert state(treasure_map) == state(expected)
+
+    @parameterized.expand([[seed] for seed in range(10)])
+    def test_random_map(self, seed):
+        treasure_map, expected = tq.random_map(seed), tq.random_map(seed)
+        assert FastForwardEngine(treasure_map).run() == expected.run()
+        assert state(treasure_map) == state(expected)
+
+    @parameterized.expand([
+        ["Blocked by the map's edge", 1, 3, [("Lara", 0, 0, "N", "A" * 1_000_000)], (0, 0)],
+        ["Blocked by a mountain", 1, 3, [("Lara", 0, 0, "E", "A" * 1_000_000)], (0, 0)],
+        ["Turning", 1, 3, [("Lara", 0, 0, "N", "D" * 1_000_001)], (0, 0)],
+        ["Walking then blocked", 3, 3, [("Lara", 0, 0, "S", "A" * 1_000_000)], (2, 0)],
+    ])
+    def test_long_idle_runs(self, name, width, height, adventurers, expected):
+        treasure_map = TreasureMap(width, height, [(0, 1)], [(0, 2, 1)], adventurers)
+        assert FastForwardEngine(treasure_map).run() == (1_000_001 if name == "Turning" else 1_000_000)
+        adventurer = treasure_map.get_adventurer("Lara")
+        assert adventurer.pos == expected
+        assert treasure_map.adventurers[adventurer].played == treasure_map.iteration
+
+    def test_instrumented_maps(self):
+        for instrument in (TreasureMap.record_events, TreasureMap.profile):
+            treasure_map = random_runs_map(0)
+            instrument(treasure_map)
+            with self.assertRaises(ValueError):
+                FastForwardEngine(treasure_map).run()
+
+    def test_treasures_exhausted(self):
+        treasure_map = TreasureMap(3, 3, [], [(0, 2, 1)], [("Lara", 0, 0, "E", "A" * 1000), ("Tom", 2, 2, "N", "G" * 1000)])
+        assert FastForwardEngine(treasure_map).run() == 2
+        assert treasure_map.get_treasures_count() == 0
+        assert treasure_map.get_adventurer("Tom").dir == 2
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+from parameterized import parameterized
+
+from src.back import TreasureMap
+from src.grid import Grid, NumpyGrid, BitmapGrid, CellType
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+BACKENDS = [["bytearray", Grid], ["bitmap", BitmapGrid]] + ([["numpy", NumpyGrid]] if numpy else [])
+
+
+class GridTest(unittest.TestCase):
+    @parameterized.expand(BACKENDS)
+    def test_mountains(self, name, backend):
+        grid = backend(3, 4)
+        grid.add_mountains([(0, 0), (2, 3), (2, 3), (3, 0), (-1, 2)])
+        assert grid.get_mountains_count() == 2
+        assert list(grid.iter_mountains()) == [(0, 0), (2, 3)]
+        assert grid[(2, 3)] is CellType.MOUNTAIN
+        assert grid[(1, 1)] is CellType.PLAIN
+
+    @parameterized.expand(BACKENDS)
+    def test_accessibility(self, name, backend):
+        grid = backend(3, 4)
+        grid.add_mountains([(1, 2)])
+        assert grid.is_plain((0, 3))
+        assert not grid.is_plain((1, 2))
+        assert not grid.is_plain((3, 0))
+        assert not grid.is_plain((0, -1))
+        assert grid.row(1) == bytes([1, 1, 2, 1])
+
+    @parameterized.expand(BACKENDS)
+    def test_map_backend(self, name, backend):
+        treasure_map = TreasureMap(3, 4, [(0, 1)], [(0, 1, 1), (0, 2, 2)], [("Lara", 0, 0, "E", "AA")], grid_backend=backend)
+        assert treasure_map.get_mountains_count() == 1
+        assert treasure_map.get_treasures_count() == 2
+        treasure_map.next()
+        assert treasure_map.get_adventurer("Lara").pos == (0, 0)
+
+    def test_large_map(self):
+        grid = Grid(2000, 2000)
+        grid.add_mountains((i, i) for i in range(2000))
+        assert len(grid.cells) == 4_000_000
+        assert grid.get_mountains_count() == 2000
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+
+from src.monte_carlo import sweep, play_random_quest, aggregate
+
+
+class MonteCarloTest(unittest.TestCase):
+    def test_reproducible_sweep(self):
+        stats = sweep(8, seed=3)
+        assert stats == sweep(8, seed=3)
+        assert stats == sweep(8, seed=3, workers=2, chunksize=3)
+        assert stats["runs"] == 8
+        assert sum(stats["collected"].values()) == 8
+        assert sum(stats["turns_to_exhaustion"].values()) == stats["exhausted"]
+
+    def test_aggregate(self):
+        results = [
+            {"seed": 0, "turns": 12, "exhausted": True, "total": 4, "collected": 4, "scores": {"Lara": 3, "Tom": 1}},
+            {"seed": 1, "turns": 40, "exhausted": False, "total": 4, "collected": 2, "scores": {"Lara": 1, "Tom": 1}},
+            {"seed": 2, "turns": 40, "exhausted": False, "total": 0, "collected": 0, "scores": {"Amy": 0}},
+        ]
+        stats = aggregate(results)
+        assert stats["collected"] == {0: 1, 2: 1, 4: 1}
+        assert stats["collected_ratio"] == (1 + 0.5 + 1) / 3
+        assert stats["turns_to_exhaustion"] == {12: 1}
+        assert stats["win_rates"] == {"Amy": 0, "Lara": 1, "Tom": 0.5}
+
+    def test_play_random_quest(self):
+        result = play_random_quest(5)
+        assert result == play_random_quest(5)
+        assert result["collected"] == sum(result["scores"].values())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import random
+import unittest
+from parameterized import parameterized
+
+from src import scenario
+from src.adventurer import Adventurer
+from src.back import TreasureMap
+from src.planner import Planner
+
+
+def walk(treasure_map, pos, direction, moves):
+    """
+    :return: The cells entered by each forward move of a lone adventurer
+    """
+    adventurer = Adventurer("Lara", pos, direction)
+    cells = []
+    for move in moves:
+        if move == "A":
+            assert treasure_map.is_accessible(adventurer.get_next_pos())
+            adventurer.move()
+            cells.append(adventurer.pos)
+        else:
+            adventurer.turn(move)
+    return cells
+
+
+class PlannerTest(unittest.TestCase):
+    @parameterized.expand([[seed] for seed in range(5)])
+    def test_shortest_moves(self, seed):
+        rnd = random.Random(seed)
+        treasure_map = scenario.generate(12, 9, mountain_density=0.25, treasures=0, adventurers=0, seed=seed)
+        planner = Planner(treasure_map)
+        plains = [(i, j) for i in range(12) for j in range(9) if treasure_map.is_accessible((i, j))]
+
+        for _ in range(20):
+            (i, j), target, direction = rnd.choice(plains), rnd.choice(plains), rnd.choice("NESW")
+            state = planner.state(Adventurer("Lara", (i, j), direction))
+            cell = target[0] * 9 + target[1]
+
+            distance = planner.field(cell)[state]
+            found = planner.search(state, cell)
+            route = planner.route(state, cell)
+            if distance < 0:
+                assert found is None and route is None
+                continue
+            assert len(found[1]) == len(route) == distance
+            assert walk(treasure_map, (i, j), direction, route)[-1] == target
+            assert walk(treasure_map, (i, j), direction, found[1])[-1] == target
+            assert target not in walk(treasure_map, (i, j), direction, found[1])[:-1] or target == (i, j)
+
+    @parameterized.expand([
+        ["Straight ahead", (0, 0), "E", (0, 3), "AAA"],
+        ["Behind", (0, 1), "E", (0, 0), "DDA"],
+        ["Around a mountain", (0, 0), "E", (0, 2), "DAGAAGA"],
+        ["Leave and come back", (1, 1), "E", (1, 1), "ADDA"],
+    ])
+    def test_search(self, name, pos, direction, target, expected):
+        treasure_map = TreasureMap(3, 4, mountains=[(0, 1)] if name == "Around a mountain" else [])
+        planner = Planner(treasure_map)
+        state = planner.state(Adventurer("Lara", pos, direction))
+        _, moves = planner.search(state, target[0] * 4 + target[1])
+        assert len(moves) == len(expected)
+        assert walk(treasure_map, pos, direction, moves)[-1] == target
+
+    def test_unreachable_treasures(self):
+        mountains = [(0, 2), (1, 2), (2, 2)]
+        treasure_map = TreasureMap(3, 4, mountains=mountains, treasures=[(1, 1, 1), (1, 3, 2)],
+                                   adventurers=[("Lara", 0, 0, "S", "")])
+        plans = Planner(treasure_map).plan()
+        assert walk(treasure_map, (0, 0), "S", plans[treasure_map.get_adventurer("Lara")])[-1] == (1, 1)
+
+    def test_walled_in_on_a_treasure(self):
+        mountains = [(0, 1), (1, 0), (1, 2), (2, 1)]
+        treasure_map = TreasureMap(3, 3, mountains=mountains, treasures=[(1, 1, 1), (0, 0, 1)],
+                                   adventurers=[("Lara", 1, 1, "S", "")])
+        assert Planner(treasure_map).plan() == {treasure_map.get_adventurer("Lara"): ""}
+
+    def test_terrain_change_of_a_fork(self):
+        treasure_map = TreasureMap(3, 4, adventurers=[("Lara", 0, 0, "S", "")])
+        fork = treasure_map.fork()
+        planner = Planner(fork)
+        state = planner.state(fork.get_adventurer("Lara"))
+        assert planner.route(state, 2 * 4) == "AA"
+
+        treasure_map.add_mountain(1, 0)
+        assert len(planner.route(state, 2 * 4)) > 2
+
+    def test_terrain_change(self):
+        treasure_map = TreasureMap(1, 4)
+        planner = Planner(treasure_map)
+        state = planner.state(Adventurer("Lara", (0, 0), "E"))
+        assert planner.route(state, 3) == "AAA"
+
+        treasure_map.add_mountain(0, 2)
+        assert planner.route(state, 3) is None
+        assert planner.search(state, 3) is None
+
+    @parameterized.expand([[seed] for seed in range(5)])
+    def test_plan_collects_every_treasure(self, seed):
+        treasure_map = scenario.generate(40, 30, treasures=25, adventurers=1, seed=seed)
+        planner = Planner(treasure_map)
+        plans = planner.plan()
+        planner.apply(plans)
+
+        turns = treasure_map.run()
+        assert treasure_map.get_treasures_count() == 0
+        assert turns == max(len(moves) for moves in plans.values())
+
+    @parameterized.expand([[seed] for seed in range(5)])
+    def test_pilot_collects_every_treasure(self, seed):
+        treasure_map = scenario.generate(20, 20, treasures=40, adventurers=30, seed=seed)
+        planner = Planner(treasure_map)
+        planner.apply()
+        treasure_map.run(observer=planner)
+        assert treasure_map.get_treasures_count() == 0
+
+    def test_pilot_goes_around(self):
+        treasure_map = TreasureMap(3, 5, treasures=[(1, 4, 1)],
+                                   adventurers=[("Lara", 1, 0, "E", ""), ("Tom", 1, 2, "N", "D" * 20)])
+        lara = treasure_map.get_adventurer("Lara")
+        planner = Planner(treasure_map)
+        planner.apply({lara: "AAAA"})
+
+        assert treasure_map.run(observer=planner) == 11
+        assert treasure_map.get_treasures_count() == 0
+        assert walk(treasure_map, (1, 1), "E", treasure_map.get_previous_moves(lara)[2:])[-1] == (1, 4)
+
+    def test_plan_shares_treasures(self):
+        treasures = [(0, j, 1) for j in range(1, 10)] + [(9, j, 1) for j in range(1, 10)]
+        adventurers = [("Lara", 0, 0, "E", ""), ("Indiana", 9, 0, "E", "")]
+        treasure_map = TreasureMap(10, 10, treasures=treasures, adventurers=adventurers)
+        plans = Planner(treasure_map).plan()
+        assert [plans[adventurer] for adventurer in treasure_map.adventurers] == ["A" * 9, "A" * 9]
+
+
+if __name__ == "__main__":
+    unittest.main()
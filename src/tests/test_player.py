@@ -1,7 +1,7 @@
 import unittest
 from parameterized import parameterized
 
-from src.adventurer import Adventurer
+from src.adventurer import Adventurer, Direction
 
 
 class PlayerTest(unittest.TestCase):
@@ -62,6 +62,27 @@ class PlayerTest(unittest.TestCase):
         p.move()
         assert str(p) == expected
 
+    @parameterized.expand([
+        ["Turn Right four times", "N", "RRRR", 0, Direction.NORTH],
+        ["Turn Left once", "N", "L", 3, Direction.WEST],
+        ["Turn Left twice (FR)", "E", "GG", 3, Direction.WEST],
+        ["Ignore incorrect orientations", "S", "QDX", 3, Direction.WEST],
+    ])
+    def test_integer_direction(self, name, direction, orientation_changes, expected_index, expected):
+        p = Adventurer("Lara", (1, 1), direction)
+        for orientation_change in orientation_changes:
+            p.turn(orientation_change)
+        assert p.dir == expected_index
+        assert p.direction is expected
+
+    def test_compact_representation(self):
+        p = Adventurer("Lara", (1, 1), "E")
+        assert not hasattr(p, "__dict__")
+        p.direction = Direction.SOUTH
+        assert p.get_next_pos() == (2, 1)
+        p.move()
+        assert (p.pos, p.dir) == ((2, 1), 2)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+from parameterized import parameterized
+
+import src.treasure_quest as tq
+from src.back import TreasureMap
+from src.recording import Recorder, Recording, RecordingFormatError, pack_moves, unpack_moves
+from src.tests.maps import crowded_map, state
+
+
+class RecordingTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "replay.tqr")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def record(self, treasure_map, interval):
+        frames = [state(treasure_map, scripts=False)]
+        recorder = Recorder(treasure_map, self.path, interval=interval)
+        treasure_map.run(observer=lambda tm: (recorder(tm), frames.append(state(tm, scripts=False))))
+        recorder.close()
+        return frames
+
+    @parameterized.expand([
+        ["Random map", tq.random_map, 7],
+        ["Crowded map", crowded_map, 5],
+        ["One keyframe", crowded_map, 1000],
+        ["Keyframe every turn", tq.random_map, 1],
+    ])
+    def test_seek(self, name, generate, interval):
+        for seed in range(3):
+            frames = self.record(generate(seed), interval)
+            recording = Recording(self.path)
+            assert (recording.first_turn, recording.last_turn) == (0, len(frames) - 1)
+            for turn, expected in enumerate(frames):
+                assert state(recording.seek(turn), scripts=False) == expected
+
+    def test_replay_until_the_end(self):
+        frames = self.record(tq.random_map(1), 4)
+        assert [state(tm, scripts=False) for tm in Recording(self.path).replay(3)] == frames[3:]
+
+    def test_seek_is_clamped(self):
+        frames = self.record(tq.random_map(2), 8)
+        recording = Recording(self.path)
+        assert state(recording.seek(-5), scripts=False) == frames[0]
+        assert state(recording.seek(10 ** 6), scripts=False) == frames[-1]
+
+    def test_long_run_stays_small(self):
+        treasure_map = TreasureMap(20, 20, [(18, 19), (19, 18)], [(19, 19, 1)],
+                                   [(f"A{k}", k, 0, "E", "") for k in range(5)], seed=0)
+        treasure_map.turns = 100_000
+        recorder = Recorder(treasure_map, self.path)
+        treasure_map.run(observer=recorder)
+        recorder.close()
+        assert os.path.getsize(self.path) < 100_000
+        assert Recording(self.path).seek(54_321).iteration == 54_321
+
+    def test_not_a_recording(self):
+        with open(self.path, "wb") as file:
+            file.write(b"C - 3 - 4\n")
+        with self.assertRaises(RecordingFormatError):
+            Recording(self.path)
+
+    @parameterized.expand([[0], [1], [5], [8]])
+    def test_pack_moves(self, count):
+        opcodes = bytes(k % 4 for k in range(count))
+        assert len(pack_moves(opcodes)) == (count + 3) // 4
+        assert unpack_moves(pack_moves(opcodes), count) == opcodes
+
+
+if __name__ == "__main__":
+    unittest.main()
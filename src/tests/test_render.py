@@ -0,0 +1,46 @@
+import io
+import unittest
+
+from src.back import TreasureMap
+from src.render import TerminalRenderer, CLEAR_SCREEN, move_cursor
+
+
+class TerminalRendererTest(unittest.TestCase):
+    def test_map_rows(self):
+        treasure_map = TreasureMap(3, 4, [(1, 1)], [(0, 1, 12), (2, 0, 1)], [("Lara", 2, 3, "N", "")])
+        assert treasure_map.get_rows() == [
+            ",,, [12] ,,, ,,, ",
+            ",,, /V\\ ,,, ,,, ",
+            "[1] ,,, ,,, \\o/ ",
+        ]
+
+    def test_diff_only_frames(self):
+        stream = io.StringIO()
+        treasure_map = TreasureMap(6, 4, treasures=[(5, 3, 2)], adventurers=[("Lara", 0, 0, "S", "AAA")])
+        renderer = TerminalRenderer(fps=0, stream=stream)
+
+        renderer(treasure_map)
+        assert stream.getvalue() == CLEAR_SCREEN + str(treasure_map)
+
+        stream.seek(0)
+        stream.truncate()
+        treasure_map.next()
+        renderer(treasure_map)
+        updates = stream.getvalue()
+        assert CLEAR_SCREEN not in updates
+        # Row 0 and 1 of the map, the turn counter and Lara's leader board line
+        assert updates.count("\x1b[") == 2 * 4 + 1
+        assert move_cursor(1) + "\t" + ",,, " * 4 in updates
+
+    def test_frame_skip(self):
+        stream = io.StringIO()
+        treasure_map = TreasureMap(3, 3, adventurers=[("Lara", 0, 0, "S", "AA")])
+        renderer = TerminalRenderer(fps=0, frame_skip=2, stream=stream)
+        for _ in range(7):
+            renderer(treasure_map)
+        assert renderer.turns == 7
+        assert stream.getvalue().count(move_cursor(len(renderer.lines))) == 2
+
+
+if __name__ == "__main__":
+    unittest.main()
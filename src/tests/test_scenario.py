@@ -0,0 +1,48 @@
+import unittest
+from parameterized import parameterized
+
+import src.treasure_quest as tq
+from src import scenario
+
+
+class ScenarioTest(unittest.TestCase):
+    @parameterized.expand([
+        ["Tiny map", 3, 4, {}, (1, 0, 1)],
+        ["Default densities", 20, 50, {}, (100, 50, 20)],
+        ["Dense mountains", 10, 10, {"mountain_density": 0.5, "treasures": 10, "adventurers": 5}, (50, 10, 5)],
+        ["More elements than cells", 2, 2, {"mountain_density": 0.5, "treasures": 3, "adventurers": 3}, (2, 2, 0)],
+    ])
+    def test_generate(self, name, width, height, options, expected):
+        treasure_map = scenario.generate(width, height, seed=0, **options)
+        assert (treasure_map.width, treasure_map.height) == (width, height)
+        assert (treasure_map.get_mountains_count(), len(treasure_map.treasures), treasure_map.get_adventurers_count()) \
+            == expected
+
+    def test_same_seed_same_quest(self):
+        results = []
+        for _ in range(2):
+            treasure_map = scenario.generate(30, 30, seed=4)
+            treasure_map.run()
+            results.append(tq.format_result(treasure_map.get_data()))
+        assert results[0] == results[1]
+
+    @parameterized.expand([
+        [0, "Lara"],
+        [11, "Zain"],
+        [12, "Lara I"],
+        [49, "James IV"],
+    ])
+    def test_adventurer_name(self, k, expected):
+        assert scenario.adventurer_name(k) == expected
+
+    @parameterized.expand([
+        [100, 10],
+        [10 ** 7, 3162],
+        [0, 1],
+    ])
+    def test_square_side(self, cells, expected):
+        assert scenario.square_side(cells) == expected
+
+
+if __name__ == "__main__":
+    unittest.main()
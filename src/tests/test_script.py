@@ -0,0 +1,107 @@
+import unittest
+from parameterized import parameterized
+
+from src.script import Script, FORWARD, RIGHT, LEFT, NOOP
+
+
+class ScriptTest(unittest.TestCase):
+    @parameterized.expand([
+        ["Empty script", "", b"", ""],
+        ["Folded forward steps", "AAADA", bytes([FORWARD, 3, RIGHT, 1, FORWARD, 1]), "AAADA"],
+        ["English and French turns", "RDLG", bytes([RIGHT, 2, LEFT, 2]), "DDGG"],
+        ["Unknown moves", "AXYA", bytes([FORWARD, 1, NOOP, 2, FORWARD, 1]), "AXXA"],
+        ["Runs longer than a byte", "A" * 300, bytes([FORWARD, 255, FORWARD, 45]), "A" * 300],
+    ])
+    def test_compilation(self, name, movements, code, decoded):
+        script = Script(movements)
+        assert bytes(script.code) == code
+        assert len(script) == len(movements)
+        assert script.decode() == decoded
+
+    def test_cursor(self):
+        script = Script("AADG")
+        assert [script.next() for _ in range(5)] == [FORWARD, FORWARD, RIGHT, LEFT, None]
+        assert script.played == 4
+
+        script.extend("GA")
+        assert [script.next() for _ in range(3)] == [LEFT, FORWARD, None]
+        assert script.decode(0, script.played) == "AADGGA"
+
+    def test_extension_while_playing(self):
+        script = Script("AA")
+        script.next()
+        script.extend("AA")
+        assert bytes(script.code) == bytes([FORWARD, 4])
+        script.next()
+        script.next()
+        script.next()
+        script.extend("A")
+        assert bytes(script.code) == bytes([FORWARD, 4, FORWARD, 1])
+        assert script.next() == FORWARD and script.next() is None
+
+    @parameterized.expand([[steps] for steps in range(9)])
+    def test_skip(self, steps):
+        movements = "AAADDGAX"
+        script, expected = Script(movements), Script(movements)
+        script.skip(steps)
+        for _ in range(steps):
+            expected.next()
+        assert script.played == expected.played
+        assert [script.next() for _ in range(9)] == [expected.next() for _ in range(9)]
+
+    @parameterized.expand([
+        ["Nothing played", "AAADDG", 0, 4, "AAAD"],
+        ["Inside a run", "AAADDG", 2, 2, "AA"],
+        ["At the end of a run", "AAADDG", 3, 3, "AAA"],
+        ["Played steps kept", "AAADDG", 5, 2, "AAADD"],
+        ["Longer than the script", "AAADDG", 1, 10, "AAADDG"],
+    ])
+    def test_truncate(self, name, movements, played, length, expected):
+        script = Script(movements)
+        for _ in range(played):
+            script.next()
+        script.truncate(length)
+        assert (script.decode(), len(script)) == (expected, len(expected))
+
+        script.extend("GA")
+        assert script.decode(0, script.played) == movements[:played]
+        remaining = Script(expected[played:] + "GA").expand()
+        assert bytes(script.next() for _ in range(len(remaining))) == remaining
+        assert script.next() is None
+
+    def test_copy_on_write(self):
+        script = Script("AAD")
+        script.next()
+        copy = script.copy()
+        assert copy.code is script.code
+
+        copy.extend("GG")
+        assert copy.code is not script.code
+        assert [script.next() for _ in range(3)] == [FORWARD, RIGHT, None]
+        assert [copy.next() for _ in range(5)] == [FORWARD, RIGHT, LEFT, LEFT, None]
+
+    @parameterized.expand([
+        ["Moves played", "AADG", 1, 3, ""],
+        ["Last run extended", "AAA", 1, 3, "AA"],
+        ["Runs appended", "AAD", 2, 1, "GGA"],
+    ])
+    def test_state(self, name, movements, before, after, extension):
+        script = Script(movements)
+        for _ in range(before):
+            script.next()
+        state = script.state()
+        expected = [Script(movements).decode(), script.played, script.peek()]
+
+        for _ in range(after):
+            script.next()
+        script.extend(extension)
+        script.restore(state)
+        assert [script.decode(), script.played, script.peek()] == expected
+
+    def test_long_script(self):
+        script = Script("A" * 100_000)
+        assert len(script.code) < 1000
+
+
+if __name__ == "__main__":
+    unittest.main()
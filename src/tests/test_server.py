@@ -0,0 +1,130 @@
+import asyncio
+import json
+import unittest
+from parameterized import parameterized
+
+import src.treasure_quest as tq
+from src import events, scenario
+from src.server import QuestServer
+
+
+def quest(seed):
+    return scenario.generate(12, 10, treasures=15, adventurers=4, script_length=30, seed=seed)
+
+
+class Client:
+    """
+    Viewer rebuilding the map from the messages of a session.
+    """
+
+    def __init__(self):
+        self.map = None
+        self.turns = []
+        self.result = None
+
+    def receive(self, line):
+        message = json.loads(line)
+        if message["type"] == "state":
+            self.map = tq.integrate(message["quest"])
+            self.map.iteration = message["turn"]
+            for adventurer, score in zip(self.map.adventurers, message["scores"]):
+                adventurer.collected_treasures = score
+                self.map.leader_board.update(adventurer)
+        elif message["type"] == "turn":
+            adventurers = list(self.map.adventurers)
+            for event in message["events"]:
+                events.apply(self.map, adventurers, events.Event(*event))
+            self.map.iteration = message["turn"]
+        elif message["type"] == "end":
+            self.result = message["result"]
+        self.turns.append(message["turn"])
+
+
+async def watch(viewer, client, delay=0):
+    async for message in viewer:
+        client.receive(message)
+        await asyncio.sleep(delay)
+
+
+class QuestServerTest(unittest.TestCase):
+    @parameterized.expand([[seed] for seed in range(3)])
+    def test_viewers_follow_the_quest(self, seed):
+        expected = quest(seed)
+        expected.run()
+
+        async def main():
+            server = QuestServer(interval=0)
+            session = server.add(quest(seed))
+            clients = [Client() for _ in range(3)]
+            watchers = [watch(session.subscribe(), client) for client in clients]
+            server.start()
+            await asyncio.gather(server.wait(), *watchers)
+            return clients
+
+        for client in asyncio.run(main()):
+            assert client.result == tq.format_result(expected.get_data())
+            assert tq.format_result(client.map.get_data()) == client.result
+            assert client.turns == list(range(expected.iteration + 1)) + [expected.iteration]
+
+    def test_slow_viewers_drop_turns(self):
+        expected = quest(0)
+        expected.run()
+
+        async def main():
+            server = QuestServer(interval=0, queue_size=4)
+            session = server.add(quest(0))
+            fast, slow = Client(), Client()
+            slow_viewer = session.subscribe(4)
+            server.start()
+            await asyncio.gather(server.wait(), watch(session.subscribe(4), fast),
+                                 watch(slow_viewer, slow, delay=0.01))
+            return fast, slow, slow_viewer
+
+        fast, slow, slow_viewer = asyncio.run(main())
+        assert slow_viewer.dropped > 0
+        assert len(slow.turns) < len(fast.turns)
+        assert slow.result == fast.result == tq.format_result(expected.get_data())
+        assert tq.format_result(slow.map.get_data()) == slow.result
+
+    def test_many_sessions(self):
+        async def main():
+            server = QuestServer(interval=0)
+            for seed in range(200):
+                server.add(quest(seed))
+            server.start()
+            await server.wait()
+            return server
+
+        server = asyncio.run(main())
+        assert all(session.finished for session in server.sessions.values())
+
+    def test_tcp_clients(self):
+        async def main():
+            server = QuestServer(interval=0.001)
+            server.add(quest(1), name="island")
+            listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+            port = listener.sockets[0].getsockname()[1]
+            server.start()
+
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"list\nwatch island\n")
+            listing = json.loads(await reader.readline())
+            client = Client()
+            while client.result is None:
+                client.receive(await reader.readline())
+
+            writer.write(b"watch nowhere\n")
+            error = json.loads(await reader.readline())
+            writer.close()
+            listener.close()
+            await listener.wait_closed()
+            return listing, client, error
+
+        listing, client, error = asyncio.run(main())
+        assert [session["name"] for session in listing["sessions"]] == ["island"]
+        assert tq.format_result(client.map.get_data()) == client.result
+        assert error["type"] == "error"
+
+
+if __name__ == "__main__":
+    unittest.main()
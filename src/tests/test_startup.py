@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from src.batch import run_scenario
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Cumulative microseconds of "import main" reported by python -X importtime: 21 to 38ms were measured, the budget
+# leaves a margin of 50% over 30ms for slower or busy machines (the fastest of 3 imports is compared to it)
+IMPORT_TIME_BUDGET = 45_000
+
+# Modules only imported by the commands using them
+LAZY_MODULES = ["asyncio", "cProfile", "concurrent.futures", "csv", "json", "logging", "mmap", "multiprocessing",
+                "src.batch", "src.binary", "src.monte_carlo", "src.planner", "src.recording", "src.render",
+                "src.server"]
+
+
+def python(*args, stdin=None):
+    """
+    :return: The completed process of python run with args from the repository's root
+    """
+    return subprocess.run([sys.executable, *args], cwd=ROOT, input=stdin, capture_output=True, text=True, check=True)
+
+
+class StartupTest(unittest.TestCase):
+    def test_lazy_imports(self):
+        loaded = python("-c", "import sys, main; print(' '.join(sys.modules))").stdout.split()
+        assert [module for module in LAZY_MODULES if module in loaded] == []
+
+    def test_import_time_budget(self):
+        timings = []
+        for _ in range(3):
+            report = python("-X", "importtime", "-c", "import main").stderr.splitlines()
+            line = next(line for line in report if line.split("|")[-1].strip() == "main")
+            timings.append(int(line.split("|")[1]))
+        assert min(timings) < IMPORT_TIME_BUDGET, f"import main took {min(timings)}us"
+
+    def test_worker(self):
+        with tempfile.TemporaryDirectory() as directory:
+            paths = []
+            for k, quest in enumerate(["C - 3 - 4\nT - 0 - 3 - 2\nA - Lara - 0 - 0 - S - AAA\n", "C - 3 - 4\nM - 1\n"]):
+                paths.append(os.path.join(directory, f"quest_{k}.txt"))
+                with open(paths[-1], "w") as file:
+                    file.write(quest)
+            paths.append(os.path.join(directory, "missing.txt"))
+
+            output = python("main.py", "worker", stdin="\n".join(paths) + "\n\n").stdout
+            assert output == "".join(f"# {path}\n{run_scenario(path)}" for path in paths)
+
+
+if __name__ == "__main__":
+    unittest.main()
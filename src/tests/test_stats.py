@@ -0,0 +1,56 @@
+import unittest
+from parameterized import parameterized
+
+import src.treasure_quest as tq
+from src.back import TreasureMap
+
+QUEST = """C - 3 - 4
+M - 1 - 0
+M - 2 - 1
+T - 0 - 3 - 2
+T - 1 - 3 - 3
+A - Lara - 1 - 1 - S - AADADAGGA
+"""
+
+
+class StatsTest(unittest.TestCase):
+    def test_disabled_by_default(self):
+        treasure_map = tq.integrate(QUEST)
+        treasure_map.run()
+        str(treasure_map)
+        assert treasure_map.profiler is None
+        assert treasure_map.stats() == {"timers": {}, "counters": {"moves_attempted": 0}}
+
+    def test_phases(self):
+        treasure_map = tq.integrate(QUEST, profile=True)
+        treasure_map.run()
+        str(treasure_map)
+        timers = treasure_map.stats()["timers"]
+        assert {"parse", "create_map", "add_treasures", "add_adventurers", "next", "render"} <= timers.keys()
+        assert timers["next"]["calls"] == treasure_map.iteration
+        assert all(timer["seconds"] >= 0 for timer in timers.values())
+
+    def test_counters(self):
+        treasure_map = TreasureMap(3, 4, [(1, 1)], [(0, 1, 2), (2, 3, 1)],
+                                   [("Lara", 0, 0, "E", "AAAAAA"), ("Tom", 0, 2, "W", "AGAXXX")], profile=True)
+        treasure_map.run()
+        counters = treasure_map.stats()["counters"]
+        assert counters == {"turns": 6, "moves_attempted": 8, "moves_done": 4, "moves_blocked": 1,
+                            "moves_collided": 3, "pickups": 1}
+
+    @parameterized.expand([[seed] for seed in range(5)])
+    def test_same_results_when_profiled(self, seed):
+        treasure_map, expected = tq.random_map(seed), tq.random_map(seed)
+        treasure_map.profile()
+        treasure_map.run()
+        expected.run()
+        assert tq.format_result(treasure_map.get_data()) == tq.format_result(expected.get_data())
+
+        counters = treasure_map.stats()["counters"]
+        collected = sum(adventurer.collected_treasures for adventurer in treasure_map.adventurers)
+        assert counters["pickups"] == collected
+        assert counters["turns"] == treasure_map.iteration
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from parameterized import parameterized
+
+import src.treasure_quest as tq
+from src import scenario
+from src.tests.maps import crowded_map, state
+
+try:
+    from src.tiled import TiledEngine
+except ImportError:
+    TiledEngine = None
+
+
+def sparse_map(seed):
+    return scenario.generate(10, 10, mountain_density=0.2, treasures=10, adventurers=12, script_length=60, seed=seed)
+
+
+@unittest.skipUnless(TiledEngine, "numpy is not installed")
+class TiledEngineTest(unittest.TestCase):
+    @parameterized.expand([
+        ["One tile", 100, 1, 64],
+        ["Tiny tiles", 2, 1, 64],
+        ["Short blocks", 3, 1, 5],
+        ["Two workers", 4, 2, 16],
+        ["Three workers", 3, 3, 7],
+    ])
+    def test_same_results_as_step_by_step(self, name, tile_size, workers, block):
+        for seed in range(3):
+            for generate in (crowded_map, sparse_map, tq.random_map):
+                treasure_map, expected = generate(seed), generate(seed)
+                engine = TiledEngine(treasure_map, tile_size=tile_size, workers=workers, block=block)
+                assert engine.run() == expected.run()
+                assert state(treasure_map) == state(expected)
+                assert treasure_map.occupied.keys() == expected.occupied.keys()
+                assert treasure_map.random.getstate() == expected.random.getstate()
+
+    def test_adventurers_crossing_tiles(self):
+        adventurers = [("Lara", 0, 0, "S", "A" * 7), ("Tom", 0, 1, "S", "A" * 7), ("Indiana", 7, 7, "N", "A" * 7)]
+        treasure_map = tq.TreasureMap(8, 8, [], [(7, 0, 1), (0, 7, 1)], adventurers)
+        assert TiledEngine(treasure_map, tile_size=2, workers=2).run() == 7
+        assert [adventurer.pos for adventurer in treasure_map.adventurers] == [(7, 0), (7, 1), (0, 7)]
+        assert treasure_map.get_treasures_count() == 0
+
+    def test_instrumented_maps(self):
+        for instrument in (tq.TreasureMap.record_events, tq.TreasureMap.profile):
+            treasure_map = tq.random_map(0)
+            instrument(treasure_map)
+            with self.assertRaises(ValueError):
+                TiledEngine(treasure_map).run()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from parameterized import parameterized
+
+import src.treasure_quest as tq
+
+QUEST = """C - 3 - 4
+M - 0 - 2
+M - 2 - 2
+T - 0 - 3 - 2
+# test: line to ignore
+T - 1 - 3 - 1
+A - Indiana - 1 - 1 - S - AADADA
+"""
+
+
+class TreasureQuestTest(unittest.TestCase):
+    def test_integrate(self):
+        treasure_map = tq.integrate(QUEST)
+        assert (treasure_map.width, treasure_map.height) == (4, 3)
+        assert treasure_map.get_mountains_count() == 2
+        assert treasure_map.treasures == {(3, 0): 2, (3, 1): 1}
+        assert treasure_map.get_adventurer("Indiana").pos == (1, 1)
+
+    def test_load_from_file(self):
+        expected = tq.format_result(tq.integrate(QUEST).get_data())
+        assert tq.format_result(tq.load(io.StringIO(QUEST)).get_data()) == expected
+
+    @parameterized.expand([
+        ["Records before the map definition", "T - 0 - 0 - 1\nM - 1 - 1\nC - 3 - 4\nA - Lara - 0 - 1 - S - A\n", 1, 1],
+        ["Mountain defined after a treasure", "C - 3 - 4\nT - 1 - 1 - 1\nT - 0 - 0 - 1\nM - 1 - 1\n", 1, 0],
+        ["Adventurer defined before a mountain", "C - 3 - 4\nA - Lara - 1 - 1 - S - A\nM - 1 - 1\n", 0, 0],
+        ["No map definition", "T - 0 - 0 - 1\nA - Lara - 0 - 0 - S - A\n", 0, 0],
+    ])
+    def test_load_order(self, name, quest, treasures, adventurers):
+        treasure_map = tq.load(io.StringIO(quest))
+        assert treasure_map.get_treasures_count() == treasures
+        assert treasure_map.get_adventurers_count() == adventurers
+
+    def test_adventurer_without_movements(self):
+        quest = io.StringIO()
+        tq.write_quest(tq.integrate("C - 3 - 4\nA - Lara - 1 - 1 - S - \n"), quest)
+        assert quest.getvalue().endswith("A - Lara - 1 - 1 - S - \n")
+        assert tq.integrate(quest.getvalue()).get_adventurers_count() == 1
+
+    @parameterized.expand([
+        ["Missing field", "C - 3 - 4\nM - 1\n", 2],
+        ["Invalid number", "C - 3 - 4\nM - 0 - 0\n\nT - 1 - x - 1\n", 4],
+        ["Map defined twice", "C - 3 - 4\nC - 3 - 4\n", 2],
+    ])
+    def test_malformed_records(self, name, quest, line_number):
+        with self.assertRaises(tq.QuestFormatError) as context:
+            tq.load(io.StringIO(quest))
+        assert context.exception.line_number == line_number
+        assert str(context.exception).startswith(f"line {line_number}: ")
+
+    @parameterized.expand([[seed] for seed in range(3)])
+    def test_seeded_random_map(self, seed):
+        results = []
+        for _ in range(2):
+            treasure_map = tq.random_map(seed=seed)
+            treasure_map.run()
+            results.append(tq.format_result(treasure_map.get_data()))
+        assert results[0] == results[1]
+
+    def test_seeded_random_moves(self):
+        quest = "C - 5 - 5\nT - 4 - 4 - 9\nA - Lara - 0 - 0 - E - A\nA - Tom - 2 - 2 - N - AAAAAAAAAAAAAAAAAAAAAAA\n"
+        results = []
+        for _ in range(2):
+            treasure_map = tq.integrate(quest, seed=7)
+            treasure_map.run()
+            results.append([treasure_map.get_previous_moves(adventurer) for adventurer in treasure_map.adventurers])
+        assert results[0] == results[1]
+        assert len(results[0][0]) == 23
+
+    def test_write_result(self):
+        treasure_map = tq.integrate(QUEST)
+        treasure_map.run()
+        output = io.StringIO()
+        tq.write_result(treasure_map, output)
+        assert output.getvalue() == tq.format_result(treasure_map.get_data())
+
+    @parameterized.expand([
+        ["JSON Lines", tq.JSONL, ['{"type":"C","width":3,"height":4}', '{"type":"M","x":0,"y":2}',
+                                  '{"type":"T","x":0,"y":3,"treasures":2}',
+                                  '{"type":"A","name":"Lara","x":1,"y":1,"direction":"S","treasures":0}']],
+        ["CSV", tq.CSV, ["C,3,4", "M,0,2", "T,0,3,2", "A,Lara,1,1,S,0"]],
+    ])
+    def test_output_formats(self, name, output_format, expected):
+        treasure_map = tq.integrate("C - 3 - 4\nM - 0 - 2\nT - 0 - 3 - 2\nA - Lara - 1 - 1 - S - \n")
+        output = io.StringIO(newline="")
+        tq.write_result(treasure_map, output, output_format)
+        assert output.getvalue().splitlines() == expected
+
+    def test_play_lines(self):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            result = tq.treasure_quest(QUEST.splitlines(), fps=0)
+        assert result == tq.treasure_quest(io.StringIO(QUEST), headless=True)
+        assert "Input: <stream>" in output.getvalue()
+
+    def test_output_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.txt")
+            assert tq.treasure_quest(io.StringIO(QUEST), headless=True, output=path) is None
+            with open(path) as file:
+                result = file.read()
+            assert result == tq.treasure_quest(io.StringIO(QUEST), headless=True)
+
+            with self.assertRaises(tq.QuestFormatError):
+                tq.treasure_quest(io.StringIO("C - 3 - 4\nT - 1 - x - 2\n"), headless=True, output=path)
+            with open(path) as file:
+                assert file.read() == result
+
+    def test_chunked_writes(self):
+        treasure_map = tq.integrate("C - 30 - 40\n" + "".join(f"M - {x} - 0\n" for x in range(30)))
+        output = io.StringIO()
+        tq.write_records(tq.result_records(treasure_map), output)
+        chunked = io.StringIO()
+        for chunk in tq.chunks(tq.result_records(treasure_map), size=7):
+            tq.write_records(chunk, chunked)
+        assert chunked.getvalue() == output.getvalue()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import random
+import unittest
+from parameterized import parameterized
+
+from src import scenario
+from src.treasures import TreasureIndex
+
+
+def by_distance(cells, i, j):
+    return sorted(cells, key=lambda cell: (abs(cell[0] - i) + abs(cell[1] - j), cell))
+
+
+def indexed(index):
+    return {cell for bucket in index.buckets.values() for cell in bucket}
+
+
+class TreasureIndexTest(unittest.TestCase):
+    @parameterized.expand([[bucket_size] for bucket_size in (None, 1, 8, 200)])
+    def test_nearest_treasures(self, bucket_size):
+        rnd = random.Random(0)
+        cells = [(rnd.randrange(100), rnd.randrange(80)) for _ in range(50)]
+        treasures = TreasureIndex(100, 80, {cell: 1 for cell in cells}, bucket_size=bucket_size)
+        for _ in range(40):
+            i, j = rnd.randrange(100), rnd.randrange(80)
+            expected = by_distance(treasures.amounts, i, j)
+            assert treasures.nearest(i, j) == expected[0]
+            assert treasures.nearest_k(i, j, 5) == expected[:5]
+            treasures.collect(*expected[0])
+        assert len(treasures) == len(set(cells)) - 40
+        assert treasures.nearest_k(0, 0, 100) == by_distance(treasures.amounts, 0, 0)
+
+    def test_nearest_accepted(self):
+        treasures = TreasureIndex(10, 10, {(0, 1): 1, (0, 2): 1, (5, 5): 1})
+        assert treasures.nearest(0, 0, accept=lambda cell: cell != 1) == (0, 2)
+        assert treasures.nearest_k(0, 0, 3, accept=lambda cell: cell > 50) == [(5, 5)]
+        assert treasures.nearest(0, 0, accept=lambda cell: False) is None
+        assert treasures.nearest_k(0, 0, 0) == []
+
+    @parameterized.expand([[radius] for radius in (-1, 0, 3, 10, 200)])
+    def test_within(self, radius):
+        rnd = random.Random(radius)
+        cells = {(rnd.randrange(60), rnd.randrange(40)): 2 for _ in range(300)}
+        treasures = TreasureIndex(60, 40, cells)
+        for _ in range(20):
+            i, j = rnd.randrange(60), rnd.randrange(40)
+            expected = [cell for cell in by_distance(cells, i, j) if abs(cell[0] - i) + abs(cell[1] - j) <= radius]
+            assert treasures.within(i, j, radius) == expected
+
+    def test_collect(self):
+        treasures = TreasureIndex(3, 4, {(1, 1): 2})
+        treasures.collect(1, 1)
+        assert treasures.within(1, 1, 0) == [(1, 1)]
+        treasures.collect(1, 1)
+        treasures.collect(1, 1)
+        assert treasures.amounts == {} and treasures.buckets == {}
+
+
+class IndexedMapTest(unittest.TestCase):
+    @parameterized.expand([[seed] for seed in range(3)])
+    def test_index_follows_the_quest(self, seed):
+        treasure_map = scenario.generate(30, 25, treasures=80, adventurers=6, script_length=200, seed=seed)
+        index = treasure_map.index_treasures()
+        treasure_map.add_mountain(*next(iter(treasure_map.treasures)))
+        free = [(i, j) for i in range(30) for j in range(25)
+                if treasure_map.is_accessible((i, j)) and (i, j) not in treasure_map.treasures]
+        treasure_map.add_treasure(*free[0], 3)
+        snapshot = treasure_map.snapshot()
+        branch = treasure_map.fork()
+
+        treasure_map.run()
+        assert indexed(index) == set(treasure_map.treasures)
+
+        branch.run()
+        assert indexed(branch.treasure_index) == set(branch.treasures)
+        assert indexed(index) == set(treasure_map.treasures)
+
+        treasure_map.restore(snapshot)
+        assert indexed(treasure_map.treasure_index) == set(snapshot.treasures)
+
+
+if __name__ == "__main__":
+    unittest.main()
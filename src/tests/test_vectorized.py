@@ -0,0 +1,47 @@
+import unittest
+from parameterized import parameterized
+
+import src.treasure_quest as tq
+from src.back import TreasureMap
+from src.tests.maps import crowded_map, state
+
+try:
+    from src.vectorized import VectorizedEngine
+except ImportError:
+    VectorizedEngine = None
+
+
+def play(treasure_map, engine):
+    simulated = engine(treasure_map).run() if engine else treasure_map.run()
+    return simulated, treasure_map.iteration, tq.format_result(treasure_map.get_data())
+
+
+@unittest.skipUnless(VectorizedEngine, "numpy is not installed")
+class VectorizedEngineTest(unittest.TestCase):
+    def test_input_example(self):
+        with open("input_example.txt") as file:
+            content = file.read()
+        assert play(tq.integrate(content), VectorizedEngine) == play(tq.integrate(content), None)
+
+    def test_instrumented_maps(self):
+        for instrument in (TreasureMap.record_events, TreasureMap.profile):
+            treasure_map = tq.random_map(0)
+            instrument(treasure_map)
+            with self.assertRaises(ValueError):
+                VectorizedEngine(treasure_map).run()
+
+    @parameterized.expand([[seed] for seed in range(5)])
+    def test_random_map(self, seed):
+        assert play(tq.random_map(seed), VectorizedEngine) == play(tq.random_map(seed), None)
+
+    @parameterized.expand([[seed] for seed in range(5)])
+    def test_crowded_map(self, seed):
+        treasure_map = crowded_map(seed)
+        expected_map = crowded_map(seed)
+        assert play(treasure_map, VectorizedEngine) == play(expected_map, None)
+        assert state(treasure_map) == state(expected_map)
+        assert treasure_map.occupied.keys() == expected_map.occupied.keys()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,483 @@
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from src.adventurer import DIRECTION_DELTAS
+from src.grid import PLAIN
+from src.script import FORWARD, RIGHT, LEFT, NOOP, CHAR_TO_OPCODE
+
+DELTAS = np.array(DIRECTION_DELTAS, dtype=np.int64)
+
+# Control slots shared by the master and the workers
+TURNS, PLAYED, TREASURES = range(3)
+
+
+class SharedArrays:
+    """
+    NumPy arrays stored in shared memory blocks, which can be attached by name from other processes.
+    """
+
+    def __init__(self, specs, names=None):
+        """
+        :param specs: Shape and dtype of each array, example: {"pos": ((10, 2), "int64")}
+        :param names: Names of the blocks to attach (None to create them)
+        """
+        self.specs = specs
+        self.blocks = {}
+        self.arrays = {}
+        for key, (shape, dtype) in specs.items():
+            size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+            block = SharedMemory(create=True, size=size) if names is None else SharedMemory(name=names[key])
+            self.blocks[key] = block
+            self.arrays[key] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+    def __getitem__(self, key):
+        return self.arrays[key]
+
+    def names(self):
+        return {key: block.name for key, block in self.blocks.items()}
+
+    def close(self, unlink=False):
+        self.arrays.clear()
+        for block in self.blocks.values():
+            block.close()
+            if unlink:
+                block.unlink()
+
+
+class LocalBarrier:
+    """
+    Barrier of a single party, used when the tiles are simulated in the current process.
+    """
+
+    def wait(self):
+        return 0
+
+    def abort(self):
+        pass
+
+
+class TileWorker:
+    """
+    Simulates the adventurers standing on the tiles of one worker.
+
+    The tiles are dealt to the workers in a round-robin way. Every turn is played in four phases separated by barriers:
+        - intent: the owned adventurers turn or pick the cell they walk into
+        - decide: each move is accepted as if the adventurers played one after another (in the map's order),
+          reading the intents of the neighbouring tiles through a halo of one cell
+        - leave: the adventurers which moved free their cell
+        - enter: they occupy their new cell, pick up its treasure and are handed over when it belongs to another worker
+    """
+
+    def __init__(self, index, workers, tile_size, width, height, state, barrier):
+        self.index = index
+        self.workers = workers
+        self.tile_size = tile_size
+        self.width, self.height = width, height
+        self.tiles_per_row = -(-height // tile_size)
+        self.state = state
+        self.barrier = barrier
+
+        pos = state["pos"]
+        owners = self.owner_of(pos[:, 0] * height + pos[:, 1])
+        self.own = np.flatnonzero(owners == index)
+        self.mine = owners == index
+        self.border = self.border_cells()
+
+    def owner_of(self, cells):
+        """
+        :return: Index of the worker owning each cell
+        """
+        i, j = cells // self.height, cells % self.height
+        return ((i // self.tile_size) * self.tiles_per_row + j // self.tile_size) % self.workers
+
+    def border_cells(self):
+        """
+        :return: The owned cells next to a cell owned by another worker (where the handed over adventurers arrive)
+        """
+        # Cells on the side of a tile (the map's edges are not shared with any tile)
+        size, width, height = self.tile_size, self.width, self.height
+        rows, columns = np.arange(width, dtype=np.int64), np.arange(height, dtype=np.int64)
+        side_rows = (rows % size == 0) | (rows % size == size - 1)
+        side_columns = columns[(columns % size == 0) | (columns % size == size - 1)]
+        cells = np.concatenate((
+            (rows[side_rows, None] * height + columns).ravel(),
+            (rows[~side_rows, None] * height + side_columns).ravel(),
+        ))
+        owned = cells[self.owner_of(cells) == self.index]
+        i, j = owned // self.height, owned % self.height
+
+        border = np.zeros(len(owned), dtype=bool)
+        for di, dj in DIRECTION_DELTAS:
+            ni, nj = i + di, j + dj
+            inside = (ni >= 0) & (ni < self.width) & (nj >= 0) & (nj < self.height)
+            border[inside] |= self.owner_of(ni[inside] * self.height + nj[inside]) != self.index
+        return owned[border]
+
+    # ----- Core ---------
+
+    def play_block(self):
+        """
+        Plays the turns whose opcodes are in the shared memory, stopping when the treasures are exhausted.
+        """
+        control, picked = self.state["control"], self.state["picked"]
+        turns = int(control[TURNS])
+        played = 0
+        while played < turns and control[TREASURES] - picked.sum() > 0:
+            self.adopt()
+            movers = self.intent(played)
+            self.barrier.wait()
+            movers = movers[self.decide(movers)]
+            self.barrier.wait()
+            self.leave(movers)
+            self.barrier.wait()
+            self.enter(movers)
+            self.barrier.wait()
+            played += 1
+
+        if self.index == 0:
+            control[PLAYED] = played
+
+    def adopt(self):
+        """
+        Takes the ownership of the adventurers handed over on the border of the tiles.
+        """
+        occupants = self.state["occupied"][self.border]
+        arrived = occupants[occupants > 0] - 1
+        arrived = arrived[~self.mine[arrived]]
+        if len(arrived):
+            self.mine[arrived] = True
+            self.own = np.concatenate((self.own, arrived))
+
+    def intent(self, t):
+        """
+        :return: The owned adventurers walking into an accessible cell this turn
+        """
+        state, own = self.state, self.own
+        pos, dirs, target = state["pos"], state["dir"], state["target"]
+
+        ops = state["ops"][own, t]
+        dirs[own[ops == RIGHT]] = (dirs[own[ops == RIGHT]] + 1) % 4
+        dirs[own[ops == LEFT]] = (dirs[own[ops == LEFT]] - 1) % 4
+        target[own] = -1
+
+        movers = own[ops == FORWARD]
+        next_pos = pos[movers] + DELTAS[dirs[movers]]
+        inside = (
+                (next_pos[:, 0] >= 0) & (next_pos[:, 0] < self.width)
+                & (next_pos[:, 1] >= 0) & (next_pos[:, 1] < self.height)
+        )
+        movers, next_pos = movers[inside], next_pos[inside]
+        cells = next_pos[:, 0] * self.height + next_pos[:, 1]
+        accessible = state["plain"][cells] == 1
+        movers = movers[accessible]
+        target[movers] = cells[accessible]
+        return movers
+
+    def decide(self, movers):
+        """
+        :return: Mask of the movers whose target cell is free when they play
+        """
+        target, occupied = self.state["target"], self.state["occupied"]
+        cells = target[movers]
+
+        # Moves towards a free cell which nobody else walks into do not depend on the order of the adventurers
+        claims = np.zeros(len(movers), dtype=np.int64)
+        i, j = cells // self.height, cells % self.height
+        for di, dj in DIRECTION_DELTAS:
+            ni, nj = i - di, j - dj
+            inside = np.flatnonzero((ni >= 0) & (ni < self.width) & (nj >= 0) & (nj < self.height))
+            neighbours = occupied[ni[inside] * self.height + nj[inside]] - 1
+            claiming = neighbours >= 0
+            claims[inside[claiming]] += target[neighbours[claiming]] == cells[inside[claiming]]
+        occupants = occupied[cells] - 1
+        moved = (occupants < 0) & (claims == 1)
+        # Neither do moves towards a cell whose occupant stays or plays after the mover
+        blocked = (occupants >= 0) & ((occupants > movers) | (target[np.maximum(occupants, 0)] < 0))
+
+        decisions = {}
+        for k in np.flatnonzero(~moved & ~blocked):
+            moved[k] = self.resolve(int(movers[k]), decisions)
+        return moved
+
+    def resolve(self, adventurer, decisions):
+        """
+        Decides whether a move succeeds, after deciding the moves played before it and towards or out of its target.
+
+        :param decisions: Moves already decided this turn ({adventurer: moved})
+        """
+        stack = [adventurer]
+        while stack:
+            k = stack[-1]
+            if k in decisions:
+                stack.pop()
+                continue
+
+            blocked, dependencies = self.dependencies(k)
+            if blocked:
+                decisions[k] = False
+                stack.pop()
+                continue
+
+            undecided = [d for d in dependencies if d is not None and d not in decisions]
+            if undecided:
+                stack += undecided
+                continue
+
+            stack.pop()
+            occupant, *claimants = dependencies
+            decisions[k] = (occupant is None or decisions[occupant]) and not any(decisions[d] for d in claimants)
+        return decisions[adventurer]
+
+    def dependencies(self, k):
+        """
+        :return: (blocked, [occupant of the target or None, adventurers walking into the target before k])
+        """
+        target, occupied = self.state["target"], self.state["occupied"]
+        cell = int(target[k])
+        occupant = int(occupied[cell]) - 1
+        if occupant >= 0 and (occupant > k or target[occupant] < 0):
+            return True, []
+
+        i, j = divmod(cell, self.height)
+        claimants = []
+        for di, dj in DIRECTION_DELTAS:
+            ni, nj = i - di, j - dj
+            if 0 <= ni < self.width and 0 <= nj < self.height:
+                neighbour = int(occupied[ni * self.height + nj]) - 1
+                if 0 <= neighbour < k and target[neighbour] == cell:
+                    claimants.append(neighbour)
+        return False, [occupant if occupant >= 0 else None] + claimants
+
+    def leave(self, movers):
+        pos = self.state["pos"]
+        self.state["occupied"][pos[movers, 0] * self.height + pos[movers, 1]] = 0
+
+    def enter(self, movers):
+        state = self.state
+        cells = state["target"][movers]
+        state["occupied"][cells] = movers + 1
+        state["pos"][movers, 0], state["pos"][movers, 1] = cells // self.height, cells % self.height
+
+        # A cell can be entered by at most one adventurer per turn
+        treasures = state["treasures"]
+        found = treasures[cells] > 0
+        treasures[cells[found]] -= 1
+        state["scores"][movers[found]] += 1
+        state["picked"][self.index] += int(found.sum())
+
+        leaving = movers[self.owner_of(cells) != self.index]
+        if len(leaving):
+            self.mine[leaving] = False
+            self.own = self.own[self.mine[self.own]]
+
+
+def work(index, workers, tile_size, width, height, specs, names, barrier, master):
+    """
+    Entry point of a worker process: plays the blocks of turns sent by the master until it sends an empty block.
+    """
+    state = SharedArrays(specs, names)
+    try:
+        worker = TileWorker(index, workers, tile_size, width, height, state, barrier)
+        while True:
+            master.wait()
+            if not state["control"][TURNS]:
+                break
+            worker.play_block()
+            master.wait()
+    except BaseException:
+        barrier.abort()
+        master.abort()
+        raise
+    finally:
+        worker = None
+        state.close()
+
+
+class TiledEngine:
+    """
+    Turn engine splitting the map into square tiles simulated by worker processes over shared memory.
+
+    Results are identical to TreasureMap.run: the moves crossing the tiles' borders are decided by reading the
+    neighbouring tiles, as if the adventurers still played one after another. The opcodes are prepared by the
+    master by blocks of turns, so random moves are drawn in the same order as TreasureMap.next.
+    """
+
+    def __init__(self, treasure_map, tile_size=256, workers=1, block=64):
+        """
+        :param tile_size: Side of the tiles, in cells
+        :param workers: Amount of worker processes (1 simulates every tile in the current process)
+        :param block: Amount of turns prepared at once by the master
+        """
+        self.map = treasure_map
+        self.tile_size = max(1, tile_size)
+        self.workers = max(1, workers)
+        self.block = max(1, block)
+
+        self.adventurers = list(treasure_map.adventurers.keys())
+        self.scripts = [treasure_map.adventurers[adventurer] for adventurer in self.adventurers]
+        # Opcodes left to play in each script
+        self.pending = [bytearray(script.expand()[script.played:]) for script in self.scripts]
+        self.lengths = np.array([len(pending) for pending in self.pending], dtype=np.int64)
+
+    def allocate(self):
+        """
+        :return: The simulation state, in shared memory
+        """
+        tm = self.map
+        n, size = len(self.adventurers), tm.width * tm.height
+        state = SharedArrays({
+            "control": ((3,), "int64"),
+            "picked": ((self.workers,), "int64"),
+            "plain": ((size,), "uint8"),
+            "treasures": ((size,), "int32"),
+            "occupied": ((size,), "int32"),
+            "pos": ((n, 2), "int64"),
+            "dir": ((n,), "int64"),
+            "scores": ((n,), "int64"),
+            "target": ((n,), "int64"),
+            "ops": ((n, self.block), "uint8"),
+        })
+
+        state["control"][:] = 0
+        state["control"][TREASURES] = tm.get_treasures_count()
+        state["picked"][:] = 0
+        state["plain"][:] = np.asarray(tm.grid.cells, dtype=np.uint8) == PLAIN
+        state["treasures"][:] = 0
+        for (i, j), amount in tm.treasures.items():
+            state["treasures"][i * tm.height + j] = amount
+
+        state["pos"][:] = np.array([adventurer.pos for adventurer in self.adventurers], dtype=np.int64).reshape(n, 2)
+        state["dir"][:] = [adventurer.dir for adventurer in self.adventurers]
+        state["scores"][:] = [adventurer.collected_treasures for adventurer in self.adventurers]
+        state["target"][:] = -1
+        state["occupied"][:] = 0
+        state["occupied"][state["pos"][:, 0] * tm.height + state["pos"][:, 1]] = np.arange(1, n + 1)
+        return state
+
+    # ----- Core ---------
+
+    def run(self):
+        """
+        Simulates the quest like TreasureMap.run, then writes the final state back in the map.
+
+        :return: The amount of turns simulated
+        """
+        tm = self.map
+        if tm.instrumented:
+            raise ValueError("TiledEngine neither records events nor profiles, play the map with TreasureMap.run")
+        state = self.allocate()
+        processes = []
+        try:
+            if self.workers == 1:
+                worker = TileWorker(0, 1, self.tile_size, tm.width, tm.height, state, LocalBarrier())
+                master = LocalBarrier()
+            else:
+                barrier, master = multiprocessing.Barrier(self.workers), multiprocessing.Barrier(self.workers + 1)
+                for index in range(self.workers):
+                    process = multiprocessing.Process(target=work, args=(
+                        index, self.workers, self.tile_size, tm.width, tm.height, state.specs, state.names(),
+                        barrier, master))
+                    process.start()
+                    processes.append(process)
+
+            simulated = 0
+            while tm.turns > 0:
+                turns = min(self.block, tm.turns)
+                draws = self.prepare(state, turns)
+                state["control"][TURNS] = turns
+                if processes:
+                    master.wait()
+                    master.wait()
+                else:
+                    worker.play_block()
+
+                played = int(state["control"][PLAYED])
+                self.commit(draws, played)
+                tm.turns -= played
+                tm.iteration += played
+                simulated += played
+                if played < turns:
+                    break
+
+            if processes:
+                state["control"][TURNS] = 0
+                master.wait()
+                for process in processes:
+                    process.join()
+
+            self.sync(state)
+            return simulated
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+            worker = None
+            state.close(unlink=True)
+
+    def prepare(self, state, turns):
+        """
+        Writes the opcodes of the next turns in the shared memory.
+        Exhausted scripts are extended with random moves in the same order as TreasureMap.next.
+
+        :return: The random moves drawn: list of (turn, adventurer's index, movements, random state before the turn)
+        """
+        tm = self.map
+        draws = []
+        for t in range(turns):
+            exhausted = np.flatnonzero(self.lengths <= t)
+            random_state = tm.random.getstate() if len(exhausted) else None
+            for k in exhausted:
+                movements = tm.get_random_moves()
+                self.pending[k] += bytes(CHAR_TO_OPCODE.get(c, NOOP) for c in movements)
+                self.lengths[k] += len(movements)
+                draws.append((t, k, movements, random_state))
+
+        ops = state["ops"]
+        for k, pending in enumerate(self.pending):
+            ops[k, :turns] = np.frombuffer(pending, dtype=np.uint8, count=turns)
+        return draws
+
+    def commit(self, draws, played):
+        """
+        Moves the scripts' cursors over the played turns and keeps only the random moves drawn before the end of the quest.
+        """
+        tm = self.map
+        starts = [script.played for script in self.scripts]
+        for t, k, movements, random_state in draws:
+            if t >= played:
+                tm.random.setstate(random_state)
+                break
+            script = self.scripts[k]
+            script.skip(starts[k] + t - script.played)
+            script.extend(movements)
+
+        for start, script, pending in zip(starts, self.scripts, self.pending):
+            script.skip(start + played - script.played)
+            del pending[:played]
+        self.lengths -= played
+
+    # ----- Synchronization ---------
+
+    def sync(self, state):
+        """
+        Writes the simulation state back in the TreasureMap (positions, directions, scores and treasures).
+        """
+        tm = self.map
+        pos, dirs, scores = state["pos"], state["dir"], state["scores"]
+        for k, adventurer in enumerate(self.adventurers):
+            adventurer.pos = (int(pos[k, 0]), int(pos[k, 1]))
+            adventurer.dir = int(dirs[k])
+            if adventurer.collected_treasures != scores[k]:
+                adventurer.collected_treasures = int(scores[k])
+                tm.leader_board.update(adventurer)
+
+        tm.occupied = {adventurer.pos: adventurer for adventurer in self.adventurers}
+        tm.treasures_count = int(state["control"][TREASURES] - state["picked"].sum())
+        for i, j in list(tm.treasures.keys()):
+            amount = int(state["treasures"][i * tm.height + j])
+            if amount:
+                tm.treasures[(i, j)] = amount
+            else:
+                tm.pop_treasure((i, j))
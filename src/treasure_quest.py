@@ -1,28 +1,92 @@
-import getopt
-import sys
+import io
+import time
+from itertools import islice
 
+from src.adventurer import DIRECTION_TO_CHAR
 from src.back import TreasureMap
+from src import stats
 
 SEPARATOR = " - "
 
+# Formats of the results
+TEXT, JSONL, CSV = "text", "jsonl", "csv"
+OUTPUT_FORMATS = [TEXT, JSONL, CSV]
 
-def treasure_quest(input_file=None, random=False, save=False):
+# Fields of the records of a result, in the jsonl format
+RESULT_FIELDS = {
+    "C": ["type", "width", "height"],
+    "M": ["type", "x", "y"],
+    "T": ["type", "x", "y", "treasures"],
+    "A": ["type", "name", "x", "y", "direction", "treasures"],
+}
+
+# Lines of the text format, by amount of fields of the record
+TEXT_LINES = {size: SEPARATOR.join(["%s"] * size) + "\n" for size in (3, 4, 6)}
+
+# Amount of records formatted and written at once
+WRITE_CHUNK = 4096
+
+ADVENTURERS_NAMES = ["Lara", "James", "Tom", "Sora", "Arthur", "John", "Amande", "Amy", "Loue", "Lupin", "Mendez", "Zain"]
+
+
+def treasure_quest(input_file=None, random=False, save=None, headless=False, fps=2, frame_skip=0, seed=None,
+                   profile=None, trace=None, plan=False, output=None, output_format=TEXT):
     if not random:
         if not input_file:
             input_file = pick_config()
 
-        print("Input:", input_file)
-        tm = integrate(input_file)
+        if isinstance(input_file, TreasureMap):
+            tm = input_file
+        else:
+            if not headless:
+                print("Input:", input_file if isinstance(input_file, str) else getattr(input_file, "name", "<stream>"))
+            tm = integrate(input_file, seed=seed, profile=bool(profile))
+    else:
+        tm = random_map(seed=seed)
+
+    if profile:
+        tm.profile()
+    planner = None
+    if plan:
+        from src.planner import Planner
+        with tm.phase("plan"):
+            planner = Planner(tm)
+            planner.apply()
+    if trace:
+        tm.record_events(trace=trace)
+    recorder = None
+    if save:
+        from src.recording import Recorder
+        recorder = Recorder(tm, save)
+
+    observer = recorder
+    if planner is not None:
+        # The planner pilots the adventurers (see Planner.__call__)
+        observer = planner if recorder is None else lambda tm: (planner(tm), recorder(tm))
+    if headless:
+        tm.run(observer=observer)
     else:
-        tm = random_map()
+        tm.play(fps=fps, frame_skip=frame_skip, observer=observer)
+        print(tm)
 
-    tm.play()
+    if trace:
+        tm.events.close()
+    if recorder:
+        recorder.close()
 
-    print(tm)
-    res = format_result(tm.get_initial_state() if save else tm.get_data())
+    with tm.phase("format_result"):
+        res = format_result(tm.get_data()) if output is None or not headless else None
+        if output is not None:
+            # Opened once the quest is played, a quest which cannot be loaded leaves the previous result untouched
+            with open(output, "w", newline="" if output_format == CSV else None) as file:
+                write_result(tm, file, output_format)
 
-    print("Output:")
-    print("".join(["\t" + l + "\n" for l in res.split("\n")]))
+    if profile:
+        stats.write_report(tm, profile)
+
+    if not headless:
+        print("Output:")
+        print("".join(["\t" + l + "\n" for l in res.split("\n")]))
     return res
 
 
@@ -49,32 +113,147 @@ def pick_config():
     return input_file
 
 
-def integrate(file):
-    w, h = 0, 0
-    mtn, tsr, plyr = [], [], []
+class QuestFormatError(ValueError):
+    def __init__(self, line_number, reason, line=""):
+        super().__init__(f"line {line_number}: {reason}" + (f" ({line.strip()!r})" if line else ""))
+        self.line_number = line_number
+
+
+RECORD_FIELDS = {"C": 3, "M": 3, "T": 4, "A": 6}
+
+
+def integrate(file, seed=None, profile=False):
+    """
+    Builds the TreasureMap described by a quest.
+
+    :param file: The quest, either as a whole string or as an iterable of lines (example: an opened file)
+    :param seed: Seed of the random moves played once an adventurer's script is exhausted
+    :param profile: Record the timers and counters of the quest's phases (see TreasureMap.stats)
+    :return: The TreasureMap
+    """
+    return load(file.split("\n") if isinstance(file, str) else file, seed=seed, profile=profile)
+
+
+def load(lines, seed=None, profile=False):
+    """
+    Feeds the quest records into a TreasureMap as they are read, without keeping the raw text in memory.
+    Consecutive mountains are added at once, adventurers are only added once every mountain is known.
+
+    :param lines: Iterable of lines (example: an opened file)
+    :param seed: Seed of the random moves played once an adventurer's script is exhausted
+    :param profile: Record the timers and counters of the quest's phases, parsing included (see TreasureMap.stats)
+    :return: The TreasureMap
+    """
+    start = time.perf_counter()
+    tm = None
+    pending, mountains, plyr = [], [], []
+
+    for line_number, record in parse_records(lines):
+        kind = record[0]
+        if kind == "C":
+            if tm is not None:
+                raise QuestFormatError(line_number, "map already defined")
+            tm = TreasureMap(width=record[1], height=record[2], seed=seed, profile=profile)
+            for pending_record in pending:
+                feed(tm, pending_record)
+        elif kind == "A":
+            plyr.append(record[1:])
+        elif tm is None:
+            pending.append(record)
+        elif kind == "M":
+            mountains.append((record[1], record[2]))
+        else:
+            if mountains:
+                tm.add_mountains(mountains)
+                mountains = []
+            feed(tm, record)
+
+    if mountains:
+        tm.add_mountains(mountains)
+    if tm is None:
+        tm = TreasureMap(width=0, height=0, seed=seed, profile=profile)
+        for pending_record in pending:
+            feed(tm, pending_record)
+
+    tm.add_adventurers(plyr)
+    if profile:
+        tm.profiler.add_time("parse", time.perf_counter() - start)
+    return tm
+
+
+def feed(tm, record):
+    if record[0] == "M":
+        tm.add_mountain(record[1], record[2])
+    elif record[0] == "T":
+        tm.add_treasure(record[1], record[2], record[3])
+
 
-    for line in file.split("\n"):
-        fields = line.strip().split(SEPARATOR)
+def parse_records(lines):
+    """
+    Lazily parses the quest records, comments and unknown lines are skipped.
+
+    :param lines: Iterable of lines
+    :return: Generator of (line number, record), example: (3, ("T", 3, 0, 2)) with coordinates given as map's (i, j)
+    """
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        # Keeps the last field when it is empty (example: an adventurer without movements)
+        fields = (line + " " if line.endswith(SEPARATOR.rstrip()) else line).split(SEPARATOR)
+        kind = fields[0]
 
-        if not fields or fields[0] == "#":
+        if kind not in RECORD_FIELDS:
             continue
+        if len(fields) < RECORD_FIELDS[kind]:
+            raise QuestFormatError(line_number, f"expected {RECORD_FIELDS[kind]} fields for '{kind}'", line)
+
+        try:
+            if kind == "C":
+                yield line_number, ("C", int(fields[2]), int(fields[1]))
+            elif kind == "M":
+                yield line_number, ("M", int(fields[2]), int(fields[1]))
+            elif kind == "T":
+                yield line_number, ("T", int(fields[2]), int(fields[1]), int(fields[3]))
+            elif kind == "A":
+                yield line_number, ("A", fields[1], int(fields[2]), int(fields[3]), fields[4], fields[5])
+        except ValueError:
+            raise QuestFormatError(line_number, "invalid number", line) from None
 
-        if fields[0] == "C":
-            w, h = int(fields[2]), int(fields[1])
-        elif fields[0] == "M":
-            mtn += ((int(fields[2]), int(fields[1])),)
-        elif fields[0] == "T":
-            tsr += ((int(fields[2]), int(fields[1]), int(fields[3])),)
-        elif fields[0] == "A":
-            plyr += ((fields[1], int(fields[2]), int(fields[3]), fields[4], fields[5]),)
 
-    return TreasureMap(width=w, height=h, mountains=mtn, treasures=tsr, adventurers=plyr)
+def write_quest(tm, file, scripts=True):
+    """
+    Writes the quest definition of a map in the text format read by integrate (adventurers' scripts as they currently are).
+
+    :param tm: The TreasureMap
+    :param file: File opened in text mode
+    :param scripts: Write the adventurers' scripts (adventurers are written without movements otherwise)
+    """
+    file.write(SEPARATOR.join(["C", str(tm.height), str(tm.width)]) + "\n")
+    for i, j in tm.grid.iter_mountains():
+        file.write(SEPARATOR.join(["M", str(j), str(i)]) + "\n")
+    for (i, j), amount in tm.treasures.items():
+        file.write(SEPARATOR.join(["T", str(j), str(i), str(amount)]) + "\n")
+    for adventurer, movements in tm.adventurers.items():
+        i, j = adventurer.pos
+        direction = DIRECTION_TO_CHAR[adventurer.direction]
+        file.write(SEPARATOR.join(["A", adventurer.name, str(i), str(j), direction,
+                                   movements.decode() if scripts else ""]) + "\n")
+
 
+def random_map(seed=None, width=10, height=12, names=ADVENTURERS_NAMES):
+    """
+    Generates a random quest, the adventurers only play random moves.
+
+    :param seed: Seed of the quest generation and of the adventurers' moves (same seed, same quest)
+    :param width: Width of the map
+    :param height: Height of the map
+    :param names: Names picked for the adventurers
+    :return: The TreasureMap
+    """
+    import random
 
-def random_map():
-    import random as rnd
+    rnd = random.Random(seed)
 
-    w, h = 10, 12
+    w, h = width, height
     random_elements = {
         "M": rnd.randint(0, max([w, h])),               # mountains
         "T": rnd.randint(min([w, h]), max([w, h])*2),   # treasures
@@ -83,8 +262,6 @@ def random_map():
 
     max_treasures = 5
     directions = ["N", "S", "W", "E"]
-    adventurers_names = ["Lara", "James", "Tom", "Sora", "Arthur", "John", "Amande", "Amy", "Loue", "Lupin", "Mendez", "Zain"]
-
     picked_names = []
     mtn, tsr, adv = [], [], []
     for elem, amount in random_elements.items():
@@ -96,15 +273,15 @@ def random_map():
                 treasures = rnd.randint(1, max_treasures)
                 tsr += [(x, y, treasures)]
             elif elem == "A":
-                name = rnd.choice(adventurers_names)
+                name = rnd.choice(names)
                 u_name = name + (" " + int_to_roman(picked_names.count(name)) if name in picked_names else '')
                 picked_names += [name]
                 direction = rnd.choice(directions)
                 path = ""
                 adv += [(u_name, x, y, direction, path)]
 
-    tm = TreasureMap(width=w, height=h, mountains=mtn, treasures=tsr, adventurers=adv)
-    tm.initial_state = TreasureMap(width=w, height=h, mountains=mtn, treasures=tsr, adventurers=adv)
+    moves_seed = rnd.getrandbits(64)
+    tm = TreasureMap(width=w, height=h, mountains=mtn, treasures=tsr, adventurers=adv, seed=moves_seed)
     tm.turns = 40
 
     return tm
@@ -134,35 +311,91 @@ def int_to_roman(num):
 
 
 def format_result(data):
-    txt = ""
-    for k, v in data.items():
-        if k == "Map":
-            x, y = v
-            y, x = str(x), str(y)
-            txt += SEPARATOR.join(["C", x, y])
-            txt += "\n"
-        elif k == "Mountains":
-            for mtn in v:
-                x, y = mtn
-                y, x = str(x), str(y)
-                txt += SEPARATOR.join(["M", x, y])
-                txt += "\n"
-        elif k == "Treasures":
-            for tsr in v:
-                pos, nb = tsr
-                x, y = pos
-                y, x, nb = str(x), str(y), str(nb)
-                txt += SEPARATOR.join(["T", x, y, nb])
-                txt += "\n"
-        elif k == "adventurers":
-            for plyr in v:
-                name, pos, dir, nb = plyr
-                x, y = pos
-                y, x, nb = str(x), str(y), str(nb)
-                txt += SEPARATOR.join(["A", name, x, y, dir, nb])
-                txt += "\n"
-
-    return txt
+    """
+    :param data: The data of a map (see TreasureMap.get_data)
+    :return: The result in the quest output format
+    """
+    output = io.StringIO()
+    write_records(data_records(data), output)
+    return output.getvalue()
+
+
+def write_result(tm, file, output_format=TEXT):
+    """
+    Writes the result of a map straight from its terrain, treasures and adventurers, in chunks of records.
+
+    :param tm: The TreasureMap
+    :param file: File opened in text mode (opened with newline="" for the csv format)
+    :param output_format: text (quest output format), jsonl (one JSON object per record) or csv (one row per record)
+    """
+    write_records(result_records(tm), file, output_format)
+
+
+def result_records(tm):
+    """
+    :return: Generator of the records of the map's result, with the coordinates of the quest format,
+        example: ("C", 3, 4), ("M", 1, 0), ("T", 1, 3, 2), ("A", "Lara", 0, 3, "S", 3)
+    """
+    yield "C", tm.height, tm.width
+    for i, j in tm.grid.iter_mountains():
+        yield "M", j, i
+    for (i, j), amount in tm.treasures.items():
+        yield "T", j, i, amount
+    for adventurer in tm.adventurers:
+        i, j = adventurer.pos
+        yield "A", adventurer.name, j, i, DIRECTION_TO_CHAR[adventurer.direction], adventurer.collected_treasures
+
+
+def data_records(data):
+    """
+    :param data: The data of a map (see TreasureMap.get_data)
+    :return: Generator of the records of the map's result (see result_records)
+    """
+    width, height = data["Map"]
+    yield "C", height, width
+    for i, j in data["Mountains"]:
+        yield "M", j, i
+    for (i, j), amount in data["Treasures"]:
+        yield "T", j, i, amount
+    for name, (i, j), direction, amount in data["adventurers"]:
+        yield "A", name, j, i, direction, amount
+
+
+def write_records(records, file, output_format=TEXT):
+    """
+    :param records: Iterable of records (see result_records)
+    :param file: File opened in text mode
+    :param output_format: text, jsonl or csv
+    """
+    if output_format == TEXT:
+        for chunk in chunks(records):
+            file.write("".join([TEXT_LINES[len(record)] % record for record in chunk]))
+    elif output_format == JSONL:
+        import json
+        for chunk in chunks(records):
+            file.write("".join([
+                json.dumps(dict(zip(RESULT_FIELDS[record[0]], record)), separators=(",", ":")) + "\n"
+                for record in chunk
+            ]))
+    elif output_format == CSV:
+        import csv
+        writer = csv.writer(file)
+        for chunk in chunks(records):
+            writer.writerows(chunk)
+    else:
+        raise ValueError(f"unknown output format: {output_format}")
+
+
+def chunks(records, size=WRITE_CHUNK):
+    """
+    :return: Generator of lists of at most size records
+    """
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, size))
+        if not chunk:
+            return
+        yield chunk
 
 
 if __name__ == "__main__":
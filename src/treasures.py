@@ -0,0 +1,142 @@
+import heapq
+from math import isqrt
+
+# Average amount of treasure cells by bucket when the side of the buckets is not given
+BUCKET_TREASURES = 8
+
+
+class TreasureIndex:
+    """
+    Cells holding treasures, bucketed by squares of cells to find the closest ones without scanning every treasure.
+
+    Distances are Manhattan distances, the amount of forward moves between two cells of an open map.
+    """
+
+    def __init__(self, width, height, treasures, bucket_size=None):
+        """
+        :param width: Width of the map
+        :param height: Height of the map
+        :param treasures: Amount of treasures by position, example: {(1, 2): 3}. The dictionary is not copied, the
+            treasures collected through the index (see collect) are taken from it
+        :param bucket_size: Side of the buckets in cells, by default sized to hold BUCKET_TREASURES treasure cells
+        """
+        self.width, self.height = width, height
+        self.amounts = treasures
+        self.size = bucket_size or bucket_side(width, height, len(treasures))
+        self.buckets = {}
+        size, buckets = self.size, self.buckets
+        for cell in treasures:
+            key = (cell[0] // size, cell[1] // size)
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = {cell}
+            else:
+                bucket.add(cell)
+
+    def __len__(self):
+        return len(self.amounts)
+
+    def add(self, i, j):
+        """
+        Indexes a cell whose treasures were set in the amounts.
+        """
+        size = self.size
+        self.buckets.setdefault((i // size, j // size), set()).add((i, j))
+
+    def discard(self, i, j):
+        """
+        Forgets a cell whose treasures were all collected.
+        """
+        key = (i // self.size, j // self.size)
+        bucket = self.buckets.get(key)
+        if bucket is not None:
+            bucket.discard((i, j))
+            if not bucket:
+                del self.buckets[key]
+
+    def collect(self, i, j):
+        """
+        Removes one treasure from the cell, if any.
+        """
+        amount = self.amounts.get((i, j))
+        if not amount:
+            return
+        if amount > 1:
+            self.amounts[(i, j)] = amount - 1
+        else:
+            del self.amounts[(i, j)]
+            self.discard(i, j)
+
+    def nearest(self, i, j, accept=None):
+        """
+        :param accept: Optional filter of the cells, called with the cell's index (i * height + j)
+        :return: The closest treasure cell (ties broken by position), None if there are none
+        """
+        cells = self.nearest_k(i, j, 1, accept)
+        return cells[0] if cells else None
+
+    def nearest_k(self, i, j, k, accept=None):
+        """
+        Searches the buckets ring by ring around the cell's bucket, until the next ring is farther than the k-th
+        closest cell found.
+
+        :param accept: Optional filter of the cells, called with the cell's index (i * height + j)
+        :return: The k closest treasure cells (or fewer), sorted by distance then position
+        """
+        if k < 1:
+            return []
+        size = self.size
+        bi, bj = i // size, j // size
+        rings = max(bi, bj, (self.width - 1) // size - bi, (self.height - 1) // size - bj, 0)
+        # Max-heap of the closest cells found, as (-distance, -i, -j)
+        found = []
+        for ring in range(rings + 1):
+            if len(found) == k and -found[0][0] <= (ring - 1) * size:
+                break
+            for key in ring_keys(bi, bj, ring):
+                for ci, cj in self.buckets.get(key, ()):
+                    entry = (-abs(ci - i) - abs(cj - j), -ci, -cj)
+                    if (len(found) < k or entry > found[0]) and (accept is None or accept(ci * self.height + cj)):
+                        if len(found) < k:
+                            heapq.heappush(found, entry)
+                        else:
+                            heapq.heapreplace(found, entry)
+        return [(-ci, -cj) for _, ci, cj in sorted(found, reverse=True)]
+
+    def within(self, i, j, radius):
+        """
+        :return: The treasure cells at most radius cells away, sorted by distance then position
+        """
+        if radius < 0:
+            return []
+        size = self.size
+        found = []
+        for bi in range(max(i - radius, 0) // size, min(i + radius, self.width - 1) // size + 1):
+            for bj in range(max(j - radius, 0) // size, min(j + radius, self.height - 1) // size + 1):
+                for ci, cj in self.buckets.get((bi, bj), ()):
+                    distance = abs(ci - i) + abs(cj - j)
+                    if distance <= radius:
+                        found.append((distance, ci, cj))
+        found.sort()
+        return [(ci, cj) for _, ci, cj in found]
+
+
+def bucket_side(width, height, treasures):
+    """
+    :return: Side of the buckets holding BUCKET_TREASURES of the treasure cells on average
+    """
+    side = isqrt(BUCKET_TREASURES * width * height // max(treasures, 1))
+    return max(1, min(side, max(width, height)))
+
+
+def ring_keys(bi, bj, ring):
+    """
+    :return: The keys of the buckets at Chebyshev distance ring from the bucket (bi, bj)
+    """
+    if ring == 0:
+        return [(bi, bj)]
+    keys = [(bi - ring, bj + dj) for dj in range(-ring, ring + 1)]
+    keys += [(bi + ring, bj + dj) for dj in range(-ring, ring + 1)]
+    keys += [(bi + di, bj - ring) for di in range(-ring + 1, ring)]
+    keys += [(bi + di, bj + ring) for di in range(-ring + 1, ring)]
+    return keys
@@ -0,0 +1,182 @@
+import numpy as np
+
+from src.adventurer import DIRECTION_DELTAS
+from src.grid import PLAIN
+from src.script import FORWARD, RIGHT, LEFT, NOOP, CHAR_TO_OPCODE
+
+DELTAS = np.array(DIRECTION_DELTAS, dtype=np.int64)
+
+
+class VectorizedEngine:
+    """
+    Turn engine advancing every adventurer of a TreasureMap with batched NumPy operations.
+
+    Adventurers are still resolved as if they played one after another (in the map's order):
+    moves towards a cell which is free at the beginning of the turn and targeted by nobody else
+    are applied in bulk, the remaining conflicts are resolved sequentially.
+    """
+
+    def __init__(self, treasure_map):
+        self.map = treasure_map
+        self.adventurers = list(treasure_map.adventurers.keys())
+        self.scripts = [treasure_map.adventurers[adventurer] for adventurer in self.adventurers]
+        self.start = self.synced = treasure_map.iteration
+
+        n = len(self.adventurers)
+        height = treasure_map.height
+        self.pos = np.array([adventurer.pos for adventurer in self.adventurers], dtype=np.int64).reshape(n, 2)
+        self.dir = np.array([adventurer.dir for adventurer in self.adventurers], dtype=np.int64)
+        self.scores = np.array([adventurer.collected_treasures for adventurer in self.adventurers], dtype=np.int64)
+
+        # Opcodes left to play in each script, then the random moves drawn once a script is exhausted
+        remaining = [script.expand()[script.played:] for script in self.scripts]
+        self.lengths = np.array([len(ops) for ops in remaining], dtype=np.int64)
+        self.offsets = np.zeros(n, dtype=np.int64)
+        np.cumsum(self.lengths[:-1], out=self.offsets[1:])
+        self.ops = np.frombuffer(b"".join(remaining), dtype=np.uint8)
+        self.extra = [[] for _ in range(n)]
+
+        size = treasure_map.width * height
+        self.plain = np.asarray(treasure_map.grid.cells, dtype=np.uint8) == PLAIN
+        self.treasures = np.zeros(size, dtype=np.int32)
+        for (i, j), amount in treasure_map.treasures.items():
+            self.treasures[i * height + j] = amount
+        self.remaining = int(self.treasures.sum())
+
+        self.occupied = np.zeros(size, dtype=np.int32)
+        self.occupied[self.pos[:, 0] * height + self.pos[:, 1]] = np.arange(1, n + 1, dtype=np.int32)
+
+    # ----- Core ---------
+
+    def run(self):
+        """
+        Simulates the quest like TreasureMap.run, then writes the final state back in the map.
+
+        :return: The amount of turns simulated
+        """
+        simulated = 0
+        while self.map.turns > 0 and self.remaining > 0:
+            self.step()
+            self.map.turns -= 1
+            simulated += 1
+
+        self.sync()
+        return simulated
+
+    def step(self):
+        """
+        Plays one turn for every adventurer.
+        """
+        if self.map.instrumented:
+            raise ValueError("VectorizedEngine neither records events nor profiles, play the map with TreasureMap.run")
+        n = len(self.adventurers)
+        if not n:
+            self.map.iteration += 1
+            return
+
+        ops = self.next_opcodes()
+
+        right, left = ops == RIGHT, ops == LEFT
+        self.dir[right] = (self.dir[right] + 1) % 4
+        self.dir[left] = (self.dir[left] - 1) % 4
+
+        movers = np.flatnonzero(ops == FORWARD)
+        target = self.pos[movers] + DELTAS[self.dir[movers]]
+        inside = (
+                (target[:, 0] >= 0) & (target[:, 0] < self.map.width)
+                & (target[:, 1] >= 0) & (target[:, 1] < self.map.height)
+        )
+        movers, target = movers[inside], target[inside]
+        target_cell = target[:, 0] * self.map.height + target[:, 1]
+        accessible = self.plain[target_cell]
+        movers, target, target_cell = movers[accessible], target[accessible], target_cell[accessible]
+
+        _, inverse, counts = np.unique(target_cell, return_inverse=True, return_counts=True)
+        simple = (counts[inverse] == 1) & (self.occupied[target_cell] == 0)
+        moved = self.resolve_conflicts(movers, target_cell, simple)
+
+        # Every remaining simple move is independent from all the others
+        origin_cell = self.pos[:, 0] * self.map.height + self.pos[:, 1]
+        rest = simple & ~moved
+        self.occupied[origin_cell[movers[rest]]] = 0
+        self.occupied[target_cell[rest]] = movers[rest] + 1
+        moved |= rest
+
+        movers, target, target_cell = movers[moved], target[moved], target_cell[moved]
+        self.pos[movers] = target
+
+        # A cell can be entered by at most one adventurer per turn
+        found = self.treasures[target_cell] > 0
+        self.treasures[target_cell[found]] -= 1
+        self.scores[movers[found]] += 1
+        self.remaining -= int(found.sum())
+
+        self.map.iteration += 1
+
+    def next_opcodes(self):
+        """
+        :return: The opcode played by each adventurer this turn, extending exhausted scripts with random moves.
+        """
+        t = self.map.iteration - self.start
+        ops = np.full(len(self.adventurers), NOOP, dtype=np.uint8)
+        live = self.lengths > t
+        ops[live] = self.ops[self.offsets[live] + t]
+
+        for k in np.flatnonzero(~live):
+            extra, step = self.extra[k], t - self.lengths[k]
+            if step >= len(extra):
+                movements = self.map.get_random_moves()
+                self.scripts[k].extend(movements)
+                extra += [CHAR_TO_OPCODE.get(c, NOOP) for c in movements]
+            ops[k] = extra[step]
+        return ops
+
+    def resolve_conflicts(self, movers, target_cell, simple):
+        """
+        Resolves, in adventurers order, the moves which depend on the other adventurers of the turn.
+
+        :return: Mask of the movers which moved while resolving conflicts
+        """
+        moved = np.zeros(len(movers), dtype=bool)
+        if simple.all():
+            return moved
+
+        height = self.map.height
+        origin_cell = self.pos[movers, 0] * height + self.pos[movers, 1]
+        contested = ~simple
+        # Simple movers leaving a contested cell must be replayed in order as well
+        involved = contested | (simple & np.isin(origin_cell, target_cell[contested]))
+
+        occupied = self.occupied
+        for k in np.flatnonzero(involved):
+            if occupied[target_cell[k]] == 0:
+                occupied[origin_cell[k]] = 0
+                occupied[target_cell[k]] = movers[k] + 1
+                moved[k] = True
+        return moved
+
+    # ----- Synchronization ---------
+
+    def sync(self):
+        """
+        Writes the engine state back in the TreasureMap (positions, directions, scores, treasures and scripts' cursors).
+        """
+        tm = self.map
+        for k, adventurer in enumerate(self.adventurers):
+            adventurer.pos = (int(self.pos[k, 0]), int(self.pos[k, 1]))
+            adventurer.dir = int(self.dir[k])
+            if adventurer.collected_treasures != self.scores[k]:
+                adventurer.collected_treasures = int(self.scores[k])
+                tm.leader_board.update(adventurer)
+        for script in self.scripts:
+            script.skip(tm.iteration - self.synced)
+        self.synced = tm.iteration
+
+        tm.occupied = {adventurer.pos: adventurer for adventurer in self.adventurers}
+        tm.treasures_count = self.remaining
+        for i, j in list(tm.treasures.keys()):
+            amount = int(self.treasures[i * tm.height + j])
+            if amount:
+                tm.treasures[(i, j)] = amount
+            else:
+                tm.pop_treasure((i, j))